@@ -0,0 +1,90 @@
+"""
+Wall time of a report over several accounts against the mock server:
+one account after another, as when running the tool once per
+account, against an AccountPool running every account at once in its
+own process. The first pool run includes starting the processes.
+"""
+
+import argparse
+import time
+from typing import List
+
+from mock_binance import MockBinance
+
+import cli
+import client
+from accounts import AccountConfig, AccountPool
+from binance import Binance
+from signer import HmacSigner
+from trade_store import TradeStore
+
+COMMANDS: List[List[str]] = [
+    ["balance"],
+    ["orders"],
+    ["profits", "BTCUSDT", "ETHUSDT"],
+]
+
+
+def sequential(accounts: List[AccountConfig]) -> float:
+    """
+    Run the commands for each account in turn, with a new client each.
+    :param accounts: List of AccountConfig object.
+    :return: Float with the seconds taken.
+    """
+    start: float = time.perf_counter()
+    for config in accounts:
+        binance = Binance(
+            base_url=config.base_url,
+            api_key=config.api_key,
+            signer=HmacSigner(config.secret_key),
+            trade_store=TradeStore(config.trades_db),
+        )
+        client.configure(binance=binance)
+        for argv in COMMANDS:
+            cli.run_command(argv, False)
+        client.close()
+    return time.perf_counter() - start
+
+
+def pooled(pool: AccountPool) -> float:
+    """
+    Run the commands on every account at once.
+    :param pool: AccountPool object.
+    :return: Float with the seconds taken.
+    """
+    start: float = time.perf_counter()
+    for argv in COMMANDS:
+        outcome = pool.run(cli.run_command, argv, False)
+        assert not outcome.errors, outcome.errors
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=50, help="in ms")
+    parser.add_argument("--trades", type=int, default=2000)
+    args = parser.parse_args()
+    with MockBinance(args.latency / 1000, args.trades) as mock:
+        accounts: List[AccountConfig] = [
+            AccountConfig(
+                name=f"bench{i}",
+                api_key="benchmark",
+                secret_key="benchmark",
+                base_url=mock.url,
+                trades_db=":memory:",
+            )
+            for i in range(args.accounts)
+        ]
+        print(f"{args.accounts} accounts, {args.latency:.0f} ms latency")
+        print(f"one after another:   {sequential(accounts):8.2f} s")
+        with AccountPool(accounts) as pool:
+            print(f"pool, cold:          {pooled(pool):8.2f} s")
+            print(f"pool, warm:          {pooled(pool):8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
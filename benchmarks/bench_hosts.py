@@ -0,0 +1,82 @@
+"""
+Host selection against several stub servers with injected delays:
+routing to the fastest host, hedged reads against latency spikes,
+and failover when a host goes down.
+"""
+
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Callable, List
+
+from stub_server import StubServer
+
+from binance import Binance, Public
+from trade_store import TradeStore
+
+CALLS: int = 200
+
+
+def _spiky(base: float, spike: float, rate: float) -> Callable[[], float]:
+    """Delay of `base` seconds, `spike` seconds for a `rate` share of calls"""
+    return lambda: spike if random.random() < rate else base
+
+
+def _latencies(binance: Binance, calls: int = CALLS) -> List[float]:
+    samples: List[float] = []
+    for _ in range(calls):
+        start: float = time.perf_counter()
+        binance._get_public(Public.avg_price, {"symbol": "BTCUSDT"})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name: str, samples: List[float]) -> None:
+    ordered: List[float] = sorted(samples)
+    p50: float = statistics.median(ordered) * 1000
+    p99: float = ordered[int(len(ordered) * 0.99)] * 1000
+    print(f"{name:<22} p50 {p50:6.1f} ms   p99 {p99:6.1f} ms")
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    random.seed(0)
+    delays: list = [0.03, _spiky(0.005, 0.15, 0.02), 0.01]
+    with ExitStack() as stack:
+        servers = [stack.enter_context(StubServer(delay=delay)) for delay in delays]
+        urls: List[str] = [server.url for server in servers]
+        _report("pinned to first host", _pinned(urls[0]))
+        for hedge in (False, True):
+            binance = Binance(
+                hosts=urls, hedge=hedge, trade_store=TradeStore(":memory:")
+            )
+            binance.probe_hosts()
+            _latencies(binance, 50)
+            _report("hedged" if hedge else "fastest host", _latencies(binance))
+            print(f"  best host: {binance.base_url}, fastest median: {urls[1]}")
+            binance.close()
+        binance = Binance(hosts=urls[1:], trade_store=TradeStore(":memory:"))
+        _latencies(binance, 20)
+        servers[1].httpd.shutdown()
+        servers[1].httpd.server_close()
+        failed: int = 0
+        for _ in range(20):
+            try:
+                binance._get_public(Public.avg_price, {"symbol": "BTCUSDT"})
+            except Exception:  # pylint: disable=broad-except
+                failed += 1
+        print(f"failover: {failed} failed calls, best host now {binance.base_url}")
+
+
+def _pinned(url: str) -> List[float]:
+    binance = Binance(base_url=url, trade_store=TradeStore(":memory:"))
+    samples: List[float] = _latencies(binance, CALLS // 4)
+    binance.close()
+    return samples
+
+
+if __name__ == "__main__":
+    main()
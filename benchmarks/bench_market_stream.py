@@ -0,0 +1,95 @@
+"""
+Market data stream against a local replay server: message
+throughput, order book sync and lookup latency of the local tables.
+"""
+
+import json
+import time
+from typing import List
+
+from stub_server import StubServer, default_routes
+from ws_replay import ReplayServer
+
+from binance import Binance
+from market_stream import MarketStream
+from trade_store import TradeStore
+
+MESSAGES: int = 20_000
+SYMBOL: str = "BTCUSDT"
+
+
+def record(count: int = MESSAGES) -> List[str]:
+    """
+    Build a recording of trade, bookTicker and depth messages.
+    Depth updates start at id 1 and follow each other.
+    :param count: Int with the number of messages.
+    :return: List of JSON messages.
+    """
+    name: str = SYMBOL.lower()
+    messages: List[str] = []
+    for i in range(count):
+        price: float = 30000 + i % 100
+        if i % 3 == 0:
+            data: dict = {"e": "trade", "s": SYMBOL, "p": str(price), "q": "0.1"}
+            stream: str = f"{name}@trade"
+        elif i % 3 == 1:
+            data = {
+                "s": SYMBOL,
+                "b": str(price - 1),
+                "B": "1",
+                "a": str(price + 1),
+                "A": "1",
+            }
+            stream = f"{name}@bookTicker"
+        else:
+            update: int = i // 3 + 1
+            data = {
+                "e": "depthUpdate",
+                "s": SYMBOL,
+                "U": update,
+                "u": update,
+                "b": [[str(price - 200), "1.5"]],
+                "a": [[str(price + 200), "0" if i % 2 else "2"]],
+            }
+            stream = f"{name}@depth@100ms"
+        messages.append(json.dumps({"stream": stream, "data": data}))
+    return messages
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    messages: List[str] = record()
+    routes = default_routes()
+    routes["/api/v3/depth"] = lambda _: {
+        "lastUpdateId": 10,
+        "bids": [["29000", "1"]],
+        "asks": [["31000", "1"]],
+    }
+    with StubServer(routes) as rest, ReplayServer(messages) as replay:
+        binance = Binance(base_url=rest.url, trade_store=TradeStore(":memory:"))
+        stream = MarketStream(fetch_depth=binance.get_depth, url=replay.url)
+        stream.subscribe([SYMBOL], depth=True)
+        start: float = time.perf_counter()
+        stream.start()
+        last_id: int = sum(1 for i in range(MESSAGES) if i % 3 == 2)
+        while True:
+            book = stream.order_book(SYMBOL)
+            if book is not None and book.last_update_id >= last_id:
+                break
+            time.sleep(0.001)
+        elapsed: float = time.perf_counter() - start
+        stream.stop()
+    print(f"{MESSAGES:,} messages in {elapsed * 1000:.0f} ms")
+    print(f"{MESSAGES / elapsed:,.0f} messages/s")
+    start = time.perf_counter()
+    for _ in range(100_000):
+        stream.last_price(SYMBOL)
+    lookup: float = (time.perf_counter() - start) / 100_000
+    print(f"last price lookup: {lookup * 1e9:.0f} ns")
+    print(f"book: bid {book.best_bid()} ask {book.best_ask()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Decoding of myTrades responses: json + pydantic Trade models
+vs loads (orjson when installed) + FastTrade records.
+Reports parse throughput and the memory held by 100k decoded trades.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, List
+
+import stub_server  # pylint: disable=unused-import
+
+import fast_models
+from fast_models import FastTrade
+from models import Trade
+
+TRADES: int = 100_000
+PAGE: int = 1000
+
+
+def make_pages(count: int) -> List[bytes]:
+    """
+    Build myTrades response bodies of PAGE trades.
+    :param count: Int with the number of trades.
+    :return: List of bytes with the JSON bodies.
+    """
+    trades: List[dict] = [
+        {
+            "symbol": "BTCUSDT",
+            "id": i,
+            "orderId": i,
+            "orderListId": -1,
+            "price": "30000.00000000",
+            "qty": "0.01000000",
+            "quoteQty": "300.00000000",
+            "commission": "0.00001000",
+            "commissionAsset": "BNB",
+            "time": 1600000000000 + i,
+            "isBuyer": bool(i % 2),
+            "isMaker": False,
+            "isBestMatch": True,
+        }
+        for i in range(count)
+    ]
+    return [
+        json.dumps(trades[i : i + PAGE]).encode() for i in range(0, count, PAGE)
+    ]
+
+
+def decode_models(pages: List[bytes]) -> list:
+    """The former path: requests' .json() then Trade(**t) per trade."""
+    trades: list = []
+    for page in pages:
+        trades += list(map(lambda t: Trade(**t), json.loads(page)))
+    return trades
+
+
+def decode_records(pages: List[bytes]) -> list:
+    """The fast path: loads() then FastTrade.from_list."""
+    trades: list = []
+    for page in pages:
+        trades += FastTrade.from_list(fast_models.loads(page))
+    return trades
+
+
+def _measure(decode: Callable[[List[bytes]], list], pages: List[bytes]) -> tuple:
+    """Seconds to decode and bytes held by the result"""
+    gc.collect()
+    start: float = time.perf_counter()
+    decode(pages)
+    elapsed: float = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    trades: list = decode(pages)
+    held: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del trades
+    return elapsed, held
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    pages: List[bytes] = make_pages(TRADES)
+    parser: str = "orjson" if fast_models.orjson is not None else "json"
+    cases: tuple = (
+        ("pydantic Trade", decode_models),
+        (f"FastTrade ({parser})", decode_records),
+    )
+    baseline: float = 0.0
+    for name, decode in cases:
+        elapsed, held = _measure(decode, pages)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<20} {TRADES / elapsed:>12,.0f} trades/s"
+            f"  {held / 2**20:7.1f} MiB per {TRADES:,} trades"
+            f"  x{baseline / elapsed:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Portfolio valuation over the mock exchange, about 2000 pairs.
+Compares valuing every holding from scratch (building the graph and
+searching each path every time) with the shared Portfolio, whose
+paths are cached and whose valuation is updated incrementally from a
+price snapshot or a single streamed price.
+"""
+
+import random
+import statistics
+import tempfile
+import time
+from os import path
+from typing import Callable, Dict, List, Tuple
+
+from mock_binance import BASES, MockBinance
+
+from binance import Binance
+from models import Balance
+from portfolio import ConversionGraph, Portfolio, Valuation
+from trade_store import TradeStore
+
+HOLDINGS: int = 50
+QUOTE: str = "USDT"
+
+
+def _timeit(call: Callable[[], object], number: int) -> float:
+    """
+    Median time of a call.
+    :return: Float with the microseconds per call.
+    """
+    samples: List[float] = []
+    for _ in range(number):
+        start: float = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def from_scratch(
+    pairs: Dict[str, Tuple[str, str]], balances: List[Balance], prices: Dict[str, float]
+) -> float:
+    """
+    Value the balances without anything cached.
+    :return: Float with the total value.
+    """
+    valuation = Valuation(ConversionGraph(pairs), QUOTE)
+    valuation.set_balances(balances)
+    valuation.update_prices(prices.get)
+    return valuation.total
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    rand = random.Random(0)
+    with MockBinance() as mock, tempfile.TemporaryDirectory() as temp_dir, Binance(
+        base_url=mock.url,
+        trade_store=TradeStore(":memory:"),
+        exchange_info_path=path.join(temp_dir, "exchange_info.json"),
+    ) as binance:
+        pairs: Dict[str, Tuple[str, str]] = binance.exchange_info.pairs()
+        prices: Dict[str, float] = {
+            symbol: float(ticker.price)
+            for symbol, ticker in binance.prices.snapshot().items()
+        }
+    balances: List[Balance] = [
+        Balance(asset=asset, free=str(rand.uniform(1, 100)), locked="0")
+        for asset in rand.sample(BASES, HOLDINGS)
+    ]
+    print(f"{len(pairs)} pairs, {HOLDINGS} holdings, valued in {QUOTE}")
+    scratch: float = _timeit(lambda: from_scratch(pairs, balances, prices), 20)
+    print(f"from scratch:          {scratch:10.1f} us")
+    valuation: Valuation = Portfolio(pairs).valuation(QUOTE)
+
+    def update() -> None:
+        valuation.set_balances(balances)
+        valuation.update_prices(prices.get)
+
+    start: float = time.perf_counter()
+    update()
+    print(f"first valuation:       {(time.perf_counter() - start) * 1e6:10.1f} us")
+    print(f"same snapshot again:   {_timeit(update, 200):10.1f} us")
+    symbols: List[str] = sorted(valuation.symbols())
+
+    def stream() -> None:
+        valuation.set_price(rand.choice(symbols), rand.uniform(1, 10))
+
+    print(f"one streamed price:    {_timeit(stream, 2000):10.1f} us")
+    check: float = from_scratch(pairs, balances, {**prices, **valuation.prices})
+    assert abs(check - valuation.total) < 1e-6 * check, (check, valuation.total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Profit calculation: the former O(n²) controller._calc_profit
+vs the incremental profit engine.
+The former function is too slow to run at 100k trades, so it's
+measured at smaller sizes and extrapolated quadratically.
+"""
+
+import time
+from typing import Callable, List
+
+import stub_server  # pylint: disable=unused-import
+
+from models import Profit, Trade
+from profit import Basis, ProfitEngine
+
+TRADES: int = 100_000
+LEGACY_SIZES: tuple = (1000, 2000, 4000)
+
+
+def make_trades(count: int, symbol: str = "BTCUSDT") -> List[Trade]:
+    """
+    Build alternating buy/sell trades.
+    :param count: Int with the number of trades.
+    :return: List of Trade object.
+    """
+    return [
+        Trade.construct(
+            symbol=symbol,
+            id_=i,
+            order_id=i,
+            order_list_id=-1,
+            price="30000.00",
+            qty="0.01000000" if i % 3 else "0.02000000",
+            quote_qty="300.00000000" if i % 3 else "600.00000000",
+            commission="0.00001000",
+            commission_asset="BNB",
+            time=1600000000000 + i,
+            is_buyer=bool(i % 3),
+            is_maker=False,
+            is_best_match=True,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_calc_profit(trades: List[Trade], price: float) -> Profit:
+    """
+    controller._calc_profit as it was, without the price request.
+    """
+    for trade in trades:
+        total_qty_buy: float = sum(
+            float(trade.qty) for trade in trades if trade.is_buyer
+        )
+        total_qty_sell: float = sum(
+            float(trade.qty) for trade in trades if not trade.is_buyer
+        )
+        total_value_buy: float = sum(
+            float(trade.quote_qty) for trade in trades if trade.is_buyer
+        )
+        total_value_sell: float = sum(
+            float(trade.quote_qty) for trade in trades if not trade.is_buyer
+        )
+    total_qty: float = total_qty_buy - total_qty_sell
+    total_value: float = total_value_buy - total_value_sell
+    return Profit(trades[0].symbol, total_qty, total_value, price * total_qty)
+
+
+def engine_calc_profit(trades: List[Trade], price: float, basis: str) -> Profit:
+    """
+    Profit from a fresh engine fed with all the trades.
+    """
+    engine = ProfitEngine(basis)
+    position = engine.position(trades[0].symbol)
+    position.update_many(trades)
+    return position.to_profit(price)
+
+
+def _time(call: Callable[[], object]) -> float:
+    start: float = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    legacy: float = 0.0
+    for size in LEGACY_SIZES:
+        trades = make_trades(size)
+        legacy = _time(lambda: legacy_calc_profit(trades, 30000.0))
+        print(f"legacy  {size:>7} trades: {legacy * 1000:10.1f} ms")
+    legacy_estimate: float = legacy * (TRADES / LEGACY_SIZES[-1]) ** 2
+    print(f"legacy  {TRADES:>7} trades: {legacy_estimate:10.1f} s (extrapolated)")
+    trades = make_trades(TRADES)
+    for basis in (Basis.FIFO, Basis.AVERAGE):
+        engine: float = _time(lambda: engine_calc_profit(trades, 30000.0, basis))
+        print(
+            f"{basis.lower():<7} {TRADES:>7} trades: {engine * 1000:10.1f} ms"
+            f"  speedup x{legacy_estimate / engine:,.0f}"
+        )
+    position = ProfitEngine().position("BTCUSDT")
+    position.update_many(trades)
+    new_trade = make_trades(TRADES + 1)[-1]
+    update: float = _time(lambda: position.update(new_trade))
+    print(f"single trade update: {update * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Request scheduling against a stub server enforcing a weight limit.
+Compares sustained throughput and 429s with and without the limiter,
+and order latency while analytics requests saturate the budget.
+The limit is scaled down to a short window to keep the run short.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Tuple
+
+from stub_server import Reply, StubServer, default_routes
+
+from binance import Binance, Public
+from rate_limit import Priority, RateLimiter
+from trade_store import TradeStore
+
+LIMIT: int = 400
+WINDOW: float = 2.0
+DURATION: float = 6.0
+THREADS: int = 16
+
+
+class WeightWindow:
+    """Server side weight accounting over a sliding window"""
+
+    def __init__(self):
+        self.calls: Deque[Tuple[float, int]] = deque()
+        self.lock = threading.Lock()
+        self.banned_until: float = 0.0
+        self.accepted: int = 0
+        self.rejected: int = 0
+
+    def charge(self, weight: int) -> Tuple[bool, int]:
+        """Charge a request, return (accepted, used weight)"""
+        now: float = time.monotonic()
+        with self.lock:
+            while self.calls and self.calls[0][0] < now - WINDOW:
+                self.calls.popleft()
+            used: int = sum(item[1] for item in self.calls)
+            if now < self.banned_until or used + weight > LIMIT:
+                self.banned_until = max(self.banned_until, now + 0.5)
+                self.rejected += 1
+                return False, used
+            self.calls.append((now, weight))
+            self.accepted += 1
+            return True, used + weight
+
+
+def _routes(window: WeightWindow) -> dict:
+    routes = default_routes()
+
+    def avg_price(_: dict) -> Reply:
+        accepted, used = window.charge(2)
+        headers: dict = {"X-MBX-USED-WEIGHT-1M": used}
+        if not accepted:
+            headers["Retry-After"] = 0.5
+            return Reply(429, {"code": -1003, "msg": "Too many requests"}, headers)
+        return Reply(200, {"mins": 5, "price": "30000.00"}, headers)
+
+    routes[Public.avg_price] = avg_price
+    return routes
+
+
+def _run(limiter: RateLimiter, probe: bool = False) -> None:
+    window = WeightWindow()
+    stop = threading.Event()
+    order_latency: List[float] = []
+    with StubServer(_routes(window)) as server:
+        binance = Binance(
+            base_url=server.url,
+            pool_size=THREADS,
+            trade_store=TradeStore(":memory:"),
+            rate_limiter=limiter,
+        )
+
+        def flood() -> None:
+            while not stop.is_set():
+                binance._get_public(
+                    Public.avg_price, {"symbol": "BTCUSDT"}, Priority.ANALYTICS
+                )
+
+        threads = [threading.Thread(target=flood) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        end: float = time.monotonic() + DURATION
+        while probe and time.monotonic() < end:
+            time.sleep(0.2)
+            start: float = time.perf_counter()
+            binance._get_public(Public.avg_price, {"symbol": "BTCUSDT"}, Priority.ORDER)
+            order_latency.append(time.perf_counter() - start)
+        time.sleep(max(0.0, end - time.monotonic()))
+        stop.set()
+        for thread in threads:
+            thread.join()
+    rate: float = window.accepted * 2 / DURATION
+    print(f"  accepted weight/s: {rate:7.1f} (limit {LIMIT / WINDOW:.0f})")
+    print(f"  429 responses:     {window.rejected:7d}")
+    if order_latency:
+        median: float = statistics.median(order_latency) * 1000
+        print(f"  order latency:     {median:7.1f} ms median under load")
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    print("without limiter")
+    _run(RateLimiter(weight_limit=10**9, weight_interval=WINDOW))
+    print("with limiter")
+    _run(RateLimiter(weight_limit=LIMIT, weight_interval=WINDOW), probe=True)
+
+
+if __name__ == "__main__":
+    main()
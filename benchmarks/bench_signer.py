@@ -0,0 +1,86 @@
+"""
+Signatures per second of each key type, over the query string of a
+typical signed request. The HMAC rows compare signing from scratch,
+as it was done before, with the precomputed keyed state. Ed25519 and
+RSA keys are generated on the fly and need the optional `cryptography`
+package; they're skipped without it.
+"""
+
+import hashlib
+import hmac
+import time
+from typing import Callable, List, Tuple
+from urllib import parse
+
+import stub_server  # pylint: disable=unused-import
+
+from signer import Ed25519Signer, HmacSigner, RsaSigner, Signer
+
+# pylint: disable=import-outside-toplevel
+
+SECRET_KEY: str = "x" * 64
+PARAMS: dict = {
+    "symbol": "BTCUSDT",
+    "fromId": 123456,
+    "limit": 1000,
+    "timestamp": 1700000000000,
+}
+DURATION: float = 0.5
+
+
+def rate(sign: Callable[[], str]) -> float:
+    """
+    Call a signing function for DURATION seconds.
+    :param sign: Callable without arguments.
+    :return: Float with the calls per second.
+    """
+    calls: int = 0
+    start: float = time.perf_counter()
+    deadline: float = start + DURATION
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            sign()
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+
+def naive_hmac() -> str:
+    """Key schedule and encoding redone for every signature"""
+    return hmac.new(
+        str.encode(SECRET_KEY), str.encode(parse.urlencode(PARAMS)), hashlib.sha256
+    ).hexdigest()
+
+
+def signers() -> List[Tuple[str, Signer]]:
+    """
+    One signer per key type, asymmetric ones only with cryptography.
+    :return: List of (name, Signer) tuples.
+    """
+    result: List[Tuple[str, Signer]] = [("hmac-sha256", HmacSigner(SECRET_KEY))]
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    except ImportError:
+        print("cryptography not installed, skipping Ed25519 and RSA")
+        return result
+    result.append(("ed25519", Ed25519Signer(ed25519.Ed25519PrivateKey.generate())))
+    for bits in (2048, 4096):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=bits)
+        result.append((f"rsa-{bits}", RsaSigner(key)))
+    return result
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    query: str = parse.urlencode(PARAMS)
+    payload: bytes = query.encode()
+    assert HmacSigner(SECRET_KEY).sign(payload) == naive_hmac()
+    print(f"{'key':<24} {'signatures/s':>14}")
+    print(f"{'hmac-sha256 (naive)':<24} {rate(naive_hmac):>14,.0f}")
+    for name, signer in signers():
+        print(f"{name:<24} {rate(lambda s=signer: s.sign(payload)):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
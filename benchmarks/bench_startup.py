@@ -0,0 +1,112 @@
+"""
+Startup time of the entry point: `python -X importtime` of src/main.py
+and of the controller it imports before showing the menu, in fresh
+interpreters. Exits with an error if a module that should load on
+first use (the HTTP client, models, numpy...) is imported before the
+first prompt, or one only some requests need (numpy, websocket...) is
+imported by building the client, so a stray top-level import doesn't
+go unnoticed.
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+from os import environ, path
+from typing import Dict, List, Tuple
+
+SRC_DIR: str = path.join(path.dirname(path.dirname(path.abspath(__file__))), "src")
+RUNS: int = 10
+# Modules only needed once a request is made.
+LAZY: Tuple[str, ...] = (
+    "binance",
+    "dotenv",
+    "models",
+    "numpy",
+    "pydantic",
+    "requests",
+    "websocket",
+)
+# Modules only needed by some requests, not by building the client.
+CLIENT_LAZY: Tuple[str, ...] = ("klines", "numpy", "websocket")
+# No request is made, the host is never reached.
+BUILD_CLIENT: str = (
+    "import sys, binance\n"
+    "binance.Binance(base_url='http://127.0.0.1:1').close()\n"
+    "print('\\n'.join(sys.modules))"
+)
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """
+    Import a module in a fresh interpreter.
+    :param module: String with the module name.
+    :return: Dict of module -> cumulative microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env={**environ, "API_KEY": "benchmark", "SECRET_KEY": "benchmark"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for match in LINE.finditer(result.stderr):
+        times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def client_modules() -> List[str]:
+    """
+    Build the client in a fresh interpreter.
+    :return: List with the modules loaded afterwards.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", BUILD_CLIENT],
+        cwd=SRC_DIR,
+        env={**environ, "API_KEY": "benchmark", "SECRET_KEY": "benchmark"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.splitlines()
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    runs: List[Dict[str, int]] = [import_times("main") for _ in range(RUNS)]
+    total: float = statistics.median(run["main"] for run in runs) / 1000
+    print(f"import main: {total:.1f} ms (median of {RUNS})")
+    # The menu path: main imports the controller, then prompts.
+    menus: List[Dict[str, int]] = [import_times("controller") for _ in range(RUNS)]
+    menu: float = statistics.median(run["controller"] for run in menus) / 1000
+    print(f"up to the menu, import controller: {menu:.1f} ms (median of {RUNS})")
+    heaviest: List[Tuple[str, int]] = sorted(
+        menus[-1].items(), key=lambda item: -item[1]
+    )[1:8]
+    for name, micros in heaviest:
+        print(f"  {name:<30} {micros / 1000:7.1f} ms")
+    client: float = statistics.median(
+        import_times("binance")["binance"] for _ in range(3)
+    )
+    print(f"loaded on first use, import binance: {client / 1000:.1f} ms")
+    eager: List[str] = [
+        name for name in LAZY if name in runs[-1] or name in menus[-1]
+    ]
+    loaded: List[str] = client_modules()
+    eager_client: List[str] = [name for name in CLIENT_LAZY if name in loaded]
+    if eager:
+        print(f"imported at startup: {', '.join(eager)}")
+    if eager_client:
+        print(f"imported by building the client: {', '.join(eager_client)}")
+    if eager or eager_client:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
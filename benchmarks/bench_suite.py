@@ -0,0 +1,348 @@
+"""
+Offline benchmark suite against the mock Binance server.
+Covers request signing, response parsing, account caching, local
+order checks, profit calculation, views rendering and end-to-end
+menu actions. Results are written as JSON, so runs of different
+commits can be compared:
+
+    python benchmarks/bench_suite.py --output before.json
+    python benchmarks/bench_suite.py --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from os import path
+from typing import Callable, Dict, List, Optional
+
+from rich.console import Console
+
+from bench_profit import engine_calc_profit, legacy_calc_profit, make_trades
+from mock_binance import TRADED, MockBinance
+from ws_replay import ReplayServer
+
+import fast_models
+import views
+from binance import Binance, Private, Public
+from exchange_info import ExchangeInfoCache
+from fast_models import FastAccount, FastTrade
+from models import Account, Balance, NewOrder, Order, Profit, Ticker, Ticker24h, Trade
+from profit import Basis
+from trade_store import TradeStore
+
+RESULTS_DIR: str = path.join(path.dirname(path.abspath(__file__)), "results")
+# Slowdowns above this ratio are flagged by --compare.
+TOLERANCE: float = 1.10
+
+Results = Dict[str, dict]
+
+
+def _timeit(call: Callable[[], object], repeat: int, number: int = 1) -> float:
+    """
+    Median time of `number` calls, over `repeat` runs.
+    :return: Float with the microseconds per call.
+    """
+    samples: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples) * 1e6
+
+
+def _record(results: Results, name: str, value: float, unit: str = "us") -> None:
+    results[name] = {"value": round(value, 3), "unit": unit}
+    print(f"{name:<40} {value:>14,.1f} {unit}")
+
+
+def bench_signing(results: Results, binance: Binance) -> None:
+    """Query building and signing of typical params"""
+    params: dict = {"symbol": "BTCUSDT", "fromId": 123456, "limit": 1000}
+    _record(
+        results,
+        "signing.my_trades",
+        _timeit(lambda: binance._signed_query(params), 20, 500),
+    )
+
+
+def bench_parsing(results: Results, binance: Binance) -> None:
+    """Decoding of raw responses into models and records"""
+    trades: bytes = binance.session.get(
+        binance.base_url + Private.my_trades,
+        params={"symbol": "BTCUSDT", "fromId": 0, "limit": 1000},
+    ).content
+    account: bytes = binance.session.get(binance.base_url + Private.account).content
+    tickers: bytes = binance.session.get(binance.base_url + Public.last_price).content
+    tickers_24h: bytes = binance.session.get(
+        binance.base_url + Public.ticker_24h
+    ).content
+    cases: Dict[str, Callable[[], object]] = {
+        "parse.trades_1000.pydantic": lambda: [
+            Trade(**item) for item in json.loads(trades)
+        ],
+        "parse.trades_1000.fast": lambda: FastTrade.from_list(
+            fast_models.loads(trades)
+        ),
+        "parse.account.pydantic": lambda: Account(**json.loads(account)),
+        "parse.account.fast": lambda: FastAccount.from_dict(
+            fast_models.loads(account)
+        ),
+        "parse.tickers_all": lambda: {
+            item["symbol"]: Ticker(**item) for item in fast_models.loads(tickers)
+        },
+        "parse.tickers_24h_all": lambda: {
+            item["symbol"]: Ticker24h(**item)
+            for item in fast_models.loads(tickers_24h)
+        },
+    }
+    for name, call in cases.items():
+        _record(results, name, _timeit(call, 10))
+
+
+def bench_account(results: Results, binance: Binance) -> None:
+    """Account requests against cache hits and order patches"""
+    order: Order = binance.create_order(
+        NewOrder(symbol="BTCUSDT", side="SELL", type_="L", qty=0.01, price=20000)
+    )
+    cache = binance.account_cache
+    cache.refresh()
+    _record(results, "account.request", _timeit(binance.get_account, 20))
+    _record(results, "account.cached", _timeit(cache.get, 20, 1000))
+    _record(
+        results,
+        "account.apply_order_cancel",
+        _timeit(lambda: (cache.apply_order(order), cache.apply_cancel(order)), 20, 100),
+    )
+
+
+def bench_orders(results: Results, binance: Binance) -> None:
+    """Exchange info download, reload from disk and local order checks"""
+    cache: ExchangeInfoCache = binance.exchange_info
+    _record(results, "exchange_info.download", _timeit(cache.refresh, 5))
+    _record(
+        results,
+        "exchange_info.load_file",
+        _timeit(lambda: ExchangeInfoCache(None, cache.path).get("BTCUSDT"), 5),
+    )
+    order = NewOrder(symbol="BTCUSDT", side="BUY", type_="L", qty=0.01, price=20000)
+    _record(
+        results,
+        "orders.prepare",
+        _timeit(lambda: binance.prepare_order(order), 20, 1000),
+    )
+
+
+def bench_profit(results: Results) -> None:
+    """The former _calc_profit and the profit engine at several sizes"""
+    for size in (1000, 2000):
+        trades: List[Trade] = make_trades(size)
+        _record(
+            results,
+            f"profit.legacy_{size}",
+            _timeit(lambda: legacy_calc_profit(trades, 30000.0), 3),
+        )
+    for size in (1000, 10_000, 100_000):
+        trades = make_trades(size)
+        _record(
+            results,
+            f"profit.engine_{size}",
+            _timeit(lambda: engine_calc_profit(trades, 30000.0, Basis.FIFO), 5),
+        )
+
+
+def bench_views(results: Results, binance: Binance) -> None:
+    """Rendering of the views, into a buffer"""
+    account: Account = binance.get_account()
+    balances: List[Balance] = binance.account_cache.balances()
+    ticker: Ticker24h = binance.tickers_24h.get("BTCUSDT")
+    orders: List[Order] = [
+        result.result
+        for result in binance.create_orders(
+            [
+                NewOrder(symbol="BTCUSDT", side="BUY", type_="L", qty=0.01, price=price)
+                for price in range(20000, 20050)
+            ]
+        )
+    ]
+    profits: List[Profit] = [
+        Profit(f"C{i:03d}USDT", 1.5, 100.0, 120.0, 5.0, 20.0) for i in range(100)
+    ]
+    cases: Dict[str, Callable[[], object]] = {
+        "views.show_account": lambda: views.show_account(account),
+        "views.show_balance": lambda: views.show_balance(balances),
+        "views.symbol_price": lambda: views.symbol_price(ticker, 30000.0),
+        "views.open_orders_50": lambda: views.open_orders(orders),
+        "views.profit_stats_100": lambda: views.profit_stats(profits),
+    }
+    # The rich console writes to sys.stdout, so it's captured too.
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings: Dict[str, float] = {
+            name: _timeit(call, 20) for name, call in cases.items()
+        }
+    for name, value in timings.items():
+        _record(results, name, value)
+    # The same views on a terminal, paging through every page.
+    console: Console = views.CONSOLE
+    views.CONSOLE = Console(file=io.StringIO(), force_terminal=True, width=120)
+    views.CONSOLE.input = lambda *_: ""
+    try:
+        for name, call in cases.items():
+            _record(results, f"{name}.tty", _timeit(call, 20))
+    finally:
+        views.CONSOLE = console
+
+
+def _answers(question_list: list) -> dict:
+    """Canned answers for the menu prompts"""
+    answers: dict = {
+        "pairs": ",".join(TRADED),
+        "symbol": "BTCUSDT",
+        "type": "LIMIT",
+        "side": "BUY",
+        "qty": "0.01",
+        "price": "20000",
+    }
+    return {question.name: answers[question.name] for question in question_list}
+
+
+def bench_menu(results: Results, binance: Binance, stream_url: str) -> None:
+    """
+    End-to-end menu actions, with the prompts answered and the
+    controller bound to the mock server. The first run of each action
+    is reported apart: it loads the user stream and the trade history.
+    """
+    # pylint: disable=import-outside-toplevel
+    import inquirer
+
+    import client
+    import controller
+    from async_binance import AsyncBinance
+    from market_stream import MarketStream
+    from profit import ProfitEngine
+    from user_stream import UserDataStream
+
+    market_stream = MarketStream(binance.get_depth, url=stream_url)
+    user_stream = UserDataStream(binance, url=stream_url)
+    client.configure(
+        binance=binance,
+        async_binance=AsyncBinance(binance),
+        profit_engine=ProfitEngine(),
+        market_stream=market_stream,
+        user_stream=user_stream,
+    )
+    inquirer.prompt = _answers
+    actions: Dict[str, Callable[[], None]] = {
+        "menu.account": controller.account_interface,
+        "menu.balance": controller.balance_interface,
+        "menu.price": controller.price_interface,
+        "menu.profit_stats": controller.profits_interface,
+        "menu.open_orders": controller.open_orders_interface,
+        "menu.new_order": controller.place_order_interface,
+    }
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings: Dict[str, tuple] = {
+                name: (_timeit(action, 1), _timeit(action, 10))
+                for name, action in actions.items()
+            }
+    finally:
+        market_stream.stop()
+        user_stream.stop()
+    for name, (cold, warm) in timings.items():
+        _record(results, f"{name}.cold", cold)
+        _record(results, f"{name}.warm", warm)
+
+
+def _commit() -> str:
+    """Short hash of the current commit"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: Results, baseline_path: str) -> None:
+    """
+    Print the change of every metric against a previous run.
+    :param results: Dict with the current results.
+    :param baseline_path: String with the path of the previous JSON.
+    :return: None.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline: dict = json.load(file)
+    print(f"\nAgainst {baseline['meta']['commit']} ({baseline_path}):")
+    for name, result in results.items():
+        before: Optional[dict] = baseline["results"].get(name)
+        if not before or not before["value"]:
+            continue
+        ratio: float = result["value"] / before["value"]
+        flag: str = "  REGRESSION" if ratio > TOLERANCE else ""
+        print(
+            f"{name:<40} {before['value']:>12,.1f} -> {result['value']:>12,.1f}"
+            f" {result['unit']}  x{ratio:.2f}{flag}"
+        )
+
+
+def main() -> None:
+    """
+    Run the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Mock server latency in ms"
+    )
+    parser.add_argument("--trades", type=int, default=10_000)
+    parser.add_argument("--output", help="JSON file, results/<commit>.json by default")
+    parser.add_argument("--compare", help="JSON file of a previous run")
+    args = parser.parse_args()
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as temp_dir, MockBinance(
+        args.latency / 1000, args.trades
+    ) as mock, ReplayServer([]) as replay, Binance(
+        base_url=mock.url,
+        trade_store=TradeStore(":memory:"),
+        exchange_info_path=path.join(temp_dir, "exchange_info.json"),
+    ) as binance:
+        bench_signing(results, binance)
+        bench_parsing(results, binance)
+        bench_account(results, binance)
+        bench_orders(results, binance)
+        bench_profit(results)
+        bench_views(results, binance)
+        bench_menu(results, binance, replay.url)
+    report: dict = {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "latency_ms": args.latency,
+            "trades": args.trades,
+        },
+        "results": results,
+    }
+    output: str = args.output or path.join(RESULTS_DIR, f"{_commit()}.json")
+    if path.dirname(output):
+        os.makedirs(path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
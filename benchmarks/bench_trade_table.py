@@ -0,0 +1,54 @@
+""" Portfolio-wide analytics over a columnar trade table """
+
+import time
+
+import numpy as np
+
+import stub_server  # pylint: disable=unused-import
+
+from trade_table import TradeTable
+
+FILLS: int = 2_000_000
+SYMBOLS: int = 500
+
+
+def make_table(fills: int = FILLS, symbols: int = SYMBOLS) -> TradeTable:
+    """
+    Build a random table.
+    :param fills: Int with the number of trades.
+    :param symbols: Int with the number of symbols.
+    :return: TradeTable object.
+    """
+    rng = np.random.default_rng(0)
+    price = rng.uniform(1, 100, fills)
+    qty = rng.uniform(0.1, 10, fills)
+    return TradeTable(
+        symbols=[f"COIN{code}USDT" for code in range(symbols)],
+        symbol_code=rng.integers(0, symbols, fills),
+        price=price,
+        qty=qty,
+        quote_qty=price * qty,
+        time=np.arange(fills, dtype=np.int64),
+        is_buyer=rng.random(fills) < 0.55,
+    )
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    table = make_table()
+    prices = {symbol: 50.0 for symbol in table.symbols}
+    start: float = time.perf_counter()
+    table.totals()
+    totals: float = time.perf_counter() - start
+    start = time.perf_counter()
+    profits = table.profits(prices)
+    report: float = time.perf_counter() - start
+    print(f"{FILLS:,} fills, {SYMBOLS} symbols")
+    print(f"totals:  {totals * 1000:8.1f} ms")
+    print(f"profits: {report * 1000:8.1f} ms ({len(profits)} symbols)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-call latency: one connection per call vs pooled keep-alive session.
+The stub server speaks plain HTTP, so only the TCP handshake is saved
+here; against the real API the TLS handshake is saved as well.
+"""
+
+import statistics
+import time
+from typing import Callable, List
+
+import requests
+
+from stub_server import StubServer
+
+from binance import Binance, Public
+
+CALLS: int = 500
+
+
+def _measure(call: Callable[[], object], calls: int = CALLS) -> List[float]:
+    samples: List[float] = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name: str, samples: List[float]) -> float:
+    mean: float = statistics.mean(samples) * 1e6
+    p99: float = sorted(samples)[int(len(samples) * 0.99)] * 1e6
+    print(f"{name:<12} mean {mean:8.1f} us   p99 {p99:8.1f} us")
+    return mean
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    with StubServer() as server:
+        url: str = server.url + Public.avg_price
+        params: dict = {"symbol": "BTCUSDT"}
+        fresh = _measure(lambda: requests.get(url, params=params, timeout=5).json())
+        with Binance(base_url=server.url) as binance:
+            pooled = _measure(lambda: binance._get_public(Public.avg_price, params))
+    before: float = _report("per-call", fresh)
+    after: float = _report("pooled", pooled)
+    print(f"latency drop: {(1 - after / before) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+User data stream against a mock stream server: open orders and
+balances read from local state vs polled over REST.
+"""
+
+import json
+import time
+from typing import List
+
+from stub_server import StubServer, default_routes
+from ws_replay import ReplayServer
+
+from binance import Binance
+from rate_limit import RateLimiter
+from trade_store import TradeStore
+from user_stream import UserDataStream
+
+ORDERS: int = 200
+READS: int = 200
+
+
+def _order(order_id: int, status: str = "NEW") -> dict:
+    return {
+        "symbol": "BTCUSDT",
+        "orderId": order_id,
+        "orderListId": -1,
+        "clientOrderId": f"client{order_id}",
+        "price": "30000.00",
+        "origQty": "0.01",
+        "executedQty": "0",
+        "cummulativeQuoteQty": "0",
+        "status": status,
+        "timeInForce": "GTC",
+        "type": "LIMIT",
+        "side": "BUY",
+        "time": 1,
+        "updateTime": 1,
+        "isWorking": True,
+    }
+
+
+def _account() -> dict:
+    return {
+        "makerCommission": 10,
+        "takerCommission": 10,
+        "buyerCommission": 0,
+        "sellerCommission": 0,
+        "canTrade": True,
+        "canWithdraw": True,
+        "canDeposit": True,
+        "updateTime": 1,
+        "accountType": "SPOT",
+        "balances": [{"asset": "USDT", "free": "1000.0", "locked": "0.0"}],
+        "permissions": ["SPOT"],
+    }
+
+
+def record() -> List[str]:
+    """
+    Events: every order filled, then a new USDT balance.
+    :return: List of JSON messages.
+    """
+    events: List[dict] = []
+    for order_id in range(ORDERS // 2):
+        order: dict = _order(order_id)
+        events.append(
+            {
+                "e": "executionReport",
+                "E": 2,
+                "s": order["symbol"],
+                "c": order["clientOrderId"],
+                "S": order["side"],
+                "o": order["type"],
+                "f": order["timeInForce"],
+                "q": order["origQty"],
+                "p": order["price"],
+                "X": "FILLED",
+                "i": order_id,
+                "z": order["origQty"],
+                "Z": "300",
+                "T": 2,
+                "g": -1,
+            }
+        )
+    events.append(
+        {
+            "e": "outboundAccountPosition",
+            "E": 3,
+            "u": 3,
+            "B": [{"a": "USDT", "f": "700.0", "l": "0.0"}],
+        }
+    )
+    return [json.dumps(event) for event in events]
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    routes = default_routes()
+    routes["/api/v3/userDataStream"] = lambda _: {"listenKey": "benchmark"}
+    routes["/api/v3/account"] = lambda _: _account()
+    routes["/api/v3/openOrders"] = lambda _: [_order(i) for i in range(ORDERS)]
+    with StubServer(routes, delay=0.002) as rest, ReplayServer(record()) as ws:
+        # Unlimited: polling every open order weighs 80, so the default
+        # limiter would make the polled reads mostly waits.
+        binance = Binance(
+            base_url=rest.url,
+            trade_store=TradeStore(":memory:"),
+            rate_limiter=RateLimiter(weight_limit=10**9),
+        )
+        start: float = time.perf_counter()
+        for _ in range(READS):
+            binance.get_open_orders()
+        polled: float = (time.perf_counter() - start) / READS
+        stream = UserDataStream(binance, url=ws.url)
+        stream.start()
+        while stream.balances.assets["USDT"].free != "700.0":
+            time.sleep(0.001)
+        start = time.perf_counter()
+        for _ in range(READS):
+            stream.get_open_orders()
+        local: float = (time.perf_counter() - start) / READS
+        remaining: int = len(stream.get_open_orders())
+        balance = stream.get_account().balances[0]
+        stream.stop()
+    print(f"open orders polled: {polled * 1e6:10.1f} us")
+    print(f"open orders local:  {local * 1e6:10.1f} us")
+    print(f"open orders after fills: {remaining}, {balance.asset}: {balance.free}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+""" Local mock of the Binance API with realistic payloads """
+
+import itertools
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from stub_server import Reply, Route, StubServer
+
+from binance import Private, Public
+
+QUOTES: Tuple[str, ...] = ("USDT", "BTC", "ETH", "BNB", "BUSD")
+COINS: Tuple[str, ...] = ("BTC", "ETH", "BNB", "XRP", "ADA", "SOL", "DOGE", "DOT")
+# About as many symbols as the real exchange lists.
+BASES: Tuple[str, ...] = COINS + tuple(f"C{i:03d}" for i in range(400 - len(COINS)))
+TRADED: Tuple[str, ...] = ("BTCUSDT", "ETHUSDT", "BNBUSDT")
+TRADES: int = 10_000
+START_TIME: int = 1_600_000_000_000
+
+
+def _fmt(value: float) -> str:
+    """Decimal string as sent by Binance"""
+    return f"{value:.8f}"
+
+
+class MockBinance(StubServer):
+    """
+    Stub server implementing the Public and Private endpoints.
+    Market data is generated once from a seed. Trade histories are
+    computed per id, so long histories don't take memory. Orders are
+    kept in memory, so they can be placed, listed and cancelled.
+    """
+
+    def __init__(
+        self,
+        delay: Union[float, Callable[[], float]] = 0.0,
+        trades: int = TRADES,
+        seed: int = 0,
+    ):
+        rand = random.Random(seed)
+        self.trades: int = trades
+        self.symbols: List[str] = [
+            base + quote for base in BASES for quote in QUOTES if base != quote
+        ]
+        self.prices: Dict[str, float] = {
+            symbol: rand.uniform(0.0001, 50000) for symbol in self.symbols
+        }
+        self.orders: Dict[Tuple[str, int], dict] = {}
+        self._order_ids = itertools.count(1)
+        self._lock: threading.Lock = threading.Lock()
+        super().__init__(self._routes(), delay)
+
+    def _routes(self) -> Dict[str, Route]:
+        return {
+            Public.ping: lambda _: {},
+            Public.time: lambda _: {"serverTime": int(time.time() * 1000)},
+            Public.avg_price: lambda q: {
+                "mins": 5,
+                "price": _fmt(self.prices[q["symbol"]]),
+            },
+            Public.last_price: self._ticker,
+            Public.ticker_24h: self._ticker_24h,
+            Public.depth: self._depth,
+            Public.exchange_info: self._exchange_info,
+            Public.candle: self._klines,
+            Private.account: self._account,
+            Private.my_trades: self._my_trades,
+            f"GET {Private.open_orders}": self._open_orders,
+            f"DELETE {Private.open_orders}": self._cancel_all,
+            f"GET {Private.order}": self._get_order,
+            f"POST {Private.order}": self._new_order,
+            f"DELETE {Private.order}": self._cancel_order,
+            Private.order_test: lambda _: {},
+            Private.cancel_replace: self._cancel_replace,
+            f"POST {Private.user_data_stream}": lambda _: {"listenKey": "mock"},
+            Private.user_data_stream: lambda _: {},
+        }
+
+    @staticmethod
+    def _error(code: int, msg: str, status: int = 400) -> Reply:
+        return Reply(status, {"code": code, "msg": msg})
+
+    def _ticker(self, params: dict) -> Union[dict, list]:
+        if "symbol" in params:
+            symbol: str = params["symbol"]
+            return {"symbol": symbol, "price": _fmt(self.prices[symbol])}
+        return [{"symbol": s, "price": _fmt(p)} for s, p in self.prices.items()]
+
+    def _one_ticker_24h(self, symbol: str) -> dict:
+        price: float = self.prices[symbol]
+        return {
+            "symbol": symbol,
+            "priceChange": _fmt(price * 0.01),
+            "priceChangePercent": "1.010",
+            "weightedAvgPrice": _fmt(price * 0.995),
+            "prevClosePrice": _fmt(price * 0.99),
+            "lastPrice": _fmt(price),
+            "lastQty": "0.01000000",
+            "bidPrice": _fmt(price * 0.9999),
+            "bidQty": "1.00000000",
+            "askPrice": _fmt(price * 1.0001),
+            "askQty": "1.00000000",
+            "openPrice": _fmt(price * 0.99),
+            "highPrice": _fmt(price * 1.02),
+            "lowPrice": _fmt(price * 0.97),
+            "volume": "12345.67800000",
+            "quoteVolume": _fmt(12345.678 * price),
+            "openTime": START_TIME,
+            "closeTime": START_TIME + 86_399_999,
+            "firstId": 1,
+            "lastId": 100_000,
+            "count": 100_000,
+        }
+
+    def _ticker_24h(self, params: dict) -> Union[dict, list]:
+        if "symbol" in params:
+            return self._one_ticker_24h(params["symbol"])
+        return [self._one_ticker_24h(symbol) for symbol in self.symbols]
+
+    def _depth(self, params: dict) -> dict:
+        price: float = self.prices[params["symbol"]]
+        limit: int = int(params.get("limit", 100))
+        step: float = price * 0.0001
+        return {
+            "lastUpdateId": 1000,
+            "bids": [[_fmt(price - step * i), "1.00000000"] for i in range(limit)],
+            "asks": [[_fmt(price + step * i), "1.00000000"] for i in range(limit)],
+        }
+
+    def _symbol_info(self, symbol: str, base: str, quote: str) -> dict:
+        tick: str = "0.01000000" if self.prices[symbol] >= 10 else "0.00000001"
+        return {
+            "symbol": symbol,
+            "status": "TRADING",
+            "baseAsset": base,
+            "baseAssetPrecision": 8,
+            "quoteAsset": quote,
+            "quotePrecision": 8,
+            "quoteAssetPrecision": 8,
+            "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT"],
+            "icebergAllowed": True,
+            "ocoAllowed": True,
+            "isSpotTradingAllowed": True,
+            "isMarginTradingAllowed": False,
+            "filters": [
+                {
+                    "filterType": "PRICE_FILTER",
+                    "minPrice": tick,
+                    "maxPrice": "1000000.00000000",
+                    "tickSize": tick,
+                },
+                {
+                    "filterType": "LOT_SIZE",
+                    "minQty": "0.00001000",
+                    "maxQty": "9000.00000000",
+                    "stepSize": "0.00001000",
+                },
+                {"filterType": "ICEBERG_PARTS", "limit": 10},
+                {
+                    "filterType": "MARKET_LOT_SIZE",
+                    "minQty": "0.00000000",
+                    "maxQty": "100.00000000",
+                    "stepSize": "0.00000000",
+                },
+                {
+                    "filterType": "NOTIONAL",
+                    "minNotional": "5.00000000",
+                    "applyMinToMarket": True,
+                    "maxNotional": "9000000.00000000",
+                    "applyMaxToMarket": False,
+                    "avgPriceMins": 5,
+                },
+                {"filterType": "MAX_NUM_ORDERS", "maxNumOrders": 200},
+            ],
+            "permissions": ["SPOT"],
+        }
+
+    def _exchange_info(self, _: dict) -> dict:
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [
+                {
+                    "rateLimitType": "REQUEST_WEIGHT",
+                    "interval": "MINUTE",
+                    "intervalNum": 1,
+                    "limit": 6000,
+                }
+            ],
+            "exchangeFilters": [],
+            "symbols": [
+                self._symbol_info(base + quote, base, quote)
+                for base in BASES
+                for quote in QUOTES
+                if base != quote
+            ],
+        }
+
+    def _klines(self, params: dict) -> list:
+        price: float = self.prices[params["symbol"]]
+        step: int = 60_000
+        start: int = max(int(params.get("startTime", START_TIME)), START_TIME)
+        start = -(-start // step) * step
+        end: int = min(int(params.get("endTime", 2**62)), int(time.time() * 1000))
+        limit: int = int(params.get("limit", 500))
+        return [
+            [
+                open_time,
+                _fmt(price),
+                _fmt(price * 1.01),
+                _fmt(price * 0.99),
+                _fmt(price),
+                "10.00000000",
+                open_time + step - 1,
+                _fmt(price * 10),
+                100,
+                "5.00000000",
+                _fmt(price * 5),
+                "0",
+            ]
+            for open_time in range(start, end + 1, step)[:limit]
+        ]
+
+    def _account(self, _: dict) -> dict:
+        return {
+            "makerCommission": 10,
+            "takerCommission": 10,
+            "buyerCommission": 0,
+            "sellerCommission": 0,
+            "canTrade": True,
+            "canWithdraw": True,
+            "canDeposit": True,
+            "brokered": False,
+            "requireSelfTradePrevention": False,
+            "updateTime": int(time.time() * 1000),
+            "accountType": "SPOT",
+            "balances": [
+                {
+                    "asset": asset,
+                    "free": _fmt(1.5) if asset in COINS + QUOTES else _fmt(0),
+                    "locked": _fmt(0),
+                }
+                for asset in dict.fromkeys(BASES + QUOTES)
+            ],
+            "permissions": ["SPOT"],
+        }
+
+    def _trade(self, symbol: str, id_: int) -> dict:
+        price: float = self.prices[symbol] * (1 + (id_ % 100 - 50) / 1000)
+        qty: float = 0.01 if id_ % 3 else 0.02
+        return {
+            "symbol": symbol,
+            "id": id_,
+            "orderId": id_,
+            "orderListId": -1,
+            "price": _fmt(price),
+            "qty": _fmt(qty),
+            "quoteQty": _fmt(price * qty),
+            "commission": _fmt(qty * 0.001),
+            "commissionAsset": symbol[:-4],
+            "time": START_TIME + id_ * 1000,
+            "isBuyer": bool(id_ % 3),
+            "isMaker": bool(id_ % 2),
+            "isBestMatch": True,
+        }
+
+    def _my_trades(self, params: dict) -> Union[list, Reply]:
+        symbol: str = params["symbol"]
+        if symbol not in self.prices:
+            return self._error(-1121, "Invalid symbol.")
+        if symbol not in TRADED:
+            return []
+        limit: int = int(params.get("limit", 500))
+        if "fromId" in params:
+            first: int = int(params["fromId"])
+        elif "startTime" in params:
+            first = (int(params["startTime"]) - START_TIME) // 1000
+        else:
+            first = self.trades - limit
+        ids: range = range(max(first, 0), min(first + limit, self.trades))
+        return [self._trade(symbol, id_) for id_ in ids]
+
+    def _order(
+        self, params: dict, status: str, client_order_id: Optional[str] = None
+    ) -> dict:
+        symbol: str = params["symbol"]
+        price: float = float(params.get("price") or self.prices[symbol])
+        qty: float = float(params["quantity"])
+        filled: bool = status == "FILLED"
+        return {
+            "symbol": symbol,
+            "orderId": next(self._order_ids),
+            "orderListId": -1,
+            "clientOrderId": client_order_id or f"mock{time.monotonic_ns()}",
+            "transactTime": int(time.time() * 1000),
+            "price": _fmt(price if params["type"] == "LIMIT" else 0),
+            "origQty": _fmt(qty),
+            "executedQty": _fmt(qty if filled else 0),
+            "cummulativeQuoteQty": _fmt(qty * price if filled else 0),
+            "status": status,
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "type": params["type"],
+            "side": params["side"],
+            "workingTime": int(time.time() * 1000),
+            "fills": [
+                {
+                    "price": _fmt(price),
+                    "qty": _fmt(qty),
+                    "commission": _fmt(qty * 0.001),
+                    "commissionAsset": symbol[:-4],
+                    "tradeId": 1,
+                }
+            ]
+            if filled
+            else [],
+            "selfTradePreventionMode": "NONE",
+        }
+
+    def _new_order(self, params: dict) -> Union[dict, Reply]:
+        if params.get("symbol") not in self.prices:
+            return self._error(-1121, "Invalid symbol.")
+        status: str = "NEW" if params["type"] == "LIMIT" else "FILLED"
+        order: dict = self._order(params, status, params.get("newClientOrderId"))
+        if status == "NEW":
+            with self._lock:
+                self.orders[(order["symbol"], order["orderId"])] = order
+        return order
+
+    def _find(self, params: dict) -> Optional[dict]:
+        with self._lock:
+            for (symbol, order_id), order in self.orders.items():
+                if symbol == params["symbol"] and (
+                    str(order_id) == params.get("orderId")
+                    or order["clientOrderId"] == params.get("origClientOrderId")
+                ):
+                    return order
+        return None
+
+    def _get_order(self, params: dict) -> Union[dict, Reply]:
+        order: Optional[dict] = self._find(params)
+        return order or self._error(-2013, "Order does not exist.")
+
+    def _cancel_order(self, params: dict) -> Union[dict, Reply]:
+        order: Optional[dict] = self._find(params)
+        if order is None:
+            return self._error(-2011, "Unknown order sent.")
+        with self._lock:
+            self.orders.pop((order["symbol"], order["orderId"]), None)
+        return {**order, "status": "CANCELED"}
+
+    def _open_orders(self, params: dict) -> list:
+        with self._lock:
+            return [
+                order
+                for (symbol, _), order in self.orders.items()
+                if params.get("symbol", symbol) == symbol
+            ]
+
+    def _cancel_all(self, params: dict) -> Union[list, Reply]:
+        with self._lock:
+            keys: list = [key for key in self.orders if key[0] == params["symbol"]]
+            cancelled: list = [
+                {**self.orders.pop(key), "status": "CANCELED"} for key in keys
+            ]
+        return cancelled or self._error(-2011, "Unknown order sent.")
+
+    def _cancel_replace(self, params: dict) -> Union[dict, Reply]:
+        cancelled = self._cancel_order(
+            {"symbol": params["symbol"], "orderId": params.get("cancelOrderId")}
+        )
+        if isinstance(cancelled, Reply):
+            data: dict = {
+                "cancelResult": "FAILURE",
+                "newOrderResult": "NOT_ATTEMPTED",
+                "cancelResponse": cancelled.payload,
+                "newOrderResponse": None,
+            }
+            return Reply(
+                400,
+                {"code": -2022, "msg": "Order cancel-replace failed.", "data": data},
+            )
+        return {
+            "cancelResult": "SUCCESS",
+            "newOrderResult": "SUCCESS",
+            "cancelResponse": cancelled,
+            "newOrderResponse": self._new_order(params),
+        }
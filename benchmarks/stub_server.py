@@ -0,0 +1,126 @@
+""" Local stub of the Binance HTTP API for benchmarks """
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import environ, path
+from typing import Callable, Dict, NamedTuple, Union
+from urllib import parse
+
+SRC_DIR: str = path.join(path.dirname(path.dirname(path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# Dummy keys so the client can be built without an .env file.
+environ.setdefault("API_KEY", "benchmark")
+environ.setdefault("SECRET_KEY", "benchmark")
+
+Route = Callable[[dict], object]
+
+
+class Reply(NamedTuple):
+    """
+    Route result with an explicit status and headers.
+    A bytes payload is sent as is, e.g. a gateway's HTML error page.
+    """
+
+    status: int
+    payload: object
+    headers: dict = {}
+
+
+def default_routes() -> Dict[str, Route]:
+    """
+    Minimal payloads for the endpoints used by the client.
+    :return: Dict of path or "METHOD path" -> callable(params) -> payload.
+    """
+    return {
+        "/api/v3/ping": lambda _: {},
+        "/api/v3/time": lambda _: {"serverTime": int(time.time() * 1000)},
+        "/api/v3/avgPrice": lambda _: {"mins": 5, "price": "30000.00"},
+        "/api/v3/ticker/price": lambda q: {
+            "symbol": q.get("symbol", "BTCUSDT"),
+            "price": "30000.00",
+        },
+    }
+
+
+class StubServer:
+    """
+    Threaded HTTP/1.1 server answering with canned JSON payloads.
+    Keep-alive is supported, so pooled clients can reuse connections.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Route] = None,
+        delay: Union[float, Callable[[], float]] = 0.0,
+    ):
+        self.routes: Dict[str, Route] = routes or default_routes()
+        # Seconds to wait before each reply, or a callable returning them.
+        self.delay: Union[float, Callable[[], float]] = delay
+        self.httpd: ThreadingHTTPServer = ThreadingHTTPServer(
+            ("127.0.0.1", 0), self._handler()
+        )
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler"""
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _reply(self) -> None:
+                url = parse.urlsplit(self.path)
+                params = dict(parse.parse_qsl(url.query))
+                # "METHOD /path" routes take precedence over "/path" ones.
+                route = server.routes.get(f"{self.command} {url.path}")
+                route = route or server.routes.get(url.path)
+                delay = server.delay() if callable(server.delay) else server.delay
+                if delay:
+                    time.sleep(delay)
+                if route is None:
+                    reply = Reply(404, {"code": -1, "msg": "Not found"})
+                else:
+                    reply = route(params)
+                    if not isinstance(reply, Reply):
+                        reply = Reply(200, reply)
+                if isinstance(reply.payload, bytes):
+                    body, content_type = reply.payload, "text/html"
+                else:
+                    body = json.dumps(reply.payload).encode()
+                    content_type = "application/json"
+                self.send_response(reply.status)
+                for name, value in reply.headers.items():
+                    self.send_header(name, str(value))
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
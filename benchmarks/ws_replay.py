@@ -0,0 +1,142 @@
+""" Local WebSocket stand-in that replays recorded stream messages """
+
+import base64
+import hashlib
+import socket
+import struct
+import threading
+from typing import List
+
+GUID: bytes = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Unmasked server frame"""
+    header = bytes([0x80 | opcode])
+    size = len(payload)
+    if size < 126:
+        header += bytes([size])
+    elif size < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", size)
+    else:
+        header += bytes([127]) + struct.pack("!Q", size)
+    return header + payload
+
+
+def _read_frame(conn: socket.socket) -> tuple:
+    """Read a masked client frame: (opcode, payload)"""
+    head = conn.recv(2, socket.MSG_WAITALL)
+    if len(head) < 2:
+        return 0x8, b""
+    opcode, size = head[0] & 0x0F, head[1] & 0x7F
+    if size == 126:
+        size = struct.unpack("!H", conn.recv(2, socket.MSG_WAITALL))[0]
+    elif size == 127:
+        size = struct.unpack("!Q", conn.recv(8, socket.MSG_WAITALL))[0]
+    mask = conn.recv(4, socket.MSG_WAITALL) if head[1] & 0x80 else b"\0\0\0\0"
+    data = conn.recv(size, socket.MSG_WAITALL) if size else b""
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class ReplayServer:
+    """
+    Minimal RFC 6455 server. Each client gets the recorded messages
+    as text frames, then the connection is kept open until closed.
+    The paths requested and the frames sent by the clients (e.g.
+    SUBSCRIBE) are recorded. More messages can be pushed, and the
+    connections dropped, to test reconnections.
+    """
+
+    def __init__(self, messages: List[str]):
+        self.messages: List[str] = messages
+        self.received: List[str] = []
+        self.paths: List[str] = []
+        self.sock: socket.socket = socket.create_server(("127.0.0.1", 0))
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self._clients: List[socket.socket] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        host, port = self.sock.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._client, args=(conn,), daemon=True).start()
+
+    def send(self, messages: List[str]) -> None:
+        """
+        Send messages to the connected clients.
+        :param messages: List of text messages.
+        :return: None.
+        """
+        data = b"".join(_frame(m.encode()) for m in messages)
+        with self._lock:
+            for conn in self._clients:
+                conn.sendall(data)
+
+    def drop(self) -> None:
+        """
+        Close the client connections without a close frame.
+        :return: None.
+        """
+        with self._lock:
+            for conn in self._clients:
+                conn.shutdown(socket.SHUT_RDWR)
+            self._clients = []
+
+    def _client(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                self._handle(conn)
+            except OSError:
+                # Dropped.
+                pass
+        with self._lock:
+            if conn in self._clients:
+                self._clients.remove(conn)
+
+    def _handle(self, conn: socket.socket) -> None:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        key = next(
+            line.split(b":", 1)[1].strip()
+            for line in request.split(b"\r\n")
+            if line.lower().startswith(b"sec-websocket-key")
+        )
+        accept = base64.b64encode(hashlib.sha1(key + GUID).digest())
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        with self._lock:
+            conn.sendall(b"".join(_frame(m.encode()) for m in self.messages))
+            self.paths.append(request.split(b" ", 2)[1].decode())
+            self._clients.append(conn)
+        while True:
+            opcode, payload = _read_frame(conn)
+            if opcode == 0x8:
+                conn.sendall(_frame(b"", 0x8))
+                return
+            if opcode == 0x9:
+                conn.sendall(_frame(payload, 0xA))
+            elif opcode == 0x1:
+                self.received.append(payload.decode())
+
+    def __enter__(self) -> "ReplayServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.sock.close()
@@ -0,0 +1,201 @@
+""" Account cache """
+
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from constants import ACCOUNT_TTL
+from models import Account, Balance, Order
+from ttl_cache import TtlCache
+
+OPEN_STATUSES: Tuple[str, ...] = ("NEW", "PARTIALLY_FILLED")
+
+# Base and quote assets of a symbol, None if it's unknown.
+AssetsLookup = Callable[[str], Optional[Tuple[str, str]]]
+
+
+def is_non_zero(balance: Balance) -> bool:
+    """
+    Check if a balance has free or locked funds.
+    :param balance: Balance object.
+    :return: True if it isn't empty.
+    """
+    return float(balance.free) > 0 or float(balance.locked) > 0
+
+
+def _amount(value: float) -> str:
+    """Format an amount like the API does"""
+    return f"{value:.8f}"
+
+
+class BalanceTable:
+    """
+    Balances by asset, with the non-zero ones kept precomputed so
+    they can be listed without scanning every asset.
+    """
+
+    def __init__(self, balances: Iterable[Balance] = ()):
+        self.assets: Dict[str, Balance] = {}
+        self.non_zero: Dict[str, Balance] = {}
+        for balance in balances:
+            self.set(balance)
+
+    def get(self, asset: str) -> Optional[Balance]:
+        """
+        Get the balance of an asset.
+        :param asset: String with the asset.
+        :return: Balance object, None if the asset is unknown.
+        """
+        return self.assets.get(asset)
+
+    def set(self, balance: Balance) -> None:
+        """
+        Add or replace the balance of an asset.
+        :param balance: Balance object.
+        :return: None.
+        """
+        self.assets[balance.asset] = balance
+        if is_non_zero(balance):
+            self.non_zero[balance.asset] = balance
+        else:
+            self.non_zero.pop(balance.asset, None)
+
+
+class AccountCache(TtlCache[Account]):
+    """
+    Account snapshot, reused for `ttl` seconds.
+    Orders placed and cancelled through the client patch the balances
+    with their fills and locked amounts, so the snapshot stays usable
+    until it expires. The base and quote assets of the orders are
+    looked up with `assets`, e.g. from the exchange info.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Account],
+        assets: AssetsLookup,
+        ttl: float = ACCOUNT_TTL,
+    ):
+        super().__init__(fetch, ttl)
+        self._assets: AssetsLookup = assets
+        self._account: Optional[Account] = None
+        self._balances: BalanceTable = BalanceTable()
+        # Set when the balances were patched after the account was built.
+        self._patched: bool = False
+
+    def _store(self, data: Account) -> None:
+        self._account = data
+        self._patched = False
+        self._balances = BalanceTable(data.balances)
+
+    def get(self) -> Account:
+        """
+        Get the account, refreshing it if it's stale.
+        :return: Account object.
+        """
+        self._ensure()
+        with self._lock:
+            if self._patched:
+                self._account = self._account.copy(
+                    update={"balances": list(self._balances.assets.values())}
+                )
+                self._patched = False
+            return self._account
+
+    def balances(self) -> List[Balance]:
+        """
+        Get the balances with free or locked funds.
+        :return: List of Balance object.
+        """
+        self._ensure()
+        with self._lock:
+            return list(self._balances.non_zero.values())
+
+    def _split(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """
+        Base and quote assets of a symbol. Called without the lock,
+        the lookup may download the exchange info.
+        """
+        try:
+            return self._assets(symbol)
+        except (Exception, SystemExit):  # pylint: disable=broad-except
+            # The client exits on bad responses: refresh instead of patching.
+            return None
+
+    @staticmethod
+    def _locked(order: Order, base: str, quote: str) -> Tuple[str, float]:
+        """Asset and amount locked by the open part of an order"""
+        remaining: float = float(order.orig_qty or 0) - float(order.executed_qty)
+        if order.side == "BUY":
+            return quote, remaining * float(order.price)
+        return base, remaining
+
+    def _patch(self, changes: Dict[str, List[float]]) -> None:
+        """
+        Add [free, locked] changes per asset to the snapshot.
+        Unknown assets or negative results mean the snapshot is behind
+        the exchange, so it's refreshed on the next lookup instead.
+        """
+        patched: Dict[str, Balance] = {}
+        for asset, (free, locked) in changes.items():
+            balance: Optional[Balance] = self._balances.get(asset)
+            if balance is None:
+                self.updated_at = None
+                return
+            free += float(balance.free)
+            locked += float(balance.locked)
+            if min(free, locked) < -1e-8:
+                self.updated_at = None
+                return
+            patched[asset] = balance.copy(
+                update={"free": _amount(free), "locked": _amount(locked)}
+            )
+        for balance in patched.values():
+            self._balances.set(balance)
+        self._patched = True
+
+    def apply_order(self, order: Order) -> None:
+        """
+        Patch the balances with a new order: its fills move funds
+        between the base, quote and commission assets, and the open
+        part locks funds. When that can't be worked out from the order,
+        the next lookup refreshes the snapshot instead.
+        :param order: Order object, as returned when it was placed.
+        :return: None.
+        """
+        if self._account is None:
+            return
+        split: Optional[Tuple[str, str]] = self._split(order.symbol)
+        with self._lock:
+            if split is None or (float(order.executed_qty) and not order.fills):
+                self.updated_at = None
+                return
+            base, quote = split
+            sign: float = 1.0 if order.side == "BUY" else -1.0
+            changes: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+            for fill in order.fills or []:
+                qty: float = float(fill.qty)
+                changes[base][0] += sign * qty
+                changes[quote][0] -= sign * qty * float(fill.price)
+                changes[fill.commission_asset][0] -= float(fill.commission)
+            if order.status in OPEN_STATUSES:
+                asset, amount = self._locked(order, base, quote)
+                changes[asset][0] -= amount
+                changes[asset][1] += amount
+            self._patch(changes)
+
+    def apply_cancel(self, order: Order) -> None:
+        """
+        Patch the balances with a cancelled order, releasing the funds
+        locked by its open part.
+        :param order: Order object, as returned when it was cancelled.
+        :return: None.
+        """
+        if self._account is None:
+            return
+        split: Optional[Tuple[str, str]] = self._split(order.symbol)
+        with self._lock:
+            if split is None:
+                self.updated_at = None
+                return
+            asset, amount = self._locked(order, *split)
+            self._patch({asset: [amount, -amount]})
@@ -0,0 +1,161 @@
+""" Several accounts, each served by its own worker process """
+
+import json
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from constants import ACCOUNT_TRADES_DB_PATH, ACCOUNTS_PATH
+
+# pylint: disable=import-outside-toplevel
+
+# Account names are used in file names.
+NAME = re.compile(r"^[\w-]+$")
+# Error building the client of this worker process, raised by every call.
+_startup_error: Optional[Exception] = None
+
+
+class AccountConfig(NamedTuple):
+    """
+    Keys of an account: secret_key for HMAC keys, or the PEM file of
+    an Ed25519 or RSA key. The host (e.g. the testnet) and the trade
+    history file can be set too.
+    """
+
+    name: str
+    api_key: str
+    secret_key: Optional[str] = None
+    private_key_path: Optional[str] = None
+    private_key_password: Optional[str] = None
+    base_url: Optional[str] = None
+    trades_db: Optional[str] = None
+
+
+class AccountResults(NamedTuple):
+    """Result of each account, and the error of those that failed"""
+
+    results: Dict[str, Any]
+    errors: Dict[str, str]
+
+
+def load_accounts(path: str = ACCOUNTS_PATH) -> List[AccountConfig]:
+    """
+    Read the accounts file, a JSON object like:
+    {"accounts": [{"name": "main", "api_key": "...", "secret_key": "..."}]}
+    :param path: String with the path of the file.
+    :return: List of AccountConfig object.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data: dict = json.load(file)
+    accounts: List[AccountConfig] = []
+    for item in data["accounts"]:
+        try:
+            config = AccountConfig(**item)
+        except TypeError as ex:
+            raise ValueError(f"Invalid account in {path}: {ex}") from ex
+        if not NAME.match(config.name):
+            raise ValueError(f"Invalid account name: {config.name!r}")
+        if not (config.secret_key or config.private_key_path):
+            raise ValueError(f"No secret_key or private_key_path for {config.name}")
+        accounts.append(config)
+    if len({config.name for config in accounts}) < len(accounts):
+        raise ValueError(f"Duplicated account names in {path}")
+    return accounts
+
+
+def _start_worker(config: AccountConfig) -> None:
+    """
+    Build the shared client of the worker process, for its account.
+    Each account has its own trade history, connection pool and rate
+    limiter. Order limits are per account; request weight is counted
+    per IP, and each limiter follows it through the used weight header.
+    """
+    global _startup_error  # pylint: disable=global-statement
+    import client
+    from binance import Binance
+    from signer import HmacSigner, Signer, load_private_key
+    from trade_store import TradeStore
+
+    try:
+        signer: Signer = (
+            load_private_key(config.private_key_path, config.private_key_password)
+            if config.private_key_path
+            else HmacSigner(config.secret_key)
+        )
+        client.configure(
+            binance=Binance(
+                base_url=config.base_url,
+                api_key=config.api_key,
+                signer=signer,
+                trade_store=TradeStore(
+                    config.trades_db or ACCOUNT_TRADES_DB_PATH.format(name=config.name)
+                ),
+            )
+        )
+    except Exception as ex:  # pylint: disable=broad-except
+        # A failing initializer breaks the pool without saying why.
+        _startup_error = ex
+
+
+def _call(func: Callable[..., Any], *args: Any) -> Any:
+    """Call a function in a worker process, if its client was built"""
+    if _startup_error is not None:
+        raise _startup_error
+    return func(*args)
+
+
+class AccountPool:
+    """
+    One single worker process per account, started on first use and
+    kept with its client warm until closed. Calls run on every account
+    at once, so they take as long as the slowest account.
+    """
+
+    def __init__(self, accounts: List[AccountConfig]):
+        if not accounts:
+            raise ValueError("No accounts")
+        self.executors: Dict[str, ProcessPoolExecutor] = {
+            config.name: ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_start_worker,
+                initargs=(config,),
+            )
+            for config in accounts
+        }
+
+    def __enter__(self) -> "AccountPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def run(self, func: Callable[..., Any], *args: Any) -> AccountResults:
+        """
+        Call a function in every account process.
+        :param func: Module level function, so it can be pickled.
+        :param args: Arguments of the function.
+        :return: AccountResults object.
+        """
+        futures: Dict[str, Future] = {
+            name: executor.submit(_call, func, *args)
+            for name, executor in self.executors.items()
+        }
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except SystemExit as ex:
+                # Raised by the client on bad responses.
+                errors[name] = f"exit {ex.code}"
+            except Exception as ex:  # pylint: disable=broad-except
+                errors[name] = f"{type(ex).__name__}: {ex}"
+        return AccountResults(results, errors)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        :return: None.
+        """
+        for executor in self.executors.values():
+            executor.shutdown(cancel_futures=True)
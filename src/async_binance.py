@@ -0,0 +1,206 @@
+""" Asyncio Binance client """
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from binance import Binance
+from constants import POOL_SIZE
+from models import (
+    Account,
+    AvgPrice,
+    CancelReplaceResult,
+    NewOrder,
+    Order,
+    OrderResult,
+    Response,
+    Ticker,
+    Ticker24h,
+    Trade,
+)
+
+if TYPE_CHECKING:
+    from klines import Klines
+
+T = TypeVar("T")
+
+
+class AsyncBinance:
+    """
+    Asyncio counterpart of Binance, with the same method surface.
+    Calls run on a bounded worker pool that shares the pooled session,
+    clock and signing of the wrapped Binance client, so at most
+    `concurrency` requests are in flight at once.
+    """
+
+    def __init__(
+        self, binance: Optional[Binance] = None, concurrency: int = POOL_SIZE
+    ):
+        self.binance: Binance = binance or Binance(pool_size=concurrency)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="binance"
+        )
+
+    async def __aenter__(self) -> "AsyncBinance":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the workers and close the wrapped client.
+        :return: None.
+        """
+        self._executor.shutdown(wait=True)
+        self.binance.close()
+
+    async def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking call on the worker pool.
+        :param func: Callable, e.g. a bound method of the wrapped client.
+        :return: The result of the call.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def get_server_time(self) -> int:
+        """Async Binance.get_server_time"""
+        return await self.call(self.binance.get_server_time)
+
+    async def get_avg_price(self, symbol: str) -> AvgPrice:
+        """Async Binance.get_avg_price"""
+        return await self.call(self.binance.get_avg_price, symbol)
+
+    async def get_latest_price(self, symbol: str) -> Ticker:
+        """Async Binance.get_latest_price"""
+        return await self.call(self.binance.get_latest_price, symbol)
+
+    async def get_all_prices(self) -> Dict[str, Ticker]:
+        """Async Binance.get_all_prices"""
+        return await self.call(self.binance.get_all_prices)
+
+    async def get_all_tickers_24h(self) -> Dict[str, Ticker24h]:
+        """Async Binance.get_all_tickers_24h"""
+        return await self.call(self.binance.get_all_tickers_24h)
+
+    async def get_candlesticks(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        start_time: int = 0,
+        end_time: Optional[int] = None,
+    ) -> "Klines":
+        """Async Binance.get_candlesticks"""
+        return await self.call(
+            self.binance.get_candlesticks, symbol, interval, start_time, end_time
+        )
+
+    async def get_account(self) -> Account:
+        """Async Binance.get_account"""
+        return await self.call(self.binance.get_account)
+
+    async def get_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Trade]:
+        """Async Binance.get_trades"""
+        return await self.call(self.binance.get_trades, symbol, start_time, end_time)
+
+    async def iter_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        from_id: int = 0,
+    ) -> AsyncIterator[List[Trade]]:
+        """Async Binance.iter_trades"""
+        batches = await self.call(
+            self.binance.iter_trades, symbol, start_time, end_time, from_id
+        )
+        while True:
+            batch: Optional[List[Trade]] = await self.call(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+
+    async def get_open_orders(self) -> List[Order]:
+        """Async Binance.get_open_orders"""
+        return await self.call(self.binance.get_open_orders)
+
+    async def cancel_open_order(self, symbol: str, order_id: int) -> Order:
+        """Async Binance.cancel_open_order"""
+        return await self.call(self.binance.cancel_open_order, symbol, order_id)
+
+    async def create_order(self, order: NewOrder) -> Order:
+        """Async Binance.create_order"""
+        return await self.call(self.binance.create_order, order)
+
+    async def get_order(
+        self, symbol: str, client_order_id: str
+    ) -> Union[Order, Response]:
+        """Async Binance.get_order"""
+        return await self.call(self.binance.get_order, symbol, client_order_id)
+
+    async def create_orders(self, orders: List[NewOrder]) -> List[OrderResult]:
+        """Async Binance.create_orders"""
+        return await self.call(self.binance.create_orders, orders)
+
+    async def cancel_all_orders(self, symbol: str) -> Union[List[Order], Response]:
+        """Async Binance.cancel_all_orders"""
+        return await self.call(self.binance.cancel_all_orders, symbol)
+
+    async def cancel_replace(
+        self, order_id: int, order: NewOrder, mode: str = "STOP_ON_FAILURE"
+    ) -> CancelReplaceResult:
+        """Async Binance.cancel_replace"""
+        return await self.call(self.binance.cancel_replace, order_id, order, mode)
+
+    @staticmethod
+    async def gather(*calls: Awaitable[Any]) -> List[Any]:
+        """
+        Run independent calls concurrently.
+        :param calls: Awaitables, e.g. `client.get_avg_price("BTCUSDT")`.
+        :return: List with the results, in the same order.
+        """
+        return list(await asyncio.gather(*calls))
+
+    @staticmethod
+    async def map_symbols(
+        method: Callable[[str], Awaitable[T]], symbols: Iterable[str]
+    ) -> Dict[str, T]:
+        """
+        Fan out a per-symbol call over many symbols.
+        :param method: Async method taking a symbol, e.g. `client.get_trades`.
+        :param symbols: Iterable of symbols.
+        :return: Dict of symbol -> result, in the given order.
+        """
+        symbols = list(symbols)
+        results: List[T] = await asyncio.gather(*map(method, symbols))
+        return dict(zip(symbols, results))
+
+    @staticmethod
+    def run(call: Awaitable[T]) -> T:
+        """
+        Sync facade: run a call to completion from blocking code.
+        :param call: Awaitable, e.g. `client.map_symbols(...)`.
+        :return: The result of the call.
+        """
+        return asyncio.run(call)
@@ -1,22 +1,110 @@
 """ Binance API functions """
 
-import hashlib
-import hmac
+import functools
 import sys
+import threading
+import time
+import uuid
+from decimal import Decimal
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain
 from os import environ
-from typing import Callable, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from urllib import parse
 
 import pydantic
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
-from models import Account, AvgPrice, NewOrder, Order, Response, Ticker, Trade
+from account_cache import AccountCache
+from clock import ServerClock
+from constants import (
+    ACCOUNT_TTL,
+    API_HOSTS,
+    API_KEY_HEADER,
+    CONNECT_TIMEOUT,
+    DEPTH_SNAPSHOT_LIMIT,
+    EXCHANGE_INFO_PATH,
+    HEDGE_DEFAULT_DELAY,
+    KLINE_INTERVALS,
+    KLINES_PAGE_LIMIT,
+    ORDER_RETRIES,
+    POOL_SIZE,
+    PRICE_TTL,
+    RATE_LIMIT_RETRIES,
+    READ_TIMEOUT,
+    TICKER_24H_TTL,
+    TIMESTAMP_ERROR_CODE,
+    TRADES_PAGE_LIMIT,
+)
+from exchange_info import (
+    FILTER_FAILURE,
+    INVALID_SYMBOL,
+    ExchangeInfoCache,
+    SymbolRules,
+)
+from fast_models import FastAccount, FastOrder, FastTrade, loads
+from hosts import HostSelector
+from metrics import Metrics
+from models import (
+    Account,
+    AvgPrice,
+    CancelReplaceResult,
+    NewOrder,
+    Order,
+    OrderResult,
+    Response,
+    Ticker,
+    Ticker24h,
+    Trade,
+)
+from price_cache import PriceCache
+from rate_limit import (
+    USED_WEIGHT_HEADER,
+    Priority,
+    RateLimiter,
+    is_order,
+    request_weight,
+)
+from signer import Signer, signer_from_env
+from trade_store import TradeStore
 
-load_dotenv()
+if TYPE_CHECKING:
+    import numpy as np
 
-TIMEOUT: int = 30
-API_KEY_HEADER: str = "X-MBX-APIKEY"
+    from klines import KlineCache, Klines
+
+# numpy is loaded with the candlesticks, on first use.
+# pylint: disable=import-outside-toplevel
+
+
+@functools.lru_cache(maxsize=None)
+def load_env() -> None:
+    """
+    Read the .env file into the environment, once.
+    It's done when the first client is built, not on import.
+    :return: None.
+    """
+    load_dotenv()
+
+
+def _format_number(value: float) -> str:
+    """
+    Write a number in plain decimal notation, as the API expects.
+    E.g. 1e-05 is sent as 0.00001.
+    """
+    return format(Decimal(str(value)), "f")
 
 
 class Public:
@@ -27,7 +115,10 @@ class Public:
 
     avg_price: str = "/api/v3/avgPrice"
     candle: str = "/api/v3/klines"
+    depth: str = "/api/v3/depth"
+    exchange_info: str = "/api/v3/exchangeInfo"
     last_price: str = "/api/v3/ticker/price"
+    ping: str = "/api/v3/ping"
     ticker_24h: str = "/api/v3/ticker/24hr"
     time: str = "/api/v3/time"
 
@@ -43,6 +134,8 @@ class Private:
     open_orders: str = "/api/v3/openOrders"
     order: str = "/api/v3/order"
     order_test: str = "/api/v3/order/test"
+    cancel_replace: str = "/api/v3/order/cancelReplace"
+    user_data_stream: str = "/api/v3/userDataStream"
 
 
 class Binance:
@@ -50,47 +143,339 @@ class Binance:
     Binance HTTP API v3
     """
 
-    def __init__(self):
-        self.base_url: str = "https://api3.binance.com"
-        self.api_key: str = environ["API_KEY"]
-        self.secret_key: str = environ["SECRET_KEY"]
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        hosts: Sequence[str] = API_HOSTS,
+        hedge: bool = False,
+        pool_size: int = POOL_SIZE,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        trade_store: Optional[TradeStore] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        fast: bool = False,
+        signer: Optional[Signer] = None,
+        exchange_info_path: str = EXCHANGE_INFO_PATH,
+        api_key: Optional[str] = None,
+    ):
+        self.hosts: HostSelector = HostSelector([base_url] if base_url else hosts)
+        self.hedge: bool = hedge
+        load_env()
+        # The keys of another account can be given, e.g. by accounts.py.
+        self.api_key: str = api_key or environ["API_KEY"]
+        # HMAC with SECRET_KEY, or an Ed25519 / RSA key from PRIVATE_KEY_PATH.
+        self.signer: Signer = signer or signer_from_env()
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.session: requests.Session = self._new_session(
+            pool_size, len(self.hosts.stats)
+        )
+        self._hedge_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="hedge"
+        )
+        # Separate pool, order lookups may be hedged.
+        self._order_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="order"
+        )
+        self.clock: ServerClock = ServerClock(self.get_server_time)
+        # Decode trades, orders and the account into compact records.
+        self.fast: bool = fast
+        self.trade_store: TradeStore = trade_store or TradeStore(fast=fast)
+        self.prices: PriceCache[Ticker] = PriceCache(self.get_all_prices, PRICE_TTL)
+        self.tickers_24h: PriceCache[Ticker24h] = PriceCache(
+            self.get_all_tickers_24h, TICKER_24H_TTL
+        )
+        self._kline_cache: Optional["KlineCache"] = None
+        self._kline_lock: threading.Lock = threading.Lock()
+        self.exchange_info: ExchangeInfoCache = ExchangeInfoCache(
+            self.get_exchange_info, exchange_info_path
+        )
+        # Patched by the orders placed and cancelled below.
+        self.account_cache: AccountCache = AccountCache(
+            self.get_account, self.exchange_info.assets, ACCOUNT_TTL
+        )
+        self.rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.metrics: Metrics = Metrics()
+
+    def __enter__(self) -> "Binance":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
-    def _get_url(self, endpoint: str) -> str:
+    @staticmethod
+    def _new_session(pool_size: int, hosts: int = 1) -> requests.Session:
         """
-        Return a URL for a given endpoint.
-        :param endpoint: String with the endpoint name.
-        :return: String with endpoint URL.
+        Build a keep-alive session with a connection pool.
+        Connections are reused across calls, so the TCP and TLS
+        handshakes are paid once per pooled connection.
+        :param pool_size: Max number of connections kept per host.
+        :param hosts: Int with the number of hosts to keep pools for.
+        :return: Session object.
         """
-        return self.base_url + endpoint
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
 
-    def _get_public(self, api_endpoint: str, params: dict = {}) -> dict:
+    def close(self) -> None:
         """
-        Make a request to a public ednpoint and return the response data.
+        Close the pooled connections.
+        :return: None.
+        """
+        self.clock.stop()
+        self._hedge_executor.shutdown(wait=False)
+        self._order_executor.shutdown(wait=False)
+        self.session.close()
+        self.trade_store.close()
+
+    @property
+    def base_url(self) -> str:
+        """Fastest healthy host"""
+        return self.hosts.best()
+
+    def probe_hosts(self) -> None:
+        """
+        Measure the latency of every host with a ping.
+        :return: None.
+        """
+        self.hosts.probe(
+            lambda host: self.session.get(
+                host + Public.ping, timeout=self.timeout
+            ).raise_for_status()
+        )
+
+    def _request(
+        self,
+        method: str,
+        api_endpoint: str,
+        params: Optional[dict] = None,
+        signed: bool = False,
+        priority: int = Priority.DEFAULT,
+    ) -> dict:
+        """
+        Make a request, signing it if needed.
+        :param method: String with the HTTP method.
         :param api_endpoint: String with the endpoint name.
         :param params: Dict with the params.
+        :param signed: True to sign the params and send the API key.
+        :param priority: Int with the rate limiter Priority.
         :return: Dict with the data.
         """
-        response: dict = requests.get(
-            url=self._get_url(api_endpoint), params=params, timeout=TIMEOUT
-        ).json()
+        response: dict = self._send(method, api_endpoint, params, signed, priority)
+        if signed and self._is_timestamp_error(response):
+            # Local clock drifted: measure the offset again and retry once.
+            self.clock.sync()
+            self.metrics.observe_retry(method, api_endpoint)
+            response = self._send(method, api_endpoint, params, signed, priority)
+        return response
+
+    def _send(
+        self,
+        method: str,
+        api_endpoint: str,
+        params: Optional[dict] = None,
+        signed: bool = False,
+        priority: int = Priority.DEFAULT,
+        headers: Optional[dict] = None,
+    ) -> dict:
+        """
+        Send a request through the rate limiter and the pooled session.
+        Params are signed once the request is admitted, so time spent
+        waiting doesn't count against the recvWindow.
+        A 429 response is retried after its Retry-After time.
+        :param method: String with the HTTP method.
+        :param api_endpoint: String with the endpoint name.
+        :param params: Dict with the params.
+        :param signed: True to sign the params and send the API key.
+        :param priority: Int with the rate limiter Priority.
+        :param headers: Dict with extra headers.
+        :return: Dict with the data.
+        """
+        weight: int = request_weight(method, api_endpoint, params)
+        orders: int = 1 if is_order(method, api_endpoint) else 0
+        # Hosts like data-api only serve requests without API key.
+        public: bool = not signed and headers is None
+        if signed:
+            headers = {**(headers or {}), API_KEY_HEADER: self.api_key}
+        attempt: Callable[[str], requests.Response] = functools.partial(
+            self._attempt,
+            method=method,
+            api_endpoint=api_endpoint,
+            params=params,
+            signed=signed,
+            headers=headers,
+            weight=weight,
+            orders=orders,
+            priority=priority,
+        )
+        for retry in range(RATE_LIMIT_RETRIES + 1):
+            if retry:
+                self.metrics.observe_retry(method, api_endpoint)
+            if self.hedge and public and method == "GET":
+                response: requests.Response = self._hedged(attempt)
+            else:
+                response = self._failover(attempt, method, public)
+            if response.status_code != 429:
+                break
+        if orders and response.status_code >= 500:
+            # The order may have been placed anyway, its status is unknown.
+            # Raised like a network error, so it isn't read as a rejection.
+            response.raise_for_status()
+        return loads(response.content)
+
+    def _attempt(
+        self,
+        host: str,
+        method: str,
+        api_endpoint: str,
+        params: Optional[dict],
+        signed: bool,
+        headers: Optional[dict],
+        weight: int,
+        orders: int,
+        priority: int,
+    ) -> requests.Response:
+        """
+        Send a request to a host and record its latency and metrics.
+        :param host: String with the host URL.
+        :return: Response object.
+        """
+        self.rate_limiter.acquire(weight, orders, priority)
+        url: str = host + api_endpoint
+        if signed:
+            url += "?" + self._signed_query(params)
+            params = None
+        start: float = time.perf_counter()
+        try:
+            response: requests.Response = self.session.request(
+                method=method,
+                url=url,
+                params=params,
+                headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            self.hosts.record_error(host)
+            self.metrics.observe_error(method, api_endpoint)
+            raise
+        latency: float = time.perf_counter() - start
+        if response.status_code >= 500:
+            self.hosts.record_error(host)
+        else:
+            self.hosts.record(host, latency)
+        self.rate_limiter.update(response.status_code, response.headers)
+        used_weight: Optional[str] = response.headers.get(USED_WEIGHT_HEADER)
+        self.metrics.observe_response(
+            method,
+            api_endpoint,
+            response.status_code,
+            latency,
+            len(response.content),
+            weight,
+            int(used_weight) if used_weight else None,
+        )
         return response
 
-    def _sign_params(self, params: dict = {}) -> dict:
+    def _failover(
+        self, attempt: Callable[[str], requests.Response], method: str, public: bool
+    ) -> requests.Response:
+        """
+        Try the hosts from best to worst until one answers.
+        Requests that change state only move on to the next host if
+        the connection couldn't be opened, so they're never sent twice.
+        :param attempt: Callable sending the request to a host.
+        :param method: String with the HTTP method.
+        :param public: False to exclude the hosts without signed endpoints.
+        :return: Response object.
+        """
+        hosts: List[str] = self.hosts.ranked(public)
+        retryable: tuple = (
+            (requests.ConnectionError, requests.Timeout)
+            if method == "GET"
+            else (requests.ConnectTimeout,)
+        )
+        for host in hosts[:-1]:
+            try:
+                response: requests.Response = attempt(host)
+            except retryable:
+                continue
+            if response.status_code < 500 or method != "GET":
+                return response
+        return attempt(hosts[-1])
+
+    def _hedged(
+        self, attempt: Callable[[str], requests.Response]
+    ) -> requests.Response:
+        """
+        Send an idempotent read to the best host and, if it hasn't
+        answered after its p95 latency, a duplicate to the next one.
+        The first successful response wins.
+        :param attempt: Callable sending the request to a host.
+        :return: Response object.
+        """
+        hosts: List[str] = self.hosts.ranked()
+        futures: List[Future] = [self._hedge_executor.submit(attempt, hosts[0])]
+        delay: float = self.hosts.hedge_delay(hosts[0], HEDGE_DEFAULT_DELAY)
+        done, _ = wait(futures, timeout=delay)
+        if not done and len(hosts) > 1:
+            futures.append(self._hedge_executor.submit(attempt, hosts[1]))
+        pending: set = set(futures)
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result().status_code < 500:
+                    return future.result()
+            if not pending:
+                # Every host failed: fail over through the remaining ones.
+                return self._failover(attempt, "GET", True)
+
+    @staticmethod
+    def _is_timestamp_error(response: dict) -> bool:
+        """
+        Check if the server rejected the request timestamp.
+        :param response: Dict with the response data.
+        :return: True if it's a timestamp/recvWindow error.
+        """
+        return (
+            isinstance(response, dict)
+            and response.get("code") == TIMESTAMP_ERROR_CODE
+        )
+
+    def _get_public(
+        self,
+        api_endpoint: str,
+        params: Optional[dict] = None,
+        priority: int = Priority.DEFAULT,
+    ) -> dict:
         """
-        Generate signature with params.
+        Make a request to a public ednpoint and return the response data.
+        :param api_endpoint: String with the endpoint name.
         :param params: Dict with the params.
-        :return: Dict with the signed params.
+        :param priority: Int with the rate limiter Priority.
+        :return: Dict with the data.
+        """
+        return self._request("GET", api_endpoint, params, priority=priority)
+
+    def _signed_query(self, params: Optional[dict] = None) -> str:
+        """
+        Build the query string of a signed request.
+        The params are encoded once and that exact string is signed and
+        sent. The timestamp comes from the local server clock estimate,
+        so signing doesn't need a request.
+        :param params: Dict with the params. It's not modified.
+        :return: String with the query, signature included.
+        """
+        query: str = parse.urlencode({**(params or {}), "timestamp": self.clock.now()})
+        return f"{query}&signature={self.signer.sign(query.encode())}"
+
+    def get_server_time(self) -> int:
+        """
+        Get the server time.
+        :return: Int with the server timestamp in milliseconds.
         """
         response: dict = self._get_public(api_endpoint=Public.time)
-        print(f"Server time response: {response}")
-        params["timestamp"] = response["serverTime"]
-        signature: str = hmac.new(
-            str.encode(self.secret_key),
-            str.encode(parse.urlencode(params)),
-            hashlib.sha256,
-        ).hexdigest()
-        params["signature"] = signature
-        return params
+        return response["serverTime"]
 
     def get_avg_price(self, symbol: str) -> AvgPrice:
         """
@@ -104,6 +489,7 @@ class Binance:
         try:
             return AvgPrice(**data)
         except pydantic.error_wrappers.ValidationError:
+            self.metrics.observe_validation_failure("GET", Public.avg_price)
             print(f"*** ValidationError")
             print(Response(**data))
             sys.exit()
@@ -120,21 +506,128 @@ class Binance:
         try:
             return Ticker(**data)
         except pydantic.error_wrappers.ValidationError:
+            self.metrics.observe_validation_failure("GET", Public.last_price)
+            print(f"*** ValidationError")
+            print(Response(**data))
+            sys.exit()
+
+    def get_all_prices(self) -> Dict[str, Ticker]:
+        """
+        Get latest price of every cryptocurrency in one request.
+        :return: Dict of symbol -> Ticker object.
+        """
+        data: dict = self._get_public(api_endpoint=Public.last_price)
+        try:
+            return {item["symbol"]: Ticker(**item) for item in data}
+        except (pydantic.error_wrappers.ValidationError, TypeError):
+            self.metrics.observe_validation_failure("GET", Public.last_price)
+            print(f"*** ValidationError")
+            print(Response(**data))
+            sys.exit()
+
+    def get_exchange_info(self) -> dict:
+        """
+        Get the trading rules of every symbol in one request.
+        :return: Dict with the exchangeInfo data.
+        """
+        data: dict = self._get_public(api_endpoint=Public.exchange_info)
+        if "symbols" not in data:
+            self.metrics.observe_validation_failure("GET", Public.exchange_info)
+            print(f"*** ValidationError")
+            print(Response(**data))
+            sys.exit()
+        return data
+
+    def get_all_tickers_24h(self) -> Dict[str, Ticker24h]:
+        """
+        Get 24 hour statistics of every cryptocurrency in one request.
+        :return: Dict of symbol -> Ticker24h object.
+        """
+        data: dict = self._get_public(api_endpoint=Public.ticker_24h)
+        try:
+            return {item["symbol"]: Ticker24h(**item) for item in data}
+        except (pydantic.error_wrappers.ValidationError, TypeError):
+            self.metrics.observe_validation_failure("GET", Public.ticker_24h)
             print(f"*** ValidationError")
             print(Response(**data))
             sys.exit()
 
-    def get_candlesticks(self, symbol: str) -> None:
+    def get_depth(self, symbol: str, limit: int = DEPTH_SNAPSHOT_LIMIT) -> dict:
         """
-        Show candlesticks of a cryptocurrency.
+        Get an order book snapshot.
         :param symbol: String with the symbol.
-        :return: None.
+        :param limit: Int with the number of levels per side.
+        :return: Dict with lastUpdateId, bids and asks.
+        """
+        data: dict = self._get_public(
+            params={"symbol": symbol, "limit": limit}, api_endpoint=Public.depth
+        )
+        if "lastUpdateId" not in data:
+            print(Response(**data))
+            sys.exit()
+        return data
+
+    @property
+    def kline_cache(self) -> "KlineCache":
+        """Candlestick cache, built on first use"""
+        with self._kline_lock:
+            if self._kline_cache is None:
+                from klines import KlineCache
+
+                self._kline_cache = KlineCache(self.fetch_klines)
+            return self._kline_cache
+
+    def fetch_klines(
+        self, symbol: str, interval: str, start_time: int, end_time: int
+    ) -> Iterator["np.ndarray"]:
         """
-        # TODO: Determine lowest and highest values for a coin.
-        params = dict(symbol=symbol, interval="1M", startTime=1617249600)
-        data: dict = self._get_public(params, Public.candle)
-        for item in data:
-            print(f"H: {item[2]} L: {item[3]}")
+        Download the candlesticks opened between two timestamps,
+        in pages of KLINES_PAGE_LIMIT candles.
+        :param symbol: String with the symbol.
+        :param interval: String with the interval, e.g. "1m".
+        :param start_time: Int with the timestamp in ms.
+        :param end_time: Int with the timestamp in ms.
+        :return: Iterator of arrays of KLINE_DTYPE records.
+        """
+        from klines import to_records
+
+        while start_time <= end_time:
+            params: dict = dict(
+                symbol=symbol,
+                interval=interval,
+                startTime=start_time,
+                endTime=end_time,
+                limit=KLINES_PAGE_LIMIT,
+            )
+            data: list = self._get_public(Public.candle, params, Priority.ANALYTICS)
+            if not isinstance(data, list):
+                print(Response(**data))
+                sys.exit()
+            if data:
+                yield to_records(data)
+            if len(data) < KLINES_PAGE_LIMIT:
+                return
+            start_time = data[-1][0] + 1
+
+    def get_candlesticks(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        start_time: int = 0,
+        end_time: Optional[int] = None,
+    ) -> "Klines":
+        """
+        Get candlesticks of a cryptocurrency.
+        Closed candles are cached on disk, only missing ones are downloaded.
+        :param symbol: String with the symbol.
+        :param interval: String with the interval, e.g. "1m".
+        :param start_time: Int with the timestamp in ms, listing by default.
+        :param end_time: Optional timestamp in ms, now by default.
+        :return: Klines object.
+        """
+        if interval not in KLINE_INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+        return self.kline_cache.get(symbol, interval, start_time, end_time)
 
     def get_account(self) -> Account:
         """
@@ -142,58 +635,198 @@ class Binance:
         :return: Account object.
         """
         params: dict = {"recvWindow": 10000}
-        response: dict = requests.get(
-            url=self._get_url(Private.account),
-            params=self._sign_params(params=params),
-            headers={API_KEY_HEADER: self.api_key},
-            timeout=TIMEOUT,
-        ).json()
+        response: dict = self._request(
+            "GET", Private.account, params, signed=True
+        )
         try:
+            if self.fast:
+                return FastAccount.from_dict(response)
             return Account(**response)
-        except pydantic.error_wrappers.ValidationError as ex:
+        except (pydantic.error_wrappers.ValidationError, KeyError) as ex:
+            self.metrics.observe_validation_failure("GET", Private.account)
             print(f"*** ValidationError")
             print(Response(**response))
             sys.exit()
 
-    def get_trades(self, symbol: str) -> List[Trade]:
+    def _get_trades_page(self, params: dict) -> List[Trade]:
         """
-        Get trades of a cryptocurrency.
-        :param symbol: String with the symbol.
+        Get one page of trades.
+        :param params: Dict with the myTrades params.
         :return: List of Trade object.
         """
-        response: dict = requests.get(
-            url=self._get_url(Private.my_trades),
-            params=self._sign_params({"symbol": symbol}),
-            headers={API_KEY_HEADER: self.api_key},
-            timeout=TIMEOUT,
-        ).json()
+        response: dict = self._request(
+            "GET", Private.my_trades, params, signed=True, priority=Priority.ANALYTICS
+        )
         try:
+            if self.fast:
+                return FastTrade.from_list(response)
             update: Callable[[dict], Trade] = lambda t: Trade(**t)
             return list(map(update, response))
-        except pydantic.error_wrappers.ValidationError as ex:
+        except (pydantic.error_wrappers.ValidationError, TypeError, KeyError):
+            self.metrics.observe_validation_failure("GET", Private.my_trades)
             print(f"*** ValidationError")
             print(Response(**response))
             sys.exit()
 
+    def _first_trade_id(self, symbol: str, start_time: int) -> Optional[int]:
+        """
+        Find the `fromId` of the first trade at or after a given time.
+        myTrades only accepts 24h time windows, so instead of walking
+        the history day by day, ids are binary searched.
+        :param symbol: String with the symbol.
+        :param start_time: Int with the timestamp in milliseconds.
+        :return: Int with the trade id, None if there are no trades.
+        """
+        latest: List[Trade] = self._get_trades_page({"symbol": symbol, "limit": 1})
+        if not latest or latest[-1].time < start_time:
+            return None
+        low, high = 0, latest[-1].id_
+        while low < high:
+            middle: int = (low + high) // 2
+            page: List[Trade] = self._get_trades_page(
+                {"symbol": symbol, "fromId": middle, "limit": 1}
+            )
+            if page[0].time >= start_time:
+                high = middle
+            else:
+                low = page[0].id_ + 1
+        return low
+
+    def fetch_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        from_id: int = 0,
+    ) -> Iterator[List[Trade]]:
+        """
+        Walk the trade history of a cryptocurrency on the API, oldest first.
+        Pages of TRADES_PAGE_LIMIT trades are requested with `fromId`
+        and yielded as they arrive.
+        :param symbol: String with the symbol.
+        :param start_time: Optional timestamp in ms of the first trade.
+        :param end_time: Optional timestamp in ms of the last trade.
+        :param from_id: Int with the first trade id.
+        :return: Iterator of lists of Trade object.
+        """
+        if start_time is not None:
+            first_id: Optional[int] = self._first_trade_id(symbol, start_time)
+            if first_id is None:
+                return
+            from_id = max(from_id, first_id)
+        while True:
+            batch: List[Trade] = self._get_trades_page(
+                {"symbol": symbol, "fromId": from_id, "limit": TRADES_PAGE_LIMIT}
+            )
+            if end_time is not None and batch and batch[-1].time > end_time:
+                yield [trade for trade in batch if trade.time <= end_time]
+                return
+            if batch:
+                yield batch
+            if len(batch) < TRADES_PAGE_LIMIT:
+                return
+            from_id = batch[-1].id_ + 1
+
+    def sync_trades(self, symbol: str) -> int:
+        """
+        Download the trades newer than the last stored one.
+        :param symbol: String with the symbol.
+        :return: Int with the number of new trades.
+        """
+        last_id: Optional[int] = self.trade_store.last_id(symbol)
+        from_id: int = 0 if last_id is None else last_id + 1
+        count: int = 0
+        for batch in self.fetch_trades(symbol, from_id=from_id):
+            self.trade_store.insert(batch)
+            count += len(batch)
+        return count
+
+    def iter_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        from_id: int = 0,
+    ) -> Iterator[List[Trade]]:
+        """
+        Sync the local trade store and read the trades from it.
+        :param symbol: String with the symbol.
+        :param start_time: Optional timestamp in ms of the first trade.
+        :param end_time: Optional timestamp in ms of the last trade.
+        :param from_id: Int with the first trade id.
+        :return: Iterator of lists of Trade object.
+        """
+        self.sync_trades(symbol)
+        return self.trade_store.iter_trades(symbol, start_time, end_time, from_id)
+
+    def get_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[Trade]:
+        """
+        Get all the trades of a cryptocurrency.
+        Prefer `iter_trades` to aggregate without holding the history.
+        :param symbol: String with the symbol.
+        :param start_time: Optional timestamp in ms of the first trade.
+        :param end_time: Optional timestamp in ms of the last trade.
+        :return: List of Trade object.
+        """
+        batches = self.iter_trades(symbol, start_time, end_time)
+        return list(chain.from_iterable(batches))
+
     def get_open_orders(self) -> List[Order]:
         """
         Get open orders.
         :return: List of Order object.
         """
-        response: dict = requests.get(
-            url=self._get_url(Private.open_orders),
-            params=self._sign_params(),
-            headers={API_KEY_HEADER: self.api_key},
-            timeout=TIMEOUT,
-        ).json()
+        response: dict = self._request("GET", Private.open_orders, signed=True)
         try:
+            if self.fast:
+                return FastOrder.from_list(response)
             update: Callable[[dict], Order] = lambda x: Order(**x)
             return list(map(update, response))
-        except pydantic.error_wrappers.ValidationError:
+        except (pydantic.error_wrappers.ValidationError, TypeError, KeyError):
+            self.metrics.observe_validation_failure("GET", Private.open_orders)
             print("*** ValidationError")
             print(Response(**response))
             sys.exit()
 
+    def create_listen_key(self) -> str:
+        """
+        Start a user data stream.
+        :return: String with the listen key.
+        """
+        headers: dict = {API_KEY_HEADER: self.api_key}
+        response: dict = self._send(
+            "POST", Private.user_data_stream, headers=headers
+        )
+        if "listenKey" not in response:
+            print(Response(**response))
+            sys.exit()
+        return response["listenKey"]
+
+    def keepalive_listen_key(self, listen_key: str) -> None:
+        """
+        Keep a user data stream alive for 60 more minutes.
+        :param listen_key: String with the listen key.
+        :return: None.
+        """
+        headers: dict = {API_KEY_HEADER: self.api_key}
+        params: dict = {"listenKey": listen_key}
+        self._send("PUT", Private.user_data_stream, params, headers=headers)
+
+    def close_listen_key(self, listen_key: str) -> None:
+        """
+        Close a user data stream.
+        :param listen_key: String with the listen key.
+        :return: None.
+        """
+        headers: dict = {API_KEY_HEADER: self.api_key}
+        params: dict = {"listenKey": listen_key}
+        self._send("DELETE", Private.user_data_stream, params, headers=headers)
+
     def cancel_open_order(self, symbol: str, order_id: int) -> Order:
         """
         Cancel an open order.
@@ -201,30 +834,29 @@ class Binance:
         :param order_id: Int with the Order id.
         :return: Order object.
         """
-        response: dict = requests.delete(
-            url=self._get_url(Private.order),
-            params=self._sign_params({"symbol": symbol, "orderId": order_id}),
-            headers={API_KEY_HEADER: self.api_key},
-            timeout=TIMEOUT,
-        ).json()
+        response: dict = self._request(
+            "DELETE",
+            Private.order,
+            {"symbol": symbol, "orderId": order_id},
+            signed=True,
+            priority=Priority.ORDER,
+        )
         try:
-            return Order(**response)
+            order: Order = Order(**response)
         except pydantic.error_wrappers.ValidationError as ex:
+            self.metrics.observe_validation_failure("DELETE", Private.order)
             print("*** ValidationError")
             print(Response(**response))
             sys.exit()
+        self.account_cache.apply_cancel(order)
+        return order
 
-    def create_order(self, order: NewOrder) -> Order:
+    @staticmethod
+    def _order_params(order: NewOrder) -> dict:
         """
-        MARKET orders using the `quantity`:
-        Using BTCUSDT for example, sending a MARKET order will
-        specify how much BTC the user is buying or selling.
-        MARKET orders using `quoteOrderQty`:
-        Using BTCUSDT for example, sending a MARKET order will
-        specify how much USDT the user is going to spend or receive.
-        \f
+        Build the params of a new order.
         :param order: New order object.
-        :return: Order object.
+        :return: Dict with the params.
         """
         params: dict = {"symbol": order.symbol, "side": order.side}
         # Let's use MARKET orders to BUY...
@@ -235,20 +867,269 @@ class Binance:
         elif order.type_.upper() in ["L", "LIMIT"]:
             params["type"] = "LIMIT"
             params["timeInForce"] = "GTC"
-            params["price"] = order.price
-        params["quantity"] = order.qty
-        response: dict = requests.post(
-            url=self._get_url(Private.order),
-            params=self._sign_params(params),
-            headers={API_KEY_HEADER: self.api_key},
-            timeout=TIMEOUT,
-        ).json()
+            params["price"] = _format_number(order.price)
+        params["quantity"] = _format_number(order.qty)
+        if order.client_order_id:
+            params["newClientOrderId"] = order.client_order_id
+        return params
+
+    def prepare_order(self, order: NewOrder) -> Union[NewOrder, Response]:
+        """
+        Round an order to the filters of its symbol and check it locally,
+        with the cached exchange info, so it isn't rejected remotely.
+        :param order: New order object.
+        :return: New order object rounded, or Response object with the error.
+        """
+        try:
+            rules: Optional[SymbolRules] = self.exchange_info.get(order.symbol)
+            if rules is None:
+                return Response(code=INVALID_SYMBOL, msg="Invalid symbol.")
+            market_price: Optional[float] = None
+            if order.type_.upper() in ["M", "MARKET"] and (
+                rules.apply_min_to_market or rules.apply_max_to_market
+            ):
+                ticker: Optional[Ticker] = self.prices.get(order.symbol)
+                market_price = float(ticker.price) if ticker else None
+        except (requests.RequestException, SystemExit) as ex:
+            # The client exits on bad responses. Report it as the error of
+            # this order, so a batch goes on with the others.
+            return Response(code="-1", msg=f"{type(ex).__name__}: {ex}")
+        return rules.prepare(order, market_price)
+
+    def _check_rejection(self, error: Response) -> None:
+        """
+        Download the trading rules again if the exchange rejected an
+        order on its filters, since it passed the local checks with
+        the cached ones.
+        :param error: Response object with the error of the exchange.
+        :return: None.
+        """
+        if error.code == FILTER_FAILURE:
+            self.exchange_info.invalidate()
+
+    @staticmethod
+    def _parse_order(response: dict) -> Union[Order, Response]:
+        """
+        Parse an order response without exiting on errors.
+        :param response: Dict with the response data.
+        :return: Order object, or Response object with the error.
+        """
         try:
             return Order(**response)
+        except pydantic.error_wrappers.ValidationError:
+            try:
+                return Response(**response)
+            except pydantic.error_wrappers.ValidationError:
+                return Response(code="-1", msg=str(response))
+
+    def create_order(self, order: NewOrder) -> Order:
+        """
+        MARKET orders using the `quantity`:
+        Using BTCUSDT for example, sending a MARKET order will
+        specify how much BTC the user is buying or selling.
+        MARKET orders using `quoteOrderQty`:
+        Using BTCUSDT for example, sending a MARKET order will
+        specify how much USDT the user is going to spend or receive.
+        The order is rounded and checked locally first.
+        \f
+        :param order: New order object.
+        :return: Order object.
+        """
+        prepared: Union[NewOrder, Response] = self.prepare_order(order)
+        if isinstance(prepared, Response):
+            print("*** Order rejected")
+            print(prepared)
+            sys.exit()
+        response: dict = self._request(
+            "POST",
+            Private.order,
+            self._order_params(prepared),
+            signed=True,
+            priority=Priority.ORDER,
+        )
+        try:
+            placed: Order = Order(**response)
         except pydantic.error_wrappers.ValidationError as ex:
+            self.metrics.observe_validation_failure("POST", Private.order)
+            error: Response = Response(**response)
+            self._check_rejection(error)
             print("*** ValidationError")
-            print(Response(**response))
+            print(error)
             sys.exit()
+        self.account_cache.apply_order(placed)
+        return placed
+
+    def get_order(self, symbol: str, client_order_id: str) -> Union[Order, Response]:
+        """
+        Query an order by its client order id.
+        :param symbol: String with the symbol.
+        :param client_order_id: String with the client order id.
+        :return: Order object, or Response object with the error.
+        """
+        response: dict = self._request(
+            "GET",
+            Private.order,
+            {"symbol": symbol, "origClientOrderId": client_order_id},
+            signed=True,
+            priority=Priority.ORDER,
+        )
+        return self._parse_order(response)
+
+    def _submit_order(self, order: NewOrder, retries: int) -> OrderResult:
+        """
+        Place an order, retrying with the same client order id.
+        Any failure is reported in the result, so a batch goes on with
+        the other orders.
+        :param order: New order object, with a client order id.
+        :param retries: Int with the number of retries.
+        :return: OrderResult object.
+        """
+        try:
+            return self._place_order(order, retries)
+        except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+            error = Response(code="-1", msg=f"{type(ex).__name__}: {ex}")
+            return OrderResult(order, order.client_order_id, error=error)
+
+    def _place_order(self, order: NewOrder, retries: int) -> OrderResult:
+        """
+        Place an order, retrying with the same client order id.
+        After a network error, a 5xx or an unreadable reply the order
+        may have reached the exchange, so it's looked up before being
+        sent again.
+        :param order: New order object, with a client order id.
+        :param retries: Int with the number of retries.
+        :return: OrderResult object.
+        """
+        client_order_id: str = order.client_order_id
+        prepared: Union[NewOrder, Response] = self.prepare_order(order)
+        if isinstance(prepared, Response):
+            return OrderResult(order, client_order_id, error=prepared)
+        params: dict = self._order_params(prepared)
+        for attempt in range(retries + 1):
+            try:
+                if attempt:
+                    found: Union[Order, Response] = self.get_order(
+                        order.symbol, client_order_id
+                    )
+                    if isinstance(found, Order):
+                        self.account_cache.apply_order(found)
+                        return OrderResult(order, client_order_id, result=found)
+                response: dict = self._request(
+                    "POST", Private.order, params, signed=True, priority=Priority.ORDER
+                )
+            except (requests.RequestException, ValueError) as ex:
+                # ValueError: a body that isn't JSON, e.g. a gateway's HTML page.
+                error = Response(code="-1", msg=f"{type(ex).__name__}: {ex}")
+                continue
+            if not isinstance(response, dict):
+                error = Response(code="-1", msg=f"Unexpected reply: {response}")
+                continue
+            parsed: Union[Order, Response] = self._parse_order(response)
+            if isinstance(parsed, Order):
+                self.account_cache.apply_order(parsed)
+                return OrderResult(order, client_order_id, result=parsed)
+            self._check_rejection(parsed)
+            return OrderResult(order, client_order_id, error=parsed)
+        return OrderResult(order, client_order_id, error=error)
+
+    def create_orders(
+        self, orders: List[NewOrder], retries: int = ORDER_RETRIES
+    ) -> List[OrderResult]:
+        """
+        Place several orders concurrently.
+        Each order gets a client order id (unless it has one), so it can
+        be retried safely. Failures, including the local filter checks,
+        are reported per order.
+        :param orders: List of New order object.
+        :param retries: Int with the retries per order after network errors.
+        :return: List of OrderResult object, in the same order.
+        """
+        orders = [
+            order
+            if order.client_order_id
+            else order.copy(update={"client_order_id": uuid.uuid4().hex})
+            for order in orders
+        ]
+        return list(
+            self._order_executor.map(
+                lambda order: self._submit_order(order, retries), orders
+            )
+        )
+
+    def cancel_all_orders(self, symbol: str) -> Union[List[Order], Response]:
+        """
+        Cancel every open order of a symbol in one request.
+        :param symbol: String with the symbol.
+        :return: List of cancelled Order object, or Response with the error.
+        """
+        response: Union[list, dict] = self._request(
+            "DELETE",
+            Private.open_orders,
+            {"symbol": symbol},
+            signed=True,
+            priority=Priority.ORDER,
+        )
+        if isinstance(response, dict):
+            return self._parse_order(response)
+        # Orders of an OCO list are reported inside orderReports.
+        reports: List[dict] = []
+        for item in response:
+            reports += item.get("orderReports", [item])
+        parsed: List[Union[Order, Response]] = [
+            self._parse_order(report) for report in reports
+        ]
+        cancelled: List[Order] = [item for item in parsed if isinstance(item, Order)]
+        for order in cancelled:
+            self.account_cache.apply_cancel(order)
+        if len(cancelled) < len(parsed):
+            # Unknown changes to the balances.
+            self.account_cache.invalidate()
+            return next(item for item in parsed if isinstance(item, Response))
+        return cancelled
+
+    def cancel_replace(
+        self,
+        order_id: int,
+        order: NewOrder,
+        mode: str = "STOP_ON_FAILURE",
+    ) -> CancelReplaceResult:
+        """
+        Cancel an open order and place a new one in one request.
+        :param order_id: Int with the id of the order to cancel.
+        :param order: New order object, for the same symbol.
+        :param mode: "STOP_ON_FAILURE" or "ALLOW_FAILURE".
+        :return: CancelReplaceResult object.
+        """
+        prepared: Union[NewOrder, Response] = self.prepare_order(order)
+        if isinstance(prepared, Response):
+            return CancelReplaceResult(cancelled=None, created=None, error=prepared)
+        params: dict = self._order_params(prepared)
+        params.update(cancelOrderId=order_id, cancelReplaceMode=mode)
+        response: dict = self._request(
+            "POST",
+            Private.cancel_replace,
+            params,
+            signed=True,
+            priority=Priority.ORDER,
+        )
+        # On failure the details come inside "data".
+        data: dict = response.get("data", response)
+        cancelled = self._parse_order(data.get("cancelResponse") or {})
+        created = self._parse_order(data.get("newOrderResponse") or {})
+        if isinstance(cancelled, Order):
+            self.account_cache.apply_cancel(cancelled)
+        if isinstance(created, Order):
+            self.account_cache.apply_order(created)
+        elif data.get("newOrderResponse"):
+            self._check_rejection(created)
+        error: Optional[Response] = None
+        if "code" in response:
+            error = Response(code=response["code"], msg=response["msg"])
+        return CancelReplaceResult(
+            cancelled=cancelled if isinstance(cancelled, Order) else None,
+            created=created if isinstance(created, Order) else None,
+            error=error,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,347 @@
+""" Non-interactive commands with JSON output """
+
+import argparse
+import json
+import shlex
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from client import (
+    get_async_binance,
+    get_binance,
+    get_portfolio,
+    get_profit,
+    get_user_stream,
+)
+from constants import PORTFOLIO_QUOTE
+
+if TYPE_CHECKING:
+    from accounts import AccountPool, AccountResults
+    from models import Balance, Order, Profit
+
+# pylint: disable=import-outside-toplevel
+
+
+def _to_json(value: Any) -> Any:
+    """
+    Convert models and records to JSON compatible values.
+    :param value: Model, record, list or dict.
+    :return: JSON compatible value.
+    """
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if hasattr(value, "_asdict"):
+        return _to_json(value._asdict())
+    if hasattr(value, "dict"):
+        return _to_json(value.dict())
+    return value
+
+
+def _balances(live: bool) -> List["Balance"]:
+    """
+    Non-zero balances from the user data stream when running as a
+    daemon, or from the cached account snapshot otherwise.
+    """
+    if live:
+        get_user_stream().start()
+        return get_user_stream().get_balances()
+    return get_binance().account_cache.balances()
+
+
+def _open_orders(live: bool, symbol: Optional[str]) -> List["Order"]:
+    """
+    Open orders, from the user data stream when running as a daemon.
+    """
+    if live:
+        get_user_stream().start()
+        return get_user_stream().get_open_orders(symbol)
+    orders: List["Order"] = get_binance().get_open_orders()
+    return [order for order in orders if symbol in (None, order.symbol)]
+
+
+def balance(args: argparse.Namespace) -> List[dict]:
+    """
+    Non-zero balances.
+    :param args: Parsed arguments.
+    :return: List of dicts with asset, free and locked.
+    """
+    return [_to_json(item) for item in _balances(args.live)]
+
+
+def prices(args: argparse.Namespace) -> Dict[str, Optional[str]]:
+    """
+    Latest prices, of every symbol by default.
+    :param args: Parsed arguments.
+    :return: Dict of symbol -> price, None for unknown symbols.
+    """
+    if not args.symbols:
+        snapshot = get_binance().prices.snapshot()
+        return {symbol: ticker.price for symbol, ticker in snapshot.items()}
+    tickers = {symbol: get_binance().prices.get(symbol) for symbol in args.symbols}
+    return {
+        symbol: ticker.price if ticker else None for symbol, ticker in tickers.items()
+    }
+
+
+def profits(args: argparse.Namespace) -> Dict[str, Optional[dict]]:
+    """
+    Profit stats of symbols, processed concurrently.
+    :param args: Parsed arguments.
+    :return: Dict of symbol -> profit, None for unknown symbols.
+    """
+    # Each symbol once, its position isn't safe to update concurrently.
+    symbols: List[str] = list(dict.fromkeys(args.symbols))
+    tickers = {symbol: get_binance().prices.get(symbol) for symbol in symbols}
+    known: List[str] = [symbol for symbol, ticker in tickers.items() if ticker]
+    async_binance = get_async_binance()
+    results: Dict[str, "Profit"] = async_binance.run(
+        async_binance.map_symbols(
+            lambda symbol: async_binance.call(
+                get_profit, symbol, float(tickers[symbol].price)
+            ),
+            known,
+        )
+    )
+    return {symbol: _to_json(results.get(symbol)) for symbol in symbols}
+
+
+def _price(symbol: str) -> Optional[float]:
+    """Price of a symbol from the shared snapshot"""
+    ticker = get_binance().prices.get(symbol)
+    return float(ticker.price) if ticker else None
+
+
+def value(args: argparse.Namespace) -> dict:
+    """
+    Value of every non-zero balance in a quote asset.
+    :param args: Parsed arguments.
+    :return: Dict with the quote, total and holdings.
+    """
+    if args.quote not in get_portfolio().graph:
+        raise ValueError(f"Unknown asset: {args.quote}")
+    valuation = get_portfolio().valuation(args.quote)
+    valuation.set_balances(_balances(args.live))
+    valuation.update_prices(_price)
+    return {
+        "quote": args.quote,
+        "total": valuation.total,
+        "holdings": _to_json(valuation.holdings()),
+    }
+
+
+def orders(args: argparse.Namespace) -> List[dict]:
+    """
+    Open orders.
+    :param args: Parsed arguments.
+    :return: List of dicts with the orders.
+    """
+    return _to_json(_open_orders(args.live, args.symbol))
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Binance bot. Without a command, the interactive menu runs.",
+    )
+    parser.add_argument(
+        "--accounts",
+        metavar="FILE",
+        help="run the command on every account of FILE at once, each in its "
+        "own process, and merge the results",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("balance", help="non-zero balances")
+    price_parser = commands.add_parser("prices", help="latest prices")
+    price_parser.add_argument("symbols", nargs="*", type=str.upper)
+    profit_parser = commands.add_parser("profits", help="profit stats")
+    profit_parser.add_argument("symbols", nargs="+", type=str.upper)
+    value_parser = commands.add_parser("value", help="value of the balances")
+    value_parser.add_argument("--quote", type=str.upper, default=PORTFOLIO_QUOTE)
+    order_parser = commands.add_parser("orders", help="open orders")
+    order_parser.add_argument("--symbol", type=str.upper)
+    commands.add_parser(
+        "serve",
+        help="read commands from stdin, one per line, and answer each "
+        "with a line of JSON, keeping the client and caches warm",
+    )
+    return parser
+
+
+def _accounts_option() -> argparse.ArgumentParser:
+    """Parser of --accounts alone, to take it out of the command line"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--accounts")
+    return parser
+
+
+COMMANDS: Dict[str, Callable[[argparse.Namespace], Any]] = {
+    "balance": balance,
+    "prices": prices,
+    "profits": profits,
+    "value": value,
+    "orders": orders,
+}
+
+
+def _run(parser: argparse.ArgumentParser, argv: List[str], live: bool) -> Any:
+    """
+    Run a command line.
+    :param parser: ArgumentParser object.
+    :param argv: List with the arguments.
+    :param live: True to read the account from the user data stream.
+    :return: JSON compatible result.
+    """
+    args: argparse.Namespace = parser.parse_args(argv)
+    args.live = live
+    if args.command == "serve":
+        raise ValueError("already serving")
+    return COMMANDS[args.command](args)
+
+
+def run_command(argv: List[str], live: bool) -> Any:
+    """
+    Run a command line in an account process.
+    :param argv: List with the arguments.
+    :param live: True to read the account from the user data stream.
+    :return: JSON compatible result.
+    """
+    return _run(_parser(), argv, live)
+
+
+def _merge_balances(results: Dict[str, List[dict]]) -> dict:
+    """Balances of every account, and their sum by asset"""
+    totals: Dict[str, List[float]] = {}
+    for items in results.values():
+        for item in items:
+            total: List[float] = totals.setdefault(item["asset"], [0.0, 0.0])
+            total[0] += float(item["free"])
+            total[1] += float(item["locked"])
+    return {
+        "total": [
+            {"asset": asset, "free": f"{free:.8f}", "locked": f"{locked:.8f}"}
+            for asset, (free, locked) in sorted(totals.items())
+        ],
+        "accounts": results,
+    }
+
+
+def _merge_profits(results: Dict[str, dict]) -> Dict[str, Optional[dict]]:
+    """Profits of every account added up by symbol"""
+    merged: Dict[str, Optional[dict]] = {}
+    for profits in results.values():
+        for symbol, profit in profits.items():
+            if profit is None:
+                merged.setdefault(symbol, None)
+            elif merged.get(symbol) is None:
+                merged[symbol] = dict(profit)
+            else:
+                for key, value in profit.items():
+                    if key != "symbol":
+                        merged[symbol][key] += value
+    return merged
+
+
+def _merge_values(results: Dict[str, dict]) -> dict:
+    """Holdings of every account added up by asset"""
+    quote: str = next((item["quote"] for item in results.values()), "")
+    holdings: Dict[str, dict] = {}
+    for result in results.values():
+        for item in result["holdings"]:
+            if item["asset"] not in holdings:
+                holdings[item["asset"]] = dict(item)
+                continue
+            merged: dict = holdings[item["asset"]]
+            merged["amount"] += item["amount"]
+            # None when an account couldn't value the asset.
+            if merged["value"] is None or item["value"] is None:
+                merged["value"] = None
+            else:
+                merged["value"] += item["value"]
+    return {
+        "quote": quote,
+        "total": sum(result["total"] for result in results.values()),
+        "holdings": sorted(holdings.values(), key=lambda item: -(item["value"] or 0)),
+    }
+
+
+MERGES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "balance": _merge_balances,
+    # Market data, the same for every account.
+    "prices": lambda results: next(iter(results.values()), {}),
+    "profits": _merge_profits,
+    "value": _merge_values,
+    "orders": lambda results: [
+        {"account": name, **order}
+        for name, orders in results.items()
+        for order in orders
+    ],
+}
+
+
+def _run_accounts(
+    parser: argparse.ArgumentParser, pool: "AccountPool", argv: List[str], live: bool
+) -> dict:
+    """
+    Run a command line on every account and merge the results.
+    :param parser: ArgumentParser object.
+    :param pool: AccountPool object.
+    :param argv: List with the arguments, without --accounts.
+    :param live: True to read the accounts from their user data streams.
+    :return: Dict with the merged result and the errors by account.
+    """
+    args: argparse.Namespace = parser.parse_args(argv)
+    if args.command == "serve":
+        raise ValueError("already serving")
+    outcome: "AccountResults" = pool.run(run_command, argv, live)
+    return {"result": MERGES[args.command](outcome.results), "errors": outcome.errors}
+
+
+def serve(parser: argparse.ArgumentParser, pool: Optional["AccountPool"]) -> None:
+    """
+    Answer commands read from stdin until it's closed.
+    Failures are answered with {"error": ...} without stopping.
+    :param parser: ArgumentParser object.
+    :param pool: Optional AccountPool object, to serve several accounts.
+    :return: None.
+    """
+    for line in sys.stdin:
+        try:
+            argv: List[str] = shlex.split(line)
+            if not argv:
+                continue
+            if pool is None:
+                result: Any = _run(parser, argv, live=True)
+            else:
+                result = _run_accounts(parser, pool, argv, live=True)
+        except SystemExit as ex:
+            # Raised by argparse and by the client on bad responses.
+            result = {"error": f"exit {ex.code}"}
+        except Exception as ex:  # pylint: disable=broad-except
+            result = {"error": f"{type(ex).__name__}: {ex}"}
+        print(json.dumps(result), flush=True)
+
+
+def main(argv: List[str]) -> None:
+    """
+    Run a command and print its result as JSON.
+    :param argv: List with the command line arguments.
+    :return: None.
+    """
+    parser: argparse.ArgumentParser = _parser()
+    options, argv = _accounts_option().parse_known_args(argv)
+    if options.accounts is None:
+        if argv[:1] == ["serve"]:
+            serve(parser, None)
+        else:
+            print(json.dumps(_run(parser, argv, live=False), indent=2))
+        return
+    from accounts import AccountPool, load_accounts
+
+    with AccountPool(load_accounts(options.accounts)) as pool:
+        if argv[:1] == ["serve"]:
+            serve(parser, pool)
+        else:
+            result: dict = _run_accounts(parser, pool, argv, live=False)
+            print(json.dumps(result, indent=2))
@@ -0,0 +1,156 @@
+""" Shared clients, created on first use """
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+if TYPE_CHECKING:
+    from async_binance import AsyncBinance
+    from binance import Binance
+    from market_stream import MarketStream
+    from models import Profit
+    from portfolio import Portfolio
+    from profit import Position, ProfitEngine
+    from user_stream import UserDataStream
+
+# pylint: disable=import-outside-toplevel
+
+_instances: Dict[str, Any] = {}
+_lock: threading.RLock = threading.RLock()
+
+
+def _shared(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get a shared instance, building it on the first call.
+    :param name: String with the instance name.
+    :param factory: Callable building the instance.
+    :return: The instance.
+    """
+    with _lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def configure(**instances: Any) -> None:
+    """
+    Replace shared instances, e.g. a Binance client for another host.
+    :param instances: Instances by name: binance, async_binance,
+    market_stream, user_stream, profit_engine or portfolio.
+    :return: None.
+    """
+    with _lock:
+        _instances.update(instances)
+
+
+def get_binance() -> "Binance":
+    """
+    Shared Binance client. Importing it loads requests, pydantic and
+    numpy, so it's only done when the first request is made.
+    :return: Binance object.
+    """
+
+    def factory() -> "Binance":
+        from binance import Binance
+
+        return Binance()
+
+    return _shared("binance", factory)
+
+
+def get_async_binance() -> "AsyncBinance":
+    """
+    Shared AsyncBinance, over the shared Binance client.
+    :return: AsyncBinance object.
+    """
+
+    def factory() -> "AsyncBinance":
+        from async_binance import AsyncBinance
+
+        return AsyncBinance(get_binance())
+
+    return _shared("async_binance", factory)
+
+
+def get_market_stream() -> "MarketStream":
+    """
+    Shared market data stream, not connected until it's started.
+    :return: MarketStream object.
+    """
+
+    def factory() -> "MarketStream":
+        from market_stream import MarketStream
+
+        return MarketStream(get_binance().get_depth)
+
+    return _shared("market_stream", factory)
+
+
+def get_user_stream() -> "UserDataStream":
+    """
+    Shared user data stream, not connected until it's started.
+    :return: UserDataStream object.
+    """
+
+    def factory() -> "UserDataStream":
+        from user_stream import UserDataStream
+
+        return UserDataStream(get_binance())
+
+    return _shared("user_stream", factory)
+
+
+def get_profit_engine() -> "ProfitEngine":
+    """
+    Shared profit engine.
+    :return: ProfitEngine object.
+    """
+
+    def factory() -> "ProfitEngine":
+        from profit import ProfitEngine
+
+        return ProfitEngine()
+
+    return _shared("profit_engine", factory)
+
+
+def get_portfolio() -> "Portfolio":
+    """
+    Shared portfolio valuation, over the pairs of the cached exchange info.
+    :return: Portfolio object.
+    """
+
+    def factory() -> "Portfolio":
+        from portfolio import Portfolio
+
+        return Portfolio(get_binance().exchange_info.pairs())
+
+    return _shared("portfolio", factory)
+
+
+def get_profit(symbol: str, price: float) -> "Profit":
+    """
+    Feed the new trades of a symbol to its shared position and value it.
+    :param symbol: String with the symbol.
+    :param price: Float with the current price of the symbol.
+    :return: Profit object.
+    """
+    position: "Position" = get_profit_engine().position(symbol)
+    for trades in get_binance().iter_trades(symbol, from_id=position.last_id + 1):
+        position.update_many(trades)
+    return position.to_profit(price)
+
+
+def close() -> None:
+    """
+    Stop the streams and close the client, if they were created.
+    :return: None.
+    """
+    with _lock:
+        for name in ("market_stream", "user_stream"):
+            if name in _instances:
+                _instances[name].stop()
+        if "async_binance" in _instances:
+            _instances["async_binance"].close()
+        elif "binance" in _instances:
+            _instances["binance"].close()
+        _instances.clear()
@@ -0,0 +1,93 @@
+""" Server clock """
+
+import threading
+import time
+from typing import Callable, Optional
+
+from constants import CLOCK_REFRESH_INTERVAL
+
+
+class ServerClock:
+    """
+    Local estimate of the Binance server time.
+    The offset between the local and the server clock is measured once
+    and refreshed every `refresh_interval` seconds, so request
+    timestamps can be generated without a round trip.
+    """
+
+    def __init__(
+        self,
+        fetch_server_time: Callable[[], int],
+        refresh_interval: float = CLOCK_REFRESH_INTERVAL,
+    ):
+        self._fetch: Callable[[], int] = fetch_server_time
+        self.refresh_interval: float = refresh_interval
+        self.offset: float = 0.0
+        self.synced_at: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync(self) -> float:
+        """
+        Measure the offset against the server time.
+        The server time is compared to the midpoint of the round trip.
+        :return: Float with the offset in milliseconds.
+        """
+        with self._lock:
+            sent: float = time.time()
+            server_time: int = self._fetch()
+            received: float = time.time()
+            self.offset = server_time - (sent + received) * 500
+            self.synced_at = time.monotonic()
+            return self.offset
+
+    def is_stale(self) -> bool:
+        """
+        Check if the offset must be measured again.
+        :return: True if never synced or older than the refresh interval.
+        """
+        return (
+            self.synced_at is None
+            or time.monotonic() - self.synced_at > self.refresh_interval
+        )
+
+    def now(self) -> int:
+        """
+        Current server time, synced first if the offset is stale.
+        :return: Int with the server timestamp in milliseconds.
+        """
+        if self._thread is None and self.is_stale():
+            self.sync()
+        return int(time.time() * 1000 + self.offset)
+
+    def start(self) -> None:
+        """
+        Keep the offset fresh from a background thread,
+        so `now()` never waits for the network.
+        :return: None.
+        """
+        if self._thread is not None:
+            return
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background refresh.
+        :return: None.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.sync()
+            except Exception:  # pylint: disable=broad-except
+                # Keep the last known offset, retry on the next tick.
+                continue
@@ -1 +1,115 @@
 """ Constants module """
+
+from os import path
+
+API_KEY_HEADER: str = "X-MBX-APIKEY"
+
+# API hosts
+API_HOSTS: tuple = (
+    "https://api.binance.com",
+    "https://api1.binance.com",
+    "https://api2.binance.com",
+    "https://api3.binance.com",
+    "https://api4.binance.com",
+    "https://data-api.binance.vision",
+)
+# Hosts serving market data only, not the signed endpoints.
+PUBLIC_ONLY_HOSTS: tuple = ("https://data-api.binance.vision",)
+LATENCY_WINDOW: int = 64
+HOST_BACKOFF: float = 30
+HEDGE_DEFAULT_DELAY: float = 0.25
+
+# HTTP transport
+CONNECT_TIMEOUT: float = 3.05
+READ_TIMEOUT: float = 30
+POOL_SIZE: int = 10
+
+# Server clock
+CLOCK_REFRESH_INTERVAL: float = 600
+TIMESTAMP_ERROR_CODE: int = -1021
+
+# Trade history
+TRADES_PAGE_LIMIT: int = 1000
+
+# Local trade store
+PROJECT_DIR: str = path.dirname(path.dirname(path.abspath(__file__)))
+TRADES_DB_PATH: str = path.join(PROJECT_DIR, "trades.db")
+STORE_BATCH_SIZE: int = 5000
+
+# Accounts
+ACCOUNTS_PATH: str = path.join(PROJECT_DIR, "accounts.json")
+# Trade history of each account, by account name.
+ACCOUNT_TRADES_DB_PATH: str = path.join(PROJECT_DIR, "trades_{name}.db")
+
+# Price snapshots
+PRICE_TTL: float = 10
+TICKER_24H_TTL: float = 60
+
+# Account snapshot
+ACCOUNT_TTL: float = 30
+
+# Exchange info
+EXCHANGE_INFO_PATH: str = path.join(PROJECT_DIR, "exchange_info.json")
+EXCHANGE_INFO_TTL: float = 24 * 60 * 60
+# Bumped when the format of the cached file changes.
+EXCHANGE_INFO_VERSION: int = 1
+
+# Portfolio valuation
+PORTFOLIO_QUOTE: str = "USDT"
+# Assets preferred to route conversions through, most liquid first.
+BRIDGE_ASSETS: tuple = ("USDT", "BTC", "ETH", "BNB", "FDUSD", "BUSD")
+
+# Candlesticks
+KLINES_DIR: str = path.join(PROJECT_DIR, "klines")
+KLINES_PAGE_LIMIT: int = 1000
+KLINE_INTERVALS: tuple = (
+    "1s",
+    "1m",
+    "3m",
+    "5m",
+    "15m",
+    "30m",
+    "1h",
+    "2h",
+    "4h",
+    "6h",
+    "8h",
+    "12h",
+    "1d",
+    "3d",
+    "1w",
+    "1M",
+)
+
+# Market data streams
+STREAM_URL: str = "wss://stream.binance.com:9443"
+STREAM_RECONNECT_DELAY: float = 5
+# Seconds without messages of a symbol before its streamed prices are ignored.
+STREAM_MAX_AGE: float = 10
+DEPTH_SNAPSHOT_LIMIT: int = 1000
+# Backoff between failed REST snapshots of the streamed state.
+STREAM_RETRY_DELAY: float = 1
+STREAM_RETRY_MAX_DELAY: float = 30
+
+# User data stream
+LISTEN_KEY_KEEPALIVE: float = 30 * 60
+
+# Rate limits
+WEIGHT_LIMIT: int = 6000
+WEIGHT_INTERVAL: float = 60
+ORDER_LIMIT: int = 50
+ORDER_INTERVAL: float = 10
+RATE_LIMIT_RETRIES: int = 3
+
+# Orders
+ORDER_RETRIES: int = 2
+
+# Metrics
+# Histogram upper bounds, in seconds and bytes.
+LATENCY_BUCKETS: tuple = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS: tuple = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+METRICS_PATH: str = path.join(PROJECT_DIR, "metrics.prom")
+
+# Terminal output
+# Rows per page of the long tables.
+PAGE_SIZE: int = 50
@@ -1,36 +1,71 @@
 """ Main function """
 
-import sys
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import inquirer
 
 import views
-from binance import Binance
-from models import Account, AvgPrice, NewOrder, Order, Profit, Trade
+from client import (
+    get_async_binance,
+    get_binance,
+    get_market_stream,
+    get_portfolio,
+    get_profit,
+    get_user_stream,
+)
+from constants import METRICS_PATH, PORTFOLIO_QUOTE
+from metrics import Metrics
+
+if TYPE_CHECKING:
+    from async_binance import AsyncBinance
+    from models import Account, Balance, Order, Profit, Ticker, Ticker24h
+    from portfolio import Valuation
+    from trade_table import TradeTable
+    from user_stream import UserDataStream
 
-binance: Binance = Binance()
+# Models, the client and the streams are loaded on first use,
+# so the menu shows up without waiting for them.
+# pylint: disable=import-outside-toplevel
 
 OPTIONS: Tuple[str] = (
     "Account",
     "Balance",
     "Price of coin",
     "Profit Stats",
+    "Portfolio Stats",
+    "Portfolio value",
     "New Order",
     "Open orders",
     "Cancel order",
+    "Stats",
     "Exit",
 )
 
 
+def _user_state() -> "UserDataStream":
+    """
+    Start the user data stream on first use.
+    Balances and open orders are then read from its local state, or
+    from the account cache while it isn't running.
+    :return: UserDataStream object.
+    """
+    user_stream: "UserDataStream" = get_user_stream()
+    try:
+        user_stream.start()
+    except (Exception, SystemExit):  # pylint: disable=broad-except
+        # The client exits on bad responses. Reads go over REST and
+        # the stream is started again on the next one.
+        pass
+    return user_stream
+
+
 def account_interface() -> None:
     """
     Query and show account information.
     :return: None
     """
-    account: Account = binance.get_account()
+    account: "Account" = _user_state().get_account()
     views.show_account(account=account)
-    main_interface()
 
 
 def balance_interface() -> None:
@@ -38,41 +73,33 @@ def balance_interface() -> None:
     Query and show current balance.
     :return: None
     """
-    account: Account = binance.get_account()
-    views.show_balance(account=account)
-    main_interface()
+    balances: List["Balance"] = _user_state().get_balances()
+    views.show_balance(balances=balances)
 
 
-def _calc_profit(trades: List[Trade]) -> Profit:
+def _watch(symbols: List[str]) -> None:
     """
-    Calc profit.
-    :param trades: List of Trade object.
-    :return: Profit object.
+    Stream the prices of symbols, so their next lookups are local.
+    Order books aren't streamed, each one needs a REST snapshot.
+    :param symbols: List of symbols.
+    :return: None
     """
-    for trade in trades:
-        total_qty_buy: float = sum(
-            float(trade.qty) for trade in trades if trade.is_buyer
-        )
-        total_qty_sell: float = sum(
-            float(trade.qty) for trade in trades if not trade.is_buyer
-        )
-        total_value_buy: float = sum(
-            float(trade.quote_qty) for trade in trades if trade.is_buyer
-        )
-        total_value_sell: float = sum(
-            float(trade.quote_qty) for trade in trades if not trade.is_buyer
-        )
-    symbol: str = trades[0].symbol
-    total_qty: float = total_qty_buy - total_qty_sell
-    total_value: float = total_value_buy - total_value_sell
-    avg: AvgPrice = binance.get_avg_price(symbol)
-    current_value: float = float(avg.price) * total_qty
-    return Profit(
-        symbol=symbol,
-        qty=total_qty,
-        buy_value=total_value,
-        current_value=current_value,
-    )
+    get_market_stream().subscribe(symbols)
+    get_market_stream().start()
+
+
+def _current_price(symbol: str) -> Optional[float]:
+    """
+    Latest price of a symbol: streamed if watched and the stream is live,
+    else from the snapshot.
+    :param symbol: String with the symbol.
+    :return: Float with the price, None if the symbol is unknown.
+    """
+    price: Optional[float] = get_market_stream().last_price(symbol)
+    if price is not None:
+        return price
+    ticker: Optional["Ticker"] = get_binance().prices.get(symbol)
+    return float(ticker.price) if ticker else None
 
 
 def profits_interface() -> None:
@@ -87,13 +114,64 @@ def profits_interface() -> None:
         )
     ]
     answer = inquirer.prompt(question)
-    pairs: List[str] = answer["pairs"].replace(" ", "").split(",")
-    profits: List[Profit] = []
+    # Each pair once, its position isn't safe to update concurrently.
+    pairs: List[str] = list(dict.fromkeys(answer["pairs"].replace(" ", "").split(",")))
+    prices: Dict[str, Optional[float]] = {
+        pair: _current_price(pair) for pair in pairs
+    }
     for pair in pairs:
-        trades: List[Trade] = binance.get_trades(symbol=pair)
-        profits.append(_calc_profit(trades))
-    views.profit_stats(profits)
-    main_interface()
+        if prices[pair] is None:
+            print(f"Unknown symbol: {pair}")
+    pairs = [pair for pair in pairs if prices[pair] is not None]
+    _watch(pairs)
+    # Every pair is processed concurrently.
+    async_binance: "AsyncBinance" = get_async_binance()
+    profits: Dict[str, "Profit"] = async_binance.run(
+        async_binance.map_symbols(
+            lambda pair: async_binance.call(get_profit, pair, prices[pair]),
+            pairs,
+        )
+    )
+    views.profit_stats(list(profits.values()))
+
+
+def portfolio_interface() -> None:
+    """
+    Show profit stats of every symbol in the local trade store.
+    :return: None
+    """
+    from trade_table import TradeTable
+
+    table: "TradeTable" = TradeTable.from_store(get_binance().trade_store)
+    prices: Dict[str, "Ticker"] = get_binance().prices.snapshot()
+    views.profit_stats(
+        table.profits({symbol: float(item.price) for symbol, item in prices.items()})
+    )
+
+
+def valuation_interface() -> None:
+    """
+    Value every balance in a quote asset, converting through other
+    pairs when there's no direct one.
+    :return: None
+    """
+    question = [
+        inquirer.Text(
+            name="quote",
+            message="Quote asset",
+            default=PORTFOLIO_QUOTE,
+        )
+    ]
+    quote: str = inquirer.prompt(question)["quote"].upper()
+    if quote not in get_portfolio().graph:
+        print(f"Unknown asset: {quote}")
+        return
+    valuation: "Valuation" = get_portfolio().valuation(quote)
+    valuation.set_balances(_user_state().get_balances())
+    valuation.update_prices(_current_price)
+    views.show_portfolio(valuation.holdings(), valuation.total, quote)
+    # Streamed from now on, so the next valuation is up to date.
+    _watch(sorted(valuation.symbols()))
 
 
 def price_interface():
@@ -108,8 +186,14 @@ def price_interface():
         )
     ]
     answer = inquirer.prompt(question)
-    views.symbol_price(symbol=answer["symbol"])
-    main_interface()
+    symbol: str = answer["symbol"].upper()
+    ticker: Optional["Ticker24h"] = get_binance().tickers_24h.get(symbol)
+    if ticker is None:
+        print(f"Unknown symbol: {symbol}")
+    else:
+        live_price: Optional[float] = get_market_stream().last_price(symbol)
+        views.symbol_price(ticker=ticker, live_price=live_price)
+        _watch([symbol])
 
 
 def place_order_interface() -> None:
@@ -117,6 +201,8 @@ def place_order_interface() -> None:
     CLI interface for making orders.
     :return: None
     """
+    from models import NewOrder, Response
+
     price: Optional[float] = None
     order_type_question = [
         inquirer.List(
@@ -149,9 +235,13 @@ def place_order_interface() -> None:
         qty=answers["qty"],
         price=price if "price" not in answers else answers["price"],
     )
-    order: Order = binance.create_order(order=new_order)
+    # Checked locally first, so a typo doesn't cost a rejected request.
+    prepared: Union["NewOrder", "Response"] = get_binance().prepare_order(new_order)
+    if isinstance(prepared, Response):
+        views.order_rejected(error=prepared)
+        return
+    order: "Order" = get_binance().create_order(order=prepared)
     views.place_order(order=order)
-    main_interface()
 
 
 def open_orders_interface() -> None:
@@ -159,9 +249,8 @@ def open_orders_interface() -> None:
     Show a list of open orders.
     :return: None.
     """
-    orders: List[Order] = binance.get_open_orders()
+    orders: List["Order"] = _user_state().get_open_orders()
     views.open_orders(orders=orders)
-    main_interface()
 
 
 def cancel_order_interface() -> None:
@@ -169,7 +258,7 @@ def cancel_order_interface() -> None:
     Cancel an open order.
     :return: None.
     """
-    open_orders_interface()
+    views.open_orders(orders=_user_state().get_open_orders())
     questions = [
         inquirer.Text(
             name="symbol",
@@ -181,16 +270,27 @@ def cancel_order_interface() -> None:
         ),
     ]
     answers = inquirer.prompt(questions)
-    order: Order = binance.cancel_open_order(
+    order: "Order" = get_binance().cancel_open_order(
         symbol=answers["symbol"].upper(), order_id=int(answers["order_id"])
     )
     views.cancel_order(order=order)
-    main_interface()
+
+
+def stats_interface() -> None:
+    """
+    Show the request metrics and dump them for Prometheus.
+    :return: None.
+    """
+    metrics: Metrics = get_binance().metrics
+    with open(METRICS_PATH, "w", encoding="utf-8") as file:
+        file.write(metrics.to_prometheus())
+    views.show_stats(metrics.summary(), METRICS_PATH)
 
 
 def main_interface() -> None:
     """
-    CLI main.
+    CLI main. Runs the picked actions in a loop until Exit is picked,
+    so a long session doesn't grow the stack.
     :return: None
     """
     actions = (
@@ -198,13 +298,15 @@ def main_interface() -> None:
         balance_interface,
         price_interface,
         profits_interface,
+        portfolio_interface,
+        valuation_interface,
         place_order_interface,
         open_orders_interface,
         cancel_order_interface,
-        sys.exit,
+        stats_interface,
+        None,
     )
     call_function: dict = dict(zip(OPTIONS, actions))
-    views.print_markdown("## Binance bot")
     question = [
         inquirer.List(
             name="choice",
@@ -212,8 +314,13 @@ def main_interface() -> None:
             choices=list(OPTIONS),
         )
     ]
-    answer = inquirer.prompt(question)
-    call_function[answer["choice"]]()
+    while True:
+        views.print_markdown("## Binance bot")
+        answer = inquirer.prompt(question)
+        # No answer when the prompt is interrupted with Ctrl+C.
+        if answer is None or call_function[answer["choice"]] is None:
+            return
+        call_function[answer["choice"]]()
 
 
 if __name__ == "__main__":
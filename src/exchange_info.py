@@ -0,0 +1,318 @@
+""" Trading rules cache and local order checks """
+
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from constants import EXCHANGE_INFO_PATH, EXCHANGE_INFO_TTL, EXCHANGE_INFO_VERSION
+from models import NewOrder, Response
+
+# Error codes of the exchange, so local failures read like remote ones.
+FILTER_FAILURE: str = "-1013"
+MANDATORY_PARAM: str = "-1102"
+INVALID_SYMBOL: str = "-1121"
+# Keys of each symbol kept in the cached file.
+SYMBOL_KEYS: Tuple[str, ...] = (
+    "symbol",
+    "status",
+    "baseAsset",
+    "quoteAsset",
+    "filters",
+)
+ZERO: Decimal = Decimal(0)
+
+
+def _round(value: Decimal, step: Decimal, rounding: str) -> Decimal:
+    """Round a value to a multiple of step, unless step is zero"""
+    if not step:
+        return value
+    return (value / step).to_integral_value(rounding) * step
+
+
+class SymbolRules(NamedTuple):
+    """
+    Filters of a symbol, as Decimals. Zero means no limit.
+    """
+
+    symbol: str
+    status: str
+    base_asset: str
+    quote_asset: str
+    tick_size: Decimal
+    min_price: Decimal
+    max_price: Decimal
+    step_size: Decimal
+    min_qty: Decimal
+    max_qty: Decimal
+    market_step_size: Decimal
+    market_min_qty: Decimal
+    market_max_qty: Decimal
+    notional_filter: str
+    min_notional: Decimal
+    max_notional: Decimal
+    apply_min_to_market: bool
+    apply_max_to_market: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SymbolRules":
+        """
+        Read the filters of a symbol.
+        :param data: Dict of the symbol, as in the exchangeInfo response.
+        :return: SymbolRules object.
+        """
+        filters: Dict[str, dict] = {
+            item["filterType"]: item for item in data["filters"]
+        }
+        price: dict = filters.get("PRICE_FILTER", {})
+        lot: dict = filters.get("LOT_SIZE", {})
+        market: dict = filters.get("MARKET_LOT_SIZE", {})
+        # Older symbols have MIN_NOTIONAL instead of NOTIONAL.
+        name: str = "NOTIONAL" if "NOTIONAL" in filters else "MIN_NOTIONAL"
+        notional: dict = filters.get(name, {})
+        return cls(
+            symbol=data["symbol"],
+            status=data["status"],
+            base_asset=data["baseAsset"],
+            quote_asset=data["quoteAsset"],
+            tick_size=Decimal(price.get("tickSize", "0")),
+            min_price=Decimal(price.get("minPrice", "0")),
+            max_price=Decimal(price.get("maxPrice", "0")),
+            step_size=Decimal(lot.get("stepSize", "0")),
+            min_qty=Decimal(lot.get("minQty", "0")),
+            max_qty=Decimal(lot.get("maxQty", "0")),
+            market_step_size=Decimal(market.get("stepSize", "0")),
+            market_min_qty=Decimal(market.get("minQty", "0")),
+            market_max_qty=Decimal(market.get("maxQty", "0")),
+            notional_filter=name,
+            min_notional=Decimal(notional.get("minNotional", "0")),
+            max_notional=Decimal(notional.get("maxNotional", "0")),
+            apply_min_to_market=notional.get(
+                "applyMinToMarket", notional.get("applyToMarket", False)
+            ),
+            apply_max_to_market=notional.get("applyMaxToMarket", False),
+        )
+
+    def round_price(self, price: float) -> float:
+        """
+        Round a price to the nearest tick.
+        :param price: Float with the price.
+        :return: Float with the rounded price.
+        """
+        return float(_round(Decimal(str(price)), self.tick_size, ROUND_HALF_UP))
+
+    def round_qty(self, qty: float, market: bool = False) -> float:
+        """
+        Round a quantity down to the lot step.
+        :param qty: Float with the quantity.
+        :param market: True for the step of MARKET orders.
+        :return: Float with the rounded quantity.
+        """
+        step: Decimal = (market and self.market_step_size) or self.step_size
+        return float(_round(Decimal(str(qty)), step, ROUND_DOWN))
+
+    def _qty_limits(self, market: bool) -> Tuple[str, Decimal, Decimal]:
+        """Filter name, min and max quantity of an order type"""
+        if not market:
+            return "LOT_SIZE", self.min_qty, self.max_qty
+        max_qty: Decimal = min(
+            (limit for limit in (self.max_qty, self.market_max_qty) if limit),
+            default=ZERO,
+        )
+        return "MARKET_LOT_SIZE", max(self.min_qty, self.market_min_qty), max_qty
+
+    def prepare(
+        self, order: NewOrder, market_price: Optional[float] = None
+    ) -> Union[NewOrder, Response]:
+        """
+        Round an order to the filters and check it, as the exchange would.
+        :param order: New order object.
+        :param market_price: Optional price to check the notional of
+        MARKET orders, which is skipped without it.
+        :return: New order object rounded, or Response object with the
+        filter that failed.
+        """
+        if self.status != "TRADING":
+            return Response(code=FILTER_FAILURE, msg="Market is closed.")
+        market: bool = order.type_.upper() in ["M", "MARKET"]
+        step: Decimal = (market and self.market_step_size) or self.step_size
+        qty: Decimal = _round(Decimal(str(order.qty)), step, ROUND_DOWN)
+        name, min_qty, max_qty = self._qty_limits(market)
+        if qty <= ZERO or qty < min_qty or (max_qty and qty > max_qty):
+            return Response(code=FILTER_FAILURE, msg=f"Filter failure: {name}")
+        price: Optional[Decimal] = None
+        if not market:
+            if order.price is None:
+                return Response(
+                    code=MANDATORY_PARAM,
+                    msg="Mandatory parameter 'price' was not sent.",
+                )
+            price = _round(Decimal(str(order.price)), self.tick_size, ROUND_HALF_UP)
+            if (
+                price <= ZERO
+                or price < self.min_price
+                or (self.max_price and price > self.max_price)
+            ):
+                return Response(code=FILTER_FAILURE, msg="Filter failure: PRICE_FILTER")
+        reference: Optional[Decimal] = price
+        if market and market_price is not None:
+            reference = Decimal(str(market_price))
+        if reference is not None:
+            notional: Decimal = qty * reference
+            if (
+                self.min_notional
+                and notional < self.min_notional
+                and (not market or self.apply_min_to_market)
+            ) or (
+                self.max_notional
+                and notional > self.max_notional
+                and (not market or self.apply_max_to_market)
+            ):
+                return Response(
+                    code=FILTER_FAILURE, msg=f"Filter failure: {self.notional_filter}"
+                )
+        return order.copy(
+            update={
+                "qty": float(qty),
+                "price": order.price if price is None else float(price),
+            }
+        )
+
+
+class ExchangeInfoCache:
+    """
+    Trading rules of every symbol, from the exchangeInfo endpoint.
+    They're kept in a JSON file with its format version and download
+    time, so they're downloaded once per `ttl`, across runs.
+    Each symbol is parsed on its first lookup.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], dict],
+        path: str = EXCHANGE_INFO_PATH,
+        ttl: float = EXCHANGE_INFO_TTL,
+    ):
+        self._fetch: Callable[[], dict] = fetch
+        self.path: str = path
+        self.ttl: float = ttl
+        self._symbols: Dict[str, dict] = {}
+        self._rules: Dict[str, SymbolRules] = {}
+        # Wall clock time, since it's stored in the file.
+        self.updated_at: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        """
+        Check if the rules are older than the TTL.
+        :return: True if they must be downloaded again.
+        """
+        return self.updated_at is None or time.time() - self.updated_at > self.ttl
+
+    def _load(self, data: dict) -> None:
+        self._symbols = data["symbols"]
+        self._rules = {}
+        self.updated_at = data["updated_at"]
+
+    def _read(self) -> None:
+        """Load the cached file, unless it's missing or of another version"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data: dict = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == EXCHANGE_INFO_VERSION:
+            self._load(data)
+
+    def _refresh(self) -> None:
+        info: dict = self._fetch()
+        data: dict = {
+            "version": EXCHANGE_INFO_VERSION,
+            "updated_at": time.time(),
+            "symbols": {
+                item["symbol"]: {key: item[key] for key in SYMBOL_KEYS}
+                for item in info["symbols"]
+            },
+        }
+        # A temporary file of its own, account processes may refresh at once.
+        handle, temp_path = tempfile.mkstemp(
+            suffix=".tmp", dir=os.path.dirname(self.path) or "."
+        )
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._load(data)
+
+    def refresh(self) -> None:
+        """
+        Download the rules and write them to the file.
+        :return: None.
+        """
+        with self._lock:
+            self._refresh()
+
+    def invalidate(self) -> None:
+        """
+        Force a download on the next lookup, e.g. after the exchange
+        rejected an order that passed the local checks.
+        :return: None.
+        """
+        with self._lock:
+            self.updated_at = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _ensure(self) -> None:
+        """Load the file, or download the rules if it's stale"""
+        if self.is_stale():
+            self._read()
+            if self.is_stale():
+                self._refresh()
+
+    def pairs(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Get the base and quote assets of every trading symbol.
+        :return: Dict of symbol -> (base asset, quote asset).
+        """
+        with self._lock:
+            self._ensure()
+            return {
+                symbol: (item["baseAsset"], item["quoteAsset"])
+                for symbol, item in self._symbols.items()
+                if item["status"] == "TRADING"
+            }
+
+    def assets(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """
+        Get the base and quote assets of a symbol.
+        :param symbol: String with the symbol.
+        :return: Tuple with the base and quote assets, None if the
+        symbol is unknown.
+        """
+        with self._lock:
+            self._ensure()
+            item: Optional[dict] = self._symbols.get(symbol)
+            return None if item is None else (item["baseAsset"], item["quoteAsset"])
+
+    def get(self, symbol: str) -> Optional[SymbolRules]:
+        """
+        Get the rules of a symbol.
+        :param symbol: String with the symbol.
+        :return: SymbolRules object, None if the symbol is unknown.
+        """
+        with self._lock:
+            self._ensure()
+            rules: Optional[SymbolRules] = self._rules.get(symbol)
+            if rules is None and symbol in self._symbols:
+                rules = SymbolRules.from_dict(self._symbols[symbol])
+                self._rules[symbol] = rules
+            return rules
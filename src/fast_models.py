@@ -0,0 +1,187 @@
+""" Compact records decoded straight from the responses """
+
+import json
+from operator import itemgetter
+from typing import Any, Callable, List, NamedTuple, Optional, Type
+
+from pydantic import BaseModel
+
+from models import Account, Balance, Fill, Order, Trade
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pylint: disable=too-few-public-methods
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a JSON body, with orjson when it is installed.
+    :param data: Bytes with the JSON document.
+    :return: Decoded data.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _getter(model: Type[BaseModel]) -> Callable[[dict], tuple]:
+    """
+    Build a function picking the values of a model from a raw dict,
+    using the aliases of the pydantic model.
+    Missing required keys raise KeyError, missing optional ones are None.
+    :param model: Pydantic model class.
+    :return: Callable(dict) -> tuple with the values in field order.
+    """
+    fields: list = list(model.__fields__.values())
+    if all(field.required for field in fields):
+        return itemgetter(*(field.alias for field in fields))
+    keys: List[tuple] = [(field.alias, field.required) for field in fields]
+    return lambda data: tuple(
+        data[key] if required else data.get(key) for key, required in keys
+    )
+
+
+def _compatible(cls: type) -> type:
+    """
+    Add the pydantic methods used by the rest of the code to a record.
+    :param cls: NamedTuple class.
+    :return: The same class.
+    """
+    cls.dict = lambda self: self._asdict()
+    cls.copy = lambda self, update=None: self._replace(**(update or {}))
+    return cls
+
+
+@_compatible
+class FastTrade(NamedTuple):
+    """Trade record, with the fields of models.Trade"""
+
+    symbol: str
+    id_: int
+    order_id: int
+    order_list_id: int
+    price: str
+    qty: str
+    quote_qty: str
+    commission: str
+    commission_asset: str
+    time: int
+    is_buyer: bool
+    is_maker: bool
+    is_best_match: bool
+
+    @classmethod
+    def from_list(cls, data: List[dict]) -> List["FastTrade"]:
+        """
+        Decode a list of trades.
+        :param data: List of dicts from the API.
+        :return: List of FastTrade object.
+        """
+        make: Callable[[tuple], FastTrade] = cls._make
+        return [make(_TRADE(item)) for item in data]
+
+
+@_compatible
+class FastFill(NamedTuple):
+    """Fill record, with the fields of models.Fill"""
+
+    price: str
+    qty: str
+    commission: str
+    commission_asset: str
+
+
+@_compatible
+class FastOrder(NamedTuple):
+    """Order record, with the fields of models.Order"""
+
+    symbol: str
+    order_id: int
+    order_list_id: int
+    client_order_id: str
+    transact_time: Optional[int]
+    price: str
+    executed_qty: str
+    cummulative_quote_qty: str
+    status: str
+    time_in_force: str
+    type_: str
+    side: str
+    fills: Optional[List[FastFill]]
+    stop_price: Optional[str]
+    iceberg_qty: Optional[str]
+    time: Optional[int]
+    update_time: Optional[int]
+    is_working: Optional[bool]
+    orig_quote_order_qty: Optional[str]
+    orig_qty: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FastOrder":
+        """
+        Decode an order.
+        :param data: Dict from the API.
+        :return: FastOrder object.
+        """
+        order: FastOrder = cls._make(_ORDER(data))
+        if order.fills:
+            fills: List[FastFill] = [FastFill._make(_FILL(x)) for x in order.fills]
+            order = order._replace(fills=fills)
+        return order
+
+    @classmethod
+    def from_list(cls, data: List[dict]) -> List["FastOrder"]:
+        """
+        Decode a list of orders.
+        :param data: List of dicts from the API.
+        :return: List of FastOrder object.
+        """
+        return [cls.from_dict(item) for item in data]
+
+
+@_compatible
+class FastBalance(NamedTuple):
+    """Balance record, with the fields of models.Balance"""
+
+    asset: str
+    free: str
+    locked: str
+
+
+@_compatible
+class FastAccount(NamedTuple):
+    """Account record, with the fields of models.Account"""
+
+    maker_commission: int
+    taker_commission: int
+    buyer_commission: int
+    seller_commission: int
+    can_trade: bool
+    can_withdraw: bool
+    can_deposit: bool
+    update_time: int
+    account_type: str
+    balances: List[FastBalance]
+    permissions: List[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FastAccount":
+        """
+        Decode an account.
+        :param data: Dict from the API.
+        :return: FastAccount object.
+        """
+        account: FastAccount = cls._make(_ACCOUNT(data))
+        make: Callable[[tuple], FastBalance] = FastBalance._make
+        balances: List[FastBalance] = [make(_BALANCE(x)) for x in account.balances]
+        return account._replace(balances=balances)
+
+
+_TRADE: Callable[[dict], tuple] = _getter(Trade)
+_FILL: Callable[[dict], tuple] = _getter(Fill)
+_ORDER: Callable[[dict], tuple] = _getter(Order)
+_BALANCE: Callable[[dict], tuple] = _getter(Balance)
+_ACCOUNT: Callable[[dict], tuple] = _getter(Account)
@@ -0,0 +1,128 @@
+""" API host selection """
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+from constants import HOST_BACKOFF, LATENCY_WINDOW, PUBLIC_ONLY_HOSTS
+
+
+class HostStats:
+    """
+    Latencies of the last requests to a host and its health.
+    """
+
+    def __init__(self, url: str, window: int = LATENCY_WINDOW):
+        self.url: str = url
+        self.public_only: bool = url in PUBLIC_ONLY_HOSTS
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.errors: int = 0
+        self.down_until: float = 0.0
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Latency percentile over the window.
+        :param quantile: Float between 0 and 1, e.g. 0.95.
+        :return: Float with the seconds, None without samples.
+        """
+        if not self.latencies:
+            return None
+        ordered: List[float] = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    @property
+    def is_healthy(self) -> bool:
+        """False while backing off after an error"""
+        return time.monotonic() >= self.down_until
+
+
+class HostSelector:
+    """
+    Ranks API hosts by moving median latency.
+    Hosts without samples are tried first, so every host gets measured,
+    and a host that fails is skipped for HOST_BACKOFF seconds.
+    """
+
+    def __init__(self, hosts: Sequence[str], backoff: float = HOST_BACKOFF):
+        self.stats: Dict[str, HostStats] = {url: HostStats(url) for url in hosts}
+        self.backoff: float = backoff
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, url: str, latency: float) -> None:
+        """
+        Record a successful request.
+        :param url: String with the host URL.
+        :param latency: Float with the seconds it took.
+        :return: None.
+        """
+        with self._lock:
+            stats: HostStats = self.stats[url]
+            stats.latencies.append(latency)
+            stats.errors = 0
+            stats.down_until = 0.0
+
+    def record_error(self, url: str) -> None:
+        """
+        Record a failed request. The host is skipped for a while,
+        longer after consecutive errors.
+        :param url: String with the host URL.
+        :return: None.
+        """
+        with self._lock:
+            stats: HostStats = self.stats[url]
+            stats.errors += 1
+            backoff: float = self.backoff * min(2 ** (stats.errors - 1), 16)
+            stats.down_until = time.monotonic() + backoff
+
+    def ranked(self, public: bool = True) -> List[str]:
+        """
+        Hosts from best to worst: healthy first, then by median latency.
+        :param public: False to exclude the hosts without signed endpoints.
+        :return: List of host URLs.
+        """
+        with self._lock:
+            candidates: List[HostStats] = [
+                stats
+                for stats in self.stats.values()
+                if public or not stats.public_only
+            ]
+            key: Callable[[HostStats], tuple] = lambda stats: (
+                not stats.is_healthy,
+                stats.percentile(0.5) or 0.0,
+            )
+            return [stats.url for stats in sorted(candidates, key=key)]
+
+    def best(self, public: bool = True) -> str:
+        """
+        Fastest healthy host.
+        :param public: False to exclude the hosts without signed endpoints.
+        :return: String with the host URL.
+        """
+        return self.ranked(public)[0]
+
+    def hedge_delay(self, url: str, default: float) -> float:
+        """
+        Time to wait for a host before hedging: its p95 latency.
+        :param url: String with the host URL.
+        :param default: Float with the seconds to use without samples.
+        :return: Float with the seconds.
+        """
+        with self._lock:
+            delay: Optional[float] = self.stats[url].percentile(0.95)
+        return default if delay is None else delay
+
+    def probe(self, ping: Callable[[str], None]) -> None:
+        """
+        Measure every host once.
+        :param ping: Callable sending a cheap request to a host URL.
+        :return: None.
+        """
+        for url in list(self.stats):
+            start: float = time.perf_counter()
+            try:
+                ping(url)
+            except Exception:  # pylint: disable=broad-except
+                self.record_error(url)
+                continue
+            self.record(url, time.perf_counter() - start)
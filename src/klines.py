@@ -0,0 +1,197 @@
+""" Candlestick cache """
+
+import os
+import threading
+import time
+from typing import Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from constants import KLINES_DIR
+
+KLINE_DTYPE: np.dtype = np.dtype(
+    [
+        ("open_time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+        ("close_time", "<i8"),
+        ("quote_volume", "<f8"),
+        ("trades", "<i8"),
+        ("taker_buy_volume", "<f8"),
+        ("taker_buy_quote_volume", "<f8"),
+    ]
+)
+
+# Fetches pages of candles: (symbol, interval, start_time, end_time) -> records.
+KlineFetch = Callable[[str, str, int, int], Iterator[np.ndarray]]
+
+
+class Klines(NamedTuple):
+    """Candlesticks as columns"""
+
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    close_time: np.ndarray
+    quote_volume: np.ndarray
+    trades: np.ndarray
+    taker_buy_volume: np.ndarray
+    taker_buy_quote_volume: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> "Klines":
+        """
+        Split KLINE_DTYPE records into columns, without copying.
+        :param records: Array of KLINE_DTYPE.
+        :return: Klines object.
+        """
+        return cls(*(records[name] for name in KLINE_DTYPE.names))
+
+
+def to_records(rows: list) -> np.ndarray:
+    """
+    Convert rows from the klines endpoint to records.
+    :param rows: List of kline lists, as returned by the API.
+    :return: Array of KLINE_DTYPE.
+    """
+    return np.array([tuple(row[:11]) for row in rows], dtype=KLINE_DTYPE)
+
+
+class KlineCache:
+    """
+    Append-only file of closed candles per symbol and interval,
+    read back through a memory map.
+    The cached candles are a contiguous range, so only the candles
+    before it or after it are ever downloaded.
+    """
+
+    def __init__(self, fetch: KlineFetch, cache_dir: str = KLINES_DIR):
+        self._fetch: KlineFetch = fetch
+        self.cache_dir: str = cache_dir
+        self._lock: threading.Lock = threading.Lock()
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}.bin")
+
+    def _start_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}.start")
+
+    def _start(self, symbol: str, interval: str, first: int) -> int:
+        """
+        Start of the downloaded range, which can be before the first
+        cached candle (e.g. 0 for the listing). Older files without it
+        start at their first candle.
+        """
+        path: str = self._start_path(symbol, interval)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return min(int(file.read()), first)
+        except (OSError, ValueError):
+            return first
+
+    def _set_start(self, symbol: str, interval: str, start_time: int) -> None:
+        with open(self._start_path(symbol, interval), "w", encoding="utf-8") as file:
+            file.write(str(start_time))
+
+    def read(self, symbol: str, interval: str) -> np.ndarray:
+        """
+        Map the cached candles of a symbol.
+        :param symbol: String with the symbol.
+        :param interval: String with the interval, e.g. "1m".
+        :return: Read-only array of KLINE_DTYPE.
+        """
+        path: str = self._path(symbol, interval)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.memmap(path, dtype=KLINE_DTYPE, mode="r")
+
+    def _download(
+        self, symbol: str, interval: str, start_time: int, end_time: int
+    ) -> np.ndarray:
+        pages = list(self._fetch(symbol, interval, start_time, end_time))
+        if not pages:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.concatenate(pages)
+
+    def _append(self, path: str, records: np.ndarray) -> None:
+        if not len(records):
+            return
+        with open(path, "ab") as file:
+            file.write(records.tobytes())
+
+    def _prepend(self, path: str, records: np.ndarray) -> None:
+        # Rare: a range before the cached one. The file is rewritten.
+        if not len(records):
+            return
+        temp_path: str = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(records.tobytes())
+            if os.path.exists(path):
+                with open(path, "rb") as cached:
+                    file.write(cached.read())
+        os.replace(temp_path, path)
+
+    def get(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int = 0,
+        end_time: Optional[int] = None,
+    ) -> Klines:
+        """
+        Get the candles opened between two timestamps.
+        Missing closed candles are downloaded and cached first;
+        the candle still open is downloaded but never cached.
+        :param symbol: String with the symbol.
+        :param interval: String with the interval, e.g. "1m".
+        :param start_time: Int with the timestamp in ms.
+        :param end_time: Optional timestamp in ms, now by default.
+        :return: Klines object.
+        """
+        now: int = int(time.time() * 1000)
+        end_time = now if end_time is None else end_time
+        path: str = self._path(symbol, interval)
+        open_candles: np.ndarray = np.empty(0, dtype=KLINE_DTYPE)
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cached: np.ndarray = self.read(symbol, interval)
+            if not len(cached):
+                fetched: np.ndarray = self._download(
+                    symbol, interval, start_time, end_time
+                )
+                self._append(path, fetched[fetched["close_time"] < now])
+                self._set_start(symbol, interval, start_time)
+                open_candles = fetched[fetched["close_time"] >= now]
+            else:
+                first: int = int(cached["open_time"][0])
+                last: int = int(cached["open_time"][-1])
+                # Nothing before the downloaded range is requested again.
+                if start_time < self._start(symbol, interval, first):
+                    head: np.ndarray = self._download(
+                        symbol, interval, start_time, first - 1
+                    )
+                    self._prepend(path, head)
+                    self._set_start(symbol, interval, start_time)
+                if end_time > last:
+                    tail: np.ndarray = self._download(
+                        symbol, interval, last + 1, end_time
+                    )
+                    self._append(path, tail[tail["close_time"] < now])
+                    open_candles = tail[tail["close_time"] >= now]
+            cached = self.read(symbol, interval)
+        times: np.ndarray = cached["open_time"]
+        records: np.ndarray = cached[
+            np.searchsorted(times, start_time) : np.searchsorted(
+                times, end_time, side="right"
+            )
+        ]
+        open_candles = open_candles[open_candles["open_time"] >= start_time]
+        if len(open_candles):
+            records = np.concatenate([records, open_candles])
+        return Klines.from_records(records)
@@ -2,14 +2,25 @@
 
 import sys
 
-import controller
+import client
 
 
 def main():
     """
-    Main menu.
+    Main menu, or the command given in the arguments.
+    The shared client is closed on exit.
     """
-    controller.main_interface()
+    try:
+        if len(sys.argv) > 1:
+            import cli  # pylint: disable=import-outside-toplevel
+
+            cli.main(sys.argv[1:])
+        else:
+            import controller  # pylint: disable=import-outside-toplevel
+
+            controller.main_interface()
+    finally:
+        client.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,331 @@
+""" Market data streams """
+
+import json
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import websocket
+
+from constants import (
+    STREAM_MAX_AGE,
+    STREAM_RECONNECT_DELAY,
+    STREAM_RETRY_DELAY,
+    STREAM_RETRY_MAX_DELAY,
+    STREAM_URL,
+)
+from models import BookTicker
+
+# Fetches an order book snapshot: symbol -> {lastUpdateId, bids, asks}.
+DepthFetch = Callable[[str], dict]
+
+
+def close_app(app: websocket.WebSocketApp) -> None:
+    """
+    Stop a WebSocketApp and its reconnections.
+    WebSocketApp.close() reads the close reply itself, so the reading
+    thread can miss it and wait for its 10 s select timeout. Shutting
+    the socket down after the close frame wakes it right away.
+    :param app: WebSocketApp object.
+    :return: None.
+    """
+    app.keep_running = False
+    sock: Optional[websocket.WebSocket] = app.sock
+    if sock is None or sock.sock is None:
+        return
+    try:
+        sock.send_close()
+        sock.sock.shutdown(socket.SHUT_RDWR)
+    except (OSError, websocket.WebSocketException):
+        # Already closed by the other side.
+        pass
+
+
+class OrderBook:
+    """
+    Local order book, synced from a REST snapshot plus diff updates.
+    See "How to manage a local order book correctly" in the
+    Binance WebSocket streams documentation.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol: str = symbol
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.last_update_id: int = 0
+        self.synced: bool = False
+
+    def apply_snapshot(self, snapshot: dict) -> None:
+        """
+        Replace the book with a REST snapshot.
+        :param snapshot: Dict with lastUpdateId, bids and asks.
+        :return: None.
+        """
+        self.bids = {float(price): float(qty) for price, qty in snapshot["bids"]}
+        self.asks = {float(price): float(qty) for price, qty in snapshot["asks"]}
+        self.last_update_id = snapshot["lastUpdateId"]
+        self.synced = False
+
+    def apply_diff(self, event: dict) -> bool:
+        """
+        Apply a depthUpdate event.
+        :param event: Dict with the event data.
+        :return: False if an update was missed and a new snapshot is needed.
+        """
+        if event["u"] <= self.last_update_id:
+            return True
+        if self.synced:
+            if event["U"] != self.last_update_id + 1:
+                return False
+        elif event["U"] > self.last_update_id + 1:
+            return False
+        for side, levels in ((self.bids, event["b"]), (self.asks, event["a"])):
+            for price, qty in levels:
+                if float(qty):
+                    side[float(price)] = float(qty)
+                else:
+                    side.pop(float(price), None)
+        self.last_update_id = event["u"]
+        self.synced = True
+        return True
+
+    def best_bid(self) -> Optional[float]:
+        """Highest bid price"""
+        return max(self.bids) if self.bids else None
+
+    def best_ask(self) -> Optional[float]:
+        """Lowest ask price"""
+        return min(self.asks) if self.asks else None
+
+
+class MarketStream:
+    """
+    Combined trade and bookTicker streams for a set of symbols, plus
+    depth streams for the ones subscribed with `depth`.
+    Messages update in-memory tables (last price, best bid/ask and
+    local order books) that can be read without network latency.
+    Symbols without messages for `max_age` seconds read as unknown,
+    so callers fall back to REST while the stream is down.
+    """
+
+    def __init__(
+        self,
+        fetch_depth: Optional[DepthFetch] = None,
+        url: str = STREAM_URL,
+        reconnect: float = STREAM_RECONNECT_DELAY,
+        max_age: float = STREAM_MAX_AGE,
+    ):
+        self._fetch_depth: Optional[DepthFetch] = fetch_depth
+        self.url: str = url
+        self.reconnect: float = reconnect
+        self.max_age: float = max_age
+        self.streams: Set[str] = set()
+        # Streams in the URL of the connection, the rest are subscribed on open.
+        self._url_streams: Set[str] = set()
+        self.last_prices: Dict[str, float] = {}
+        # Monotonic time of the last message of each symbol.
+        self.received_at: Dict[str, float] = {}
+        self.book_tickers: Dict[str, BookTicker] = {}
+        self.order_books: Dict[str, OrderBook] = {}
+        self._buffers: Dict[str, List[dict]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop: threading.Event = threading.Event()
+        self._request_id: int = 0
+
+    @staticmethod
+    def _streams(symbols: Iterable[str], depth: bool) -> Set[str]:
+        streams: Set[str] = set()
+        for symbol in symbols:
+            name: str = symbol.lower()
+            streams |= {f"{name}@trade", f"{name}@bookTicker"}
+            if depth:
+                streams.add(f"{name}@depth@100ms")
+        return streams
+
+    @property
+    def is_running(self) -> bool:
+        """True if the connection thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Connect and process messages from a background thread.
+        The connection is reopened if it drops.
+        :return: None.
+        """
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._url_streams = set(self.streams)
+        self._ws = websocket.WebSocketApp(
+            f"{self.url}/stream?streams={'/'.join(sorted(self._url_streams))}",
+            on_open=lambda _: self._on_open(),
+            on_message=lambda _, message: self.handle(message),
+        )
+        self._thread = threading.Thread(
+            target=self._ws.run_forever,
+            kwargs={"ping_interval": 60, "reconnect": self.reconnect},
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _on_open(self) -> None:
+        """
+        Subscribe the streams added after the connection URL was built.
+        Reconnections reuse that URL, so it's done on every open.
+        """
+        self._send_subscribe(self.streams - self._url_streams)
+
+    def _send_subscribe(self, streams: Set[str]) -> None:
+        if not streams:
+            return
+        self._request_id += 1
+        try:
+            self._ws.send(
+                json.dumps(
+                    {
+                        "method": "SUBSCRIBE",
+                        "params": sorted(streams),
+                        "id": self._request_id,
+                    }
+                )
+            )
+        except websocket.WebSocketException:
+            # Dropped meanwhile, it's sent again on reconnection.
+            pass
+
+    def stop(self) -> None:
+        """
+        Close the connection.
+        :return: None.
+        """
+        self._stop.set()
+        if self._ws is not None:
+            close_app(self._ws)
+        if self._thread is not None:
+            self._thread.join()
+        self._ws = self._thread = None
+
+    def subscribe(self, symbols: List[str], depth: bool = False) -> None:
+        """
+        Add the trade and bookTicker streams of symbols, on the open
+        connection if any, else once it's opened.
+        :param symbols: List of symbols.
+        :param depth: True to also keep local order books of the
+        symbols, if there's a `fetch_depth`. Each sync needs a REST
+        snapshot of weight 50, so it's only done on request.
+        :return: None.
+        """
+        depth = depth and self._fetch_depth is not None
+        new: Set[str] = self._streams(symbols, depth) - self.streams
+        if not new:
+            return
+        self.streams |= new
+        if self.is_running and self._ws.sock and self._ws.sock.connected:
+            self._send_subscribe(new)
+
+    def handle(self, message: str) -> None:
+        """
+        Process a combined stream message.
+        :param message: String with the JSON message.
+        :return: None.
+        """
+        payload: dict = json.loads(message)
+        stream: Optional[str] = payload.get("stream")
+        if stream is None:
+            # Reply to a SUBSCRIBE request.
+            return
+        data: dict = payload["data"]
+        self.received_at[data["s"]] = time.monotonic()
+        if stream.endswith("@trade"):
+            self.last_prices[data["s"]] = float(data["p"])
+        elif stream.endswith("@bookTicker"):
+            self.book_tickers[data["s"]] = BookTicker(
+                symbol=data["s"],
+                bid_price=float(data["b"]),
+                bid_qty=float(data["B"]),
+                ask_price=float(data["a"]),
+                ask_qty=float(data["A"]),
+            )
+        elif "@depth" in stream:
+            self._handle_depth(data)
+
+    def _handle_depth(self, event: dict) -> None:
+        symbol: str = event["s"]
+        with self._lock:
+            book: Optional[OrderBook] = self.order_books.get(symbol)
+            if book is not None and book.apply_diff(event):
+                return
+            # Not synced yet or an update was missed: buffer the events
+            # and get a new snapshot.
+            self.order_books.pop(symbol, None)
+            buffer: Optional[List[dict]] = self._buffers.get(symbol)
+            self._buffers.setdefault(symbol, []).append(event)
+            if buffer is not None:
+                return
+        threading.Thread(target=self._sync_book, args=(symbol,), daemon=True).start()
+
+    def _sync_book(self, symbol: str) -> None:
+        delay: float = STREAM_RETRY_DELAY
+        while not self._stop.is_set():
+            try:
+                snapshot: dict = self._fetch_depth(symbol)
+            except (Exception, SystemExit):  # pylint: disable=broad-except
+                # The client exits on bad responses. Events keep being
+                # buffered while retrying with a backoff.
+                self._stop.wait(delay)
+                delay = min(delay * 2, STREAM_RETRY_MAX_DELAY)
+                continue
+            book = OrderBook(symbol)
+            book.apply_snapshot(snapshot)
+            with self._lock:
+                events: List[dict] = self._buffers.pop(symbol, [])
+                if all(book.apply_diff(event) for event in events):
+                    self.order_books[symbol] = book
+                    return
+                # The snapshot is older than the buffered events, it's
+                # fetched again with the same backoff.
+                self._buffers[symbol] = []
+            self._stop.wait(delay)
+            delay = min(delay * 2, STREAM_RETRY_MAX_DELAY)
+        # Stopped: the next event after a restart starts a new sync.
+        with self._lock:
+            self._buffers.pop(symbol, None)
+
+    def _is_live(self, symbol: str) -> bool:
+        """True if a message of the symbol was received within max_age"""
+        received: Optional[float] = self.received_at.get(symbol)
+        return received is not None and time.monotonic() - received <= self.max_age
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """
+        Latest trade price of a symbol.
+        :param symbol: String with the symbol.
+        :return: Float with the price, None if no trade was received
+        or the stream of the symbol is stale.
+        """
+        symbol = symbol.upper()
+        return self.last_prices.get(symbol) if self._is_live(symbol) else None
+
+    def book_ticker(self, symbol: str) -> Optional[BookTicker]:
+        """
+        Best bid and ask of a symbol.
+        :param symbol: String with the symbol.
+        :return: BookTicker object, None if nothing was received or the
+        stream of the symbol is stale.
+        """
+        symbol = symbol.upper()
+        return self.book_tickers.get(symbol) if self._is_live(symbol) else None
+
+    def order_book(self, symbol: str) -> Optional[OrderBook]:
+        """
+        Synced local order book of a symbol.
+        :param symbol: String with the symbol.
+        :return: OrderBook object, None if not synced yet or the stream
+        of the symbol is stale.
+        """
+        symbol = symbol.upper()
+        return self.order_books.get(symbol) if self._is_live(symbol) else None
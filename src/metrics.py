@@ -0,0 +1,246 @@
+""" Request metrics """
+
+import bisect
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from constants import LATENCY_BUCKETS, SIZE_BUCKETS
+
+# pylint: disable=too-few-public-methods
+
+
+class Histogram:
+    """
+    Counts of observations per bucket, Prometheus style: each bucket
+    counts the values lower or equal to its upper bound.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        # One more slot for the values above the last bucket (+Inf).
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Add an observation.
+        :param value: Float with the value.
+        :return: None.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding a quantile.
+        :param quantile: Float between 0 and 1, e.g. 0.95.
+        :return: Float with the bound, inf past the last bucket,
+        None without observations.
+        """
+        if not self.count:
+            return None
+        rank: float = quantile * self.count
+        total: int = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class EndpointStats:
+    """
+    Metrics of a method and endpoint.
+    """
+
+    def __init__(self):
+        self.latency: Histogram = Histogram(LATENCY_BUCKETS)
+        self.size: Histogram = Histogram(SIZE_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+        self.weight: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self.validation_failures: int = 0
+
+
+class EndpointSummary(NamedTuple):
+    """Metrics of an endpoint, for display"""
+
+    method: str
+    endpoint: str
+    requests: int
+    errors: int
+    retries: int
+    validation_failures: int
+    weight: int
+    mean_latency: Optional[float]
+    p95_latency: Optional[float]
+    mean_size: Optional[float]
+
+
+def _labels(method: str, endpoint: str) -> str:
+    return f'method="{method}",endpoint="{endpoint}"'
+
+
+class Metrics:
+    """
+    Per endpoint latency and response size histograms, status counts,
+    request weight, retries and validation failures.
+    Shared by the request threads, guarded by a lock.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+        self.used_weight: Optional[int] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _stats(self, method: str, endpoint: str) -> EndpointStats:
+        key: Tuple[str, str] = (method, endpoint)
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats()
+        return self.endpoints[key]
+
+    def observe_response(
+        self,
+        method: str,
+        endpoint: str,
+        status: int,
+        latency: float,
+        size: int,
+        weight: int,
+        used_weight: Optional[int] = None,
+    ) -> None:
+        """
+        Record a response.
+        :param method: String with the HTTP method.
+        :param endpoint: String with the endpoint name.
+        :param status: Int with the HTTP status.
+        :param latency: Float with the seconds it took.
+        :param size: Int with the body size in bytes.
+        :param weight: Int with the request weight.
+        :param used_weight: Optional weight used in the current minute,
+        as reported by the server.
+        :return: None.
+        """
+        with self._lock:
+            stats: EndpointStats = self._stats(method, endpoint)
+            stats.latency.observe(latency)
+            stats.size.observe(size)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.weight += weight
+            if used_weight is not None:
+                self.used_weight = used_weight
+
+    def observe_error(self, method: str, endpoint: str) -> None:
+        """
+        Record a request that got no response.
+        :param method: String with the HTTP method.
+        :param endpoint: String with the endpoint name.
+        :return: None.
+        """
+        with self._lock:
+            self._stats(method, endpoint).errors += 1
+
+    def observe_retry(self, method: str, endpoint: str) -> None:
+        """
+        Record a request sent again, after a 429 or a clock drift.
+        :param method: String with the HTTP method.
+        :param endpoint: String with the endpoint name.
+        :return: None.
+        """
+        with self._lock:
+            self._stats(method, endpoint).retries += 1
+
+    def observe_validation_failure(self, method: str, endpoint: str) -> None:
+        """
+        Record a response that didn't match its model.
+        :param method: String with the HTTP method.
+        :param endpoint: String with the endpoint name.
+        :return: None.
+        """
+        with self._lock:
+            self._stats(method, endpoint).validation_failures += 1
+
+    def summary(self) -> List[EndpointSummary]:
+        """
+        Metrics of every endpoint, slowest first.
+        :return: List of EndpointSummary object.
+        """
+        with self._lock:
+            summaries: List[EndpointSummary] = [
+                EndpointSummary(
+                    method=method,
+                    endpoint=endpoint,
+                    requests=stats.latency.count,
+                    errors=stats.errors,
+                    retries=stats.retries,
+                    validation_failures=stats.validation_failures,
+                    weight=stats.weight,
+                    mean_latency=stats.latency.sum / stats.latency.count
+                    if stats.latency.count
+                    else None,
+                    p95_latency=stats.latency.quantile(0.95),
+                    mean_size=stats.size.sum / stats.size.count
+                    if stats.size.count
+                    else None,
+                )
+                for (method, endpoint), stats in self.endpoints.items()
+            ]
+        return sorted(summaries, key=lambda item: -(item.mean_latency or 0))
+
+    def to_prometheus(self) -> str:
+        """
+        Dump the metrics in the Prometheus text format.
+        :return: String with the exposition.
+        """
+        lines: List[str] = []
+        histograms: tuple = (
+            ("binance_request_duration_seconds", "latency", "Request latency."),
+            ("binance_response_size_bytes", "size", "Response body size."),
+        )
+        counters: tuple = (
+            ("binance_request_weight_total", "weight", "Request weight sent."),
+            ("binance_request_errors_total", "errors", "Requests without response."),
+            ("binance_request_retries_total", "retries", "Requests sent again."),
+            (
+                "binance_validation_failures_total",
+                "validation_failures",
+                "Responses not matching their model.",
+            ),
+        )
+        with self._lock:
+            items: list = sorted(self.endpoints.items())
+            for name, attribute, help_ in histograms:
+                lines += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+                for (method, endpoint), stats in items:
+                    histogram: Histogram = getattr(stats, attribute)
+                    labels: str = _labels(method, endpoint)
+                    total: int = 0
+                    bounds: tuple = histogram.buckets + (float("inf"),)
+                    for bound, count in zip(bounds, histogram.counts):
+                        total += count
+                        le: str = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            name = "binance_responses_total"
+            lines += [f"# HELP {name} Responses by status.", f"# TYPE {name} counter"]
+            for (method, endpoint), stats in items:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = f'{_labels(method, endpoint)},status="{status}"'
+                    lines.append(f"{name}{{{labels}}} {count}")
+            for name, attribute, help_ in counters:
+                lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+                for (method, endpoint), stats in items:
+                    value: int = getattr(stats, attribute)
+                    lines.append(f"{name}{{{_labels(method, endpoint)}}} {value}")
+            if self.used_weight is not None:
+                name = "binance_used_weight"
+                lines += [
+                    f"# HELP {name} Weight used in the current minute.",
+                    f"# TYPE {name} gauge",
+                    f"{name} {self.used_weight}",
+                ]
+        return "\n".join(lines) + "\n"
@@ -21,6 +21,18 @@ class Profit(NamedTuple):
     qty: float
     buy_value: float
     current_value: float
+    realized: float = 0.0
+    unrealized: float = 0.0
+
+
+class BookTicker(NamedTuple):
+    """Best bid and ask of a symbol"""
+
+    symbol: str
+    bid_price: float
+    bid_qty: float
+    ask_price: float
+    ask_qty: float
 
 
 class Ticker(BaseModel):
@@ -30,6 +42,33 @@ class Ticker(BaseModel):
     price: str
 
 
+class Ticker24h(BaseModel):
+    """24 hour price change statistics"""
+
+    symbol: str
+    price_change: str
+    price_change_percent: str
+    weighted_avg_price: str
+    last_price: str
+    high_price: str
+    low_price: str
+    volume: str
+    quote_volume: str
+
+    class Config:
+        """Ticker24h model config"""
+
+        fields: dict = {
+            "price_change": "priceChange",
+            "price_change_percent": "priceChangePercent",
+            "weighted_avg_price": "weightedAvgPrice",
+            "last_price": "lastPrice",
+            "high_price": "highPrice",
+            "low_price": "lowPrice",
+            "quote_volume": "quoteVolume",
+        }
+
+
 class AvgPrice(BaseModel):
     """Average price"""
 
@@ -45,6 +84,7 @@ class NewOrder(BaseModel):
     type_: str
     qty: float
     price: Optional[float]
+    client_order_id: Optional[str]
 
 
 class Trade(BaseModel):
@@ -175,3 +215,20 @@ class Account(BaseModel):
             "update_time": "updateTime",
             "account_type": "accountType",
         }
+
+
+class OrderResult(NamedTuple):
+    """Outcome of an order in a batch"""
+
+    order: NewOrder
+    client_order_id: str
+    result: Optional[Order] = None
+    error: Optional[Response] = None
+
+
+class CancelReplaceResult(NamedTuple):
+    """Outcome of a cancel-replace request"""
+
+    cancelled: Optional[Order] = None
+    created: Optional[Order] = None
+    error: Optional[Response] = None
@@ -0,0 +1,231 @@
+""" Portfolio valuation over the graph of trading pairs """
+
+from collections import deque
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from constants import BRIDGE_ASSETS
+from models import Balance
+
+# A conversion step: the symbol, and True to divide by its price
+# (quote to base) instead of multiplying (base to quote).
+Hop = Tuple[str, bool]
+Path = Tuple[Hop, ...]
+
+
+class Holding(NamedTuple):
+    """Amount of an asset, its price and value in the quote asset"""
+
+    asset: str
+    amount: float
+    price: Optional[float]
+    value: Optional[float]
+
+
+class ConversionGraph:
+    """
+    Assets linked by their trading pairs, in both directions.
+    Conversion paths use the fewest pairs, through the most liquid
+    assets first, and are searched once per asset and quote.
+    """
+
+    def __init__(self, pairs: Dict[str, Tuple[str, str]]):
+        self.edges: Dict[str, List[Tuple[str, Hop]]] = {}
+        for symbol, (base, quote) in pairs.items():
+            self.edges.setdefault(base, []).append((quote, (symbol, False)))
+            self.edges.setdefault(quote, []).append((base, (symbol, True)))
+        rank: Dict[str, int] = {asset: i for i, asset in enumerate(BRIDGE_ASSETS)}
+        for edges in self.edges.values():
+            edges.sort(key=lambda edge: rank.get(edge[0], len(rank)))
+        self._paths: Dict[Tuple[str, str], Optional[Path]] = {}
+
+    def __contains__(self, asset: str) -> bool:
+        return asset in self.edges
+
+    def path(self, asset: str, quote: str) -> Optional[Path]:
+        """
+        Get the conversion path from an asset to a quote asset.
+        :param asset: String with the asset, e.g. "ADA".
+        :param quote: String with the quote asset, e.g. "USDT".
+        :return: Tuple of (symbol, inverted) hops, None without a path.
+        """
+        key: Tuple[str, str] = (asset, quote)
+        if key not in self._paths:
+            self._paths[key] = self._search(asset, quote)
+        return self._paths[key]
+
+    def _search(self, asset: str, quote: str) -> Optional[Path]:
+        """Breadth first search, so the fewest conversions are used"""
+        if asset == quote:
+            return ()
+        previous: Dict[str, Tuple[str, Hop]] = {asset: (asset, ("", False))}
+        queue: deque = deque([asset])
+        while queue:
+            current: str = queue.popleft()
+            for neighbor, hop in self.edges.get(current, ()):
+                if neighbor in previous:
+                    continue
+                previous[neighbor] = (current, hop)
+                if neighbor == quote:
+                    hops: List[Hop] = []
+                    while neighbor != asset:
+                        neighbor, hop = previous[neighbor]
+                        hops.append(hop)
+                    return tuple(reversed(hops))
+                queue.append(neighbor)
+        return None
+
+
+class Valuation:
+    """
+    Value of the balances in a quote asset, kept up to date
+    incrementally: a balance or price change only revalues the
+    holdings whose path it's part of.
+    """
+
+    def __init__(self, graph: ConversionGraph, quote: str):
+        self.graph: ConversionGraph = graph
+        self.quote: str = quote
+        self.amounts: Dict[str, float] = {}
+        self.prices: Dict[str, float] = {}
+        self.rates: Dict[str, Optional[float]] = {}
+        self.total: float = 0.0
+        # Assets valued through each symbol.
+        self._assets: Dict[str, Set[str]] = {}
+
+    def symbols(self) -> Set[str]:
+        """
+        Get the symbols used to value the holdings.
+        :return: Set of symbols.
+        """
+        return set(self._assets)
+
+    def _value(self, asset: str) -> float:
+        rate: Optional[float] = self.rates.get(asset)
+        return 0.0 if rate is None else self.amounts[asset] * rate
+
+    def _revalue(self, asset: str) -> None:
+        old: float = self._value(asset)
+        path: Optional[Path] = self.graph.path(asset, self.quote)
+        rate: Optional[float] = None if path is None else 1.0
+        for symbol, inverted in path or ():
+            price: Optional[float] = self.prices.get(symbol)
+            if not price:
+                rate = None
+                break
+            rate = rate / price if inverted else rate * price
+        self.rates[asset] = rate
+        self.total += self._value(asset) - old
+
+    def set_balance(self, asset: str, amount: float) -> None:
+        """
+        Set the amount of an asset, zero to remove it.
+        :param asset: String with the asset.
+        :param amount: Float with the free and locked amount.
+        :return: None.
+        """
+        path: Path = self.graph.path(asset, self.quote) or ()
+        if amount <= 0:
+            if asset in self.amounts:
+                self.total -= self._value(asset)
+                del self.amounts[asset]
+                del self.rates[asset]
+                for symbol, _ in path:
+                    self._assets[symbol].discard(asset)
+                    if not self._assets[symbol]:
+                        del self._assets[symbol]
+            return
+        if asset not in self.amounts:
+            for symbol, _ in path:
+                self._assets.setdefault(symbol, set()).add(asset)
+        self.total -= self._value(asset) if asset in self.amounts else 0.0
+        self.amounts[asset] = amount
+        self.total += self._value(asset)
+        if asset not in self.rates:
+            self._revalue(asset)
+
+    def set_balances(self, balances: Iterable[Balance]) -> None:
+        """
+        Set every balance, only updating those that changed.
+        :param balances: Iterable of Balance object.
+        :return: None.
+        """
+        amounts: Dict[str, float] = {
+            balance.asset: float(balance.free) + float(balance.locked)
+            for balance in balances
+        }
+        for asset in list(self.amounts):
+            if asset not in amounts:
+                self.set_balance(asset, 0.0)
+        for asset, amount in amounts.items():
+            if self.amounts.get(asset) != amount:
+                self.set_balance(asset, amount)
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """
+        Set the price of a symbol, e.g. from a stream.
+        :param symbol: String with the symbol.
+        :param price: Float with the price.
+        :return: None.
+        """
+        if self.prices.get(symbol) == price:
+            return
+        self.prices[symbol] = price
+        for asset in self._assets.get(symbol, ()):
+            self._revalue(asset)
+
+    def update_prices(self, price_of: Callable[[str], Optional[float]]) -> None:
+        """
+        Read the price of every symbol used, e.g. from a snapshot.
+        Only the holdings whose prices changed are revalued.
+        :param price_of: Callable(symbol) -> price, None if unknown.
+        :return: None.
+        """
+        for symbol in list(self._assets):
+            price: Optional[float] = price_of(symbol)
+            if price is not None:
+                self.set_price(symbol, price)
+
+    def holdings(self) -> List[Holding]:
+        """
+        Get the holdings, the most valuable first.
+        :return: List of Holding object.
+        """
+        holdings: List[Holding] = [
+            Holding(
+                asset,
+                amount,
+                self.rates.get(asset),
+                None if self.rates.get(asset) is None else self._value(asset),
+            )
+            for asset, amount in self.amounts.items()
+        ]
+        return sorted(holdings, key=lambda item: -(item.value or 0.0))
+
+
+class Portfolio:
+    """
+    Conversion graph and the valuation of each quote asset used.
+    """
+
+    def __init__(self, pairs: Dict[str, Tuple[str, str]]):
+        self.graph: ConversionGraph = ConversionGraph(pairs)
+        self._valuations: Dict[str, Valuation] = {}
+
+    def valuation(self, quote: str) -> Valuation:
+        """
+        Get the valuation in a quote asset, kept between calls.
+        :param quote: String with the quote asset, e.g. "USDT".
+        :return: Valuation object.
+        """
+        if quote not in self._valuations:
+            self._valuations[quote] = Valuation(self.graph, quote)
+        return self._valuations[quote]
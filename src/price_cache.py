@@ -0,0 +1,70 @@
+""" Price cache """
+
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+from constants import PRICE_TTL
+from ttl_cache import TtlCache
+
+T = TypeVar("T")
+
+
+class PriceCache(TtlCache[Dict[str, T]]):
+    """
+    Snapshot of every symbol, refreshed with a single request.
+    Lookups are dict lookups by symbol. With `stale_while_revalidate`,
+    an expired snapshot is still served while a background thread
+    fetches the next one.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, T]],
+        ttl: float = PRICE_TTL,
+        stale_while_revalidate: bool = False,
+    ):
+        super().__init__(fetch, ttl)
+        self.stale_while_revalidate: bool = stale_while_revalidate
+        self._data: Dict[str, T] = {}
+        self._refreshing: bool = False
+
+    def _store(self, data: Dict[str, T]) -> None:
+        self._data = data
+
+    def _revalidate(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except (Exception, SystemExit):  # pylint: disable=broad-except
+            # The client exits on bad responses. Keep serving the stale
+            # snapshot, retry on the next lookup.
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def snapshot(self) -> Dict[str, T]:
+        """
+        Get the current snapshot, refreshing it if it's stale.
+        :return: Dict of symbol -> item.
+        """
+        if self.stale_while_revalidate and self.updated_at is not None:
+            if self.is_stale():
+                self._revalidate()
+        else:
+            self._ensure()
+        return self._data
+
+    def get(self, symbol: str) -> Optional[T]:
+        """
+        Get the item of a symbol.
+        :param symbol: String with the symbol.
+        :return: Item, None if the symbol is unknown.
+        """
+        return self.snapshot().get(symbol)
@@ -0,0 +1,189 @@
+""" Profit engine """
+
+from collections import deque
+from typing import Deque, Dict, Iterable, List
+
+from models import Profit, Trade
+
+
+class Basis:
+    """
+    Cost basis methods.
+    """
+
+    FIFO: str = "FIFO"
+    AVERAGE: str = "AVERAGE"
+
+
+class Position:
+    """
+    Running aggregates of the trades of a symbol.
+    Each trade updates the position in constant (amortized) time,
+    so new fills never force a recompute of the history.
+    """
+
+    def __init__(self, symbol: str, basis: str = Basis.FIFO):
+        if basis not in (Basis.FIFO, Basis.AVERAGE):
+            raise ValueError(f"Unknown cost basis: {basis}")
+        self.symbol: str = symbol
+        self.basis: str = basis
+        self.last_id: int = -1
+        self.qty: float = 0.0
+        self.cost: float = 0.0
+        self.realized: float = 0.0
+        self.buy_qty: float = 0.0
+        self.buy_value: float = 0.0
+        self.sell_qty: float = 0.0
+        self.sell_value: float = 0.0
+        # Commissions paid in assets other than the base or quote one.
+        self.fees: Dict[str, float] = {}
+        # FIFO lots of [qty, cost], oldest first.
+        self.lots: Deque[List[float]] = deque()
+
+    def _fee_side(self, trade: Trade) -> str:
+        """
+        Tell which side of the pair the commission was paid in.
+        :param trade: Trade object.
+        :return: "base", "quote" or "other".
+        """
+        if self.symbol.startswith(trade.commission_asset):
+            return "base"
+        if self.symbol.endswith(trade.commission_asset):
+            return "quote"
+        return "other"
+
+    def update(self, trade: Trade) -> None:
+        """
+        Add a trade to the position. Trades already seen are ignored.
+        :param trade: Trade object, in trade id order.
+        :return: None.
+        """
+        if trade.id_ <= self.last_id:
+            return
+        self.last_id = trade.id_
+        qty: float = float(trade.qty)
+        value: float = float(trade.quote_qty)
+        commission: float = float(trade.commission)
+        side: str = self._fee_side(trade)
+        fee_base: float = commission if side == "base" else 0.0
+        fee_quote: float = commission if side == "quote" else 0.0
+        if side == "other" and commission:
+            asset: str = trade.commission_asset
+            self.fees[asset] = self.fees.get(asset, 0.0) + commission
+        if trade.is_buyer:
+            self.buy_qty += qty
+            self.buy_value += value
+            self._add(qty - fee_base, value + fee_quote)
+        else:
+            self.sell_qty += qty
+            self.sell_value += value
+            self.realized += value - fee_quote - self._remove(qty + fee_base)
+
+    def update_many(self, trades: Iterable[Trade]) -> None:
+        """
+        Add several trades to the position.
+        :param trades: Iterable of Trade object, in trade id order.
+        :return: None.
+        """
+        for trade in trades:
+            self.update(trade)
+
+    def _add(self, qty: float, cost: float) -> None:
+        self.qty += qty
+        self.cost += cost
+        if self.basis == Basis.FIFO:
+            self.lots.append([qty, cost])
+
+    def _remove(self, qty: float) -> float:
+        """
+        Remove quantity from the position.
+        Selling more than held (e.g. coins deposited instead of bought)
+        removes the excess at zero cost.
+        :param qty: Float with the quantity sold.
+        :return: Float with the cost of the removed quantity.
+        """
+        qty = min(qty, self.qty)
+        if qty <= 0:
+            return 0.0
+        if self.basis == Basis.AVERAGE:
+            cost: float = self.cost * qty / self.qty
+        else:
+            cost = 0.0
+            remaining: float = qty
+            while remaining > 0 and self.lots:
+                lot: List[float] = self.lots[0]
+                if lot[0] <= remaining:
+                    remaining -= lot[0]
+                    cost += lot[1]
+                    self.lots.popleft()
+                else:
+                    part: float = lot[1] * remaining / lot[0]
+                    lot[0] -= remaining
+                    lot[1] -= part
+                    cost += part
+                    remaining = 0.0
+        self.qty -= qty
+        self.cost -= cost
+        return cost
+
+    def unrealized(self, price: float) -> float:
+        """
+        Unrealized P&L of the held quantity.
+        :param price: Float with the current price.
+        :return: Float with the P&L in the quote asset.
+        """
+        return self.qty * price - self.cost
+
+    def to_profit(self, price: float) -> Profit:
+        """
+        Value the position at a given price.
+        :param price: Float with the current price.
+        :return: Profit object.
+        """
+        return Profit(
+            symbol=self.symbol,
+            qty=self.qty,
+            buy_value=self.cost,
+            current_value=self.qty * price,
+            realized=self.realized,
+            unrealized=self.unrealized(price),
+        )
+
+
+class ProfitEngine:
+    """
+    Positions of many symbols, all with the same cost basis.
+    """
+
+    def __init__(self, basis: str = Basis.FIFO):
+        self.basis: str = basis
+        self.positions: Dict[str, Position] = {}
+
+    def position(self, symbol: str) -> Position:
+        """
+        Get the position of a symbol, creating it if needed.
+        :param symbol: String with the symbol.
+        :return: Position object.
+        """
+        if symbol not in self.positions:
+            self.positions[symbol] = Position(symbol, self.basis)
+        return self.positions[symbol]
+
+    def update(self, trade: Trade) -> Position:
+        """
+        Add a trade to the position of its symbol.
+        :param trade: Trade object.
+        :return: Updated Position object.
+        """
+        position: Position = self.position(trade.symbol)
+        position.update(trade)
+        return position
+
+    def profit(self, symbol: str, price: float) -> Profit:
+        """
+        Value the position of a symbol at a given price.
+        :param symbol: String with the symbol.
+        :param price: Float with the current price.
+        :return: Profit object.
+        """
+        return self.position(symbol).to_profit(price)
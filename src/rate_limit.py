@@ -0,0 +1,235 @@
+""" Rate limiter """
+
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from constants import ORDER_INTERVAL, ORDER_LIMIT, WEIGHT_INTERVAL, WEIGHT_LIMIT
+
+USED_WEIGHT_HEADER: str = "X-MBX-USED-WEIGHT-1M"
+ORDER_COUNT_HEADER: str = "X-MBX-ORDER-COUNT-10S"
+
+# Request weight per endpoint, when it doesn't depend on the params.
+WEIGHTS: Dict[str, int] = {
+    "/api/v3/ping": 1,
+    "/api/v3/time": 1,
+    "/api/v3/avgPrice": 2,
+    "/api/v3/klines": 2,
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/account": 20,
+    "/api/v3/myTrades": 20,
+    "/api/v3/order": 1,
+    "/api/v3/order/test": 1,
+    "/api/v3/order/cancelReplace": 1,
+    "/api/v3/userDataStream": 2,
+}
+
+
+def request_weight(method: str, api_endpoint: str, params: Optional[dict]) -> int:
+    """
+    Weight of a request, as documented by Binance.
+    :param method: String with the HTTP method.
+    :param api_endpoint: String with the endpoint name.
+    :param params: Dict with the params.
+    :return: Int with the weight.
+    """
+    params = params or {}
+    if api_endpoint == "/api/v3/ticker/price":
+        return 2 if "symbol" in params else 4
+    if api_endpoint == "/api/v3/ticker/24hr":
+        return 2 if "symbol" in params else 80
+    if api_endpoint == "/api/v3/openOrders":
+        if method == "DELETE":
+            return 1
+        return 6 if "symbol" in params else 80
+    if api_endpoint == "/api/v3/depth":
+        limit: int = int(params.get("limit", 100))
+        for top, weight in ((100, 5), (500, 25), (1000, 50)):
+            if limit <= top:
+                return weight
+        return 250
+    return WEIGHTS.get(api_endpoint, 1)
+
+
+def is_order(method: str, api_endpoint: str) -> bool:
+    """
+    Check if a request counts towards the order rate limits.
+    :param method: String with the HTTP method.
+    :param api_endpoint: String with the endpoint name.
+    :return: True for new orders, test orders aren't counted.
+    """
+    return (
+        method == "POST"
+        and api_endpoint.startswith("/api/v3/order")
+        and api_endpoint != "/api/v3/order/test"
+    )
+
+
+class Priority:
+    """
+    Request priorities. Lower values are served first and may use
+    a bigger share of the budget.
+    """
+
+    ORDER: int = 0
+    DEFAULT: int = 1
+    ANALYTICS: int = 2
+
+
+# Share of the budget kept free for higher priorities.
+RESERVES: Dict[int, float] = {
+    Priority.ORDER: 0.0,
+    Priority.DEFAULT: 0.1,
+    Priority.ANALYTICS: 0.25,
+}
+
+
+class TokenBucket:
+    """
+    Tokens refilled continuously up to the capacity, so requests are
+    spread over the interval instead of bursting at its start.
+    """
+
+    def __init__(self, capacity: int, interval: float):
+        self.capacity: float = capacity
+        self.rate: float = capacity / interval
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+
+    def refill(self) -> None:
+        """Add the tokens earned since the last refill"""
+        now: float = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float) -> float:
+        """
+        Seconds until `amount` tokens can be taken, leaving `reserve`.
+        :return: Float with the seconds, 0 if they can be taken now.
+        """
+        missing: float = amount + reserve * self.capacity - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def sync(self, used: float) -> None:
+        """
+        Align with the usage reported by the server.
+        :param used: Float with the tokens used in the current window.
+        :return: None.
+        """
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """
+    Admits requests through request weight and order count buckets.
+    Waiting requests are served by priority among those drawing from
+    the same bucket, so an order held back by the order count doesn't
+    hold back requests that place none. The buckets follow
+    the usage reported in the X-MBX-USED-WEIGHT-1M and
+    X-MBX-ORDER-COUNT-10S headers. A 429 or 418 response pauses every
+    request for its Retry-After time.
+    """
+
+    def __init__(
+        self,
+        weight_limit: int = WEIGHT_LIMIT,
+        order_limit: int = ORDER_LIMIT,
+        weight_interval: float = WEIGHT_INTERVAL,
+        order_interval: float = ORDER_INTERVAL,
+    ):
+        self.weight: TokenBucket = TokenBucket(weight_limit, weight_interval)
+        self.orders: TokenBucket = TokenBucket(order_limit, order_interval)
+        self.blocked_until: float = 0.0
+        # Waiting requests per bucket they hold back, by priority.
+        self._waiting: Dict[str, Dict[int, int]] = {
+            bucket: {priority: 0 for priority in RESERVES}
+            for bucket in ("weight", "orders")
+        }
+        self._condition: threading.Condition = threading.Condition()
+
+    def _wait_time(self, weight: int, orders: int, priority: int) -> float:
+        self.weight.refill()
+        self.orders.refill()
+        reserve: float = RESERVES[priority]
+        return max(
+            self.blocked_until - time.monotonic(),
+            self.weight.wait_time(weight, reserve),
+            self.orders.wait_time(orders, 0.0),
+        )
+
+    def _held(self, weight: int, orders: int, priority: int) -> Tuple[str, ...]:
+        """
+        Buckets a waiting request holds back lower priorities on.
+        :return: Tuple with the bucket names.
+        """
+        if not orders:
+            return ("weight",)
+        short_of_orders: bool = self.orders.wait_time(orders, 0.0) > 0
+        short_of_weight: bool = self.weight.wait_time(weight, RESERVES[priority]) > 0
+        if short_of_orders and not short_of_weight:
+            # The weight can go to requests placing no orders meanwhile.
+            return ("orders",)
+        return ("weight", "orders")
+
+    def _has_precedence(self, orders: int, priority: int) -> bool:
+        buckets: Tuple[str, ...] = ("weight", "orders") if orders else ("weight",)
+        return not any(
+            self._waiting[bucket][other]
+            for bucket in buckets
+            for other in self._waiting[bucket]
+            if other < priority
+        )
+
+    def _hold(self, buckets: Tuple[str, ...], priority: int, count: int) -> None:
+        for bucket in buckets:
+            self._waiting[bucket][priority] += count
+
+    def acquire(
+        self, weight: int, orders: int = 0, priority: int = Priority.DEFAULT
+    ) -> None:
+        """
+        Block until the request can be sent, then take its tokens.
+        :param weight: Int with the request weight.
+        :param orders: Int with the number of orders it places.
+        :param priority: Int with the Priority.
+        :return: None.
+        """
+        with self._condition:
+            held: Tuple[str, ...] = ()
+            try:
+                while True:
+                    delay: float = self._wait_time(weight, orders, priority)
+                    if delay <= 0 and self._has_precedence(orders, priority):
+                        break
+                    holding: Tuple[str, ...] = self._held(weight, orders, priority)
+                    if holding != held:
+                        self._hold(held, priority, -1)
+                        self._hold(holding, priority, 1)
+                        held = holding
+                        # Lower priorities may go ahead on a bucket released.
+                        self._condition.notify_all()
+                    self._condition.wait(delay if delay > 0 else None)
+            finally:
+                self._hold(held, priority, -1)
+            self.weight.tokens -= weight
+            self.orders.tokens -= orders
+            self._condition.notify_all()
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Record the usage and limits reported in a response.
+        :param status_code: Int with the HTTP status.
+        :param headers: Response headers.
+        :return: None.
+        """
+        with self._condition:
+            if USED_WEIGHT_HEADER in headers:
+                self.weight.sync(float(headers[USED_WEIGHT_HEADER]))
+            if ORDER_COUNT_HEADER in headers:
+                self.orders.sync(float(headers[ORDER_COUNT_HEADER]))
+            if status_code in (418, 429):
+                retry_after: float = float(headers.get("Retry-After", WEIGHT_INTERVAL))
+                self.blocked_until = max(
+                    self.blocked_until, time.monotonic() + retry_after
+                )
+            self._condition.notify_all()
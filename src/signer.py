@@ -0,0 +1,112 @@
+""" Request signing with HMAC, Ed25519 or RSA API keys """
+
+import base64
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+from os import environ
+from typing import Optional
+from urllib import parse
+
+# pylint: disable=too-few-public-methods,import-outside-toplevel
+
+
+class Signer(ABC):
+    """
+    Signs the exact query string sent to a signed endpoint.
+    """
+
+    @abstractmethod
+    def sign(self, payload: bytes) -> str:
+        """
+        Sign a payload.
+        :param payload: Bytes with the query string.
+        :return: String with the signature, ready for the query string.
+        """
+
+
+class HmacSigner(Signer):
+    """
+    HMAC-SHA256 with the secret key. The keyed state is computed once
+    and copied for every signature.
+    """
+
+    def __init__(self, secret_key: str):
+        self._hmac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+
+    def sign(self, payload: bytes) -> str:
+        signature = self._hmac.copy()
+        signature.update(payload)
+        return signature.hexdigest()
+
+
+class Ed25519Signer(Signer):
+    """
+    Ed25519 API key. Needs the optional `cryptography` package.
+    """
+
+    def __init__(self, private_key):
+        self._key = private_key
+
+    def sign(self, payload: bytes) -> str:
+        return parse.quote(base64.b64encode(self._key.sign(payload)), safe="")
+
+
+class RsaSigner(Signer):
+    """
+    RSA API key, PKCS#1 v1.5 with SHA-256.
+    Needs the optional `cryptography` package.
+    """
+
+    def __init__(self, private_key):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        self._key = private_key
+        self._padding = padding.PKCS1v15()
+        self._hash = hashes.SHA256()
+
+    def sign(self, payload: bytes) -> str:
+        signature: bytes = self._key.sign(payload, self._padding, self._hash)
+        return parse.quote(base64.b64encode(signature), safe="")
+
+
+def load_private_key(path: str, password: Optional[str] = None) -> Signer:
+    """
+    Build a signer from a PEM private key file, Ed25519 or RSA.
+    :param path: String with the path of the PEM file.
+    :param password: Optional string with the password of the file.
+    :return: Ed25519Signer or RsaSigner object.
+    """
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+        from cryptography.hazmat.primitives.serialization import (
+            load_pem_private_key,
+        )
+    except ImportError as ex:
+        raise ImportError(
+            "Ed25519 and RSA keys need the cryptography package: "
+            "pip install cryptography"
+        ) from ex
+    with open(path, "rb") as file:
+        key = load_pem_private_key(
+            file.read(), password.encode() if password else None
+        )
+    if isinstance(key, ed25519.Ed25519PrivateKey):
+        return Ed25519Signer(key)
+    if isinstance(key, rsa.RSAPrivateKey):
+        return RsaSigner(key)
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+def signer_from_env() -> Signer:
+    """
+    Signer for the keys in the environment: PRIVATE_KEY_PATH (and
+    PRIVATE_KEY_PASSWORD) for Ed25519 and RSA keys, else SECRET_KEY.
+    :return: Signer object.
+    """
+    if environ.get("PRIVATE_KEY_PATH"):
+        return load_private_key(
+            environ["PRIVATE_KEY_PATH"], environ.get("PRIVATE_KEY_PASSWORD")
+        )
+    return HmacSigner(environ["SECRET_KEY"])
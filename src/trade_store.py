@@ -0,0 +1,191 @@
+""" Local trade store """
+
+import sqlite3
+import threading
+from typing import Iterator, List, Optional
+
+from constants import STORE_BATCH_SIZE, TRADES_DB_PATH
+from fast_models import FastTrade
+from models import Trade
+
+COLUMNS: tuple = (
+    "symbol",
+    "id_",
+    "order_id",
+    "order_list_id",
+    "price",
+    "qty",
+    "quote_qty",
+    "commission",
+    "commission_asset",
+    "time",
+    "is_buyer",
+    "is_maker",
+    "is_best_match",
+)
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS trades (
+    symbol TEXT NOT NULL,
+    id_ INTEGER NOT NULL,
+    order_id INTEGER NOT NULL,
+    order_list_id INTEGER NOT NULL,
+    price TEXT NOT NULL,
+    qty TEXT NOT NULL,
+    quote_qty TEXT NOT NULL,
+    commission TEXT NOT NULL,
+    commission_asset TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    is_buyer INTEGER NOT NULL,
+    is_maker INTEGER NOT NULL,
+    is_best_match INTEGER NOT NULL,
+    PRIMARY KEY (symbol, id_)
+) WITHOUT ROWID
+"""
+
+
+def _to_trade(row: tuple) -> Trade:
+    """
+    Build a Trade from a stored row.
+    Rows were validated before being stored, so validation is skipped.
+    :param row: Tuple with the COLUMNS values.
+    :return: Trade object.
+    """
+    values: dict = dict(zip(COLUMNS, row))
+    for column in ("is_buyer", "is_maker", "is_best_match"):
+        values[column] = bool(values[column])
+    return Trade.construct(**values)
+
+
+def _to_fast_trade(row: tuple) -> FastTrade:
+    """
+    Build a FastTrade from a stored row.
+    :param row: Tuple with the COLUMNS values.
+    :return: FastTrade object.
+    """
+    return FastTrade(*row[:10], bool(row[10]), bool(row[11]), bool(row[12]))
+
+
+class TradeStore:
+    """
+    SQLite store of trades, keyed by symbol and trade id.
+    One connection is shared by all threads, guarded by a lock.
+    """
+
+    def __init__(self, db_path: str = TRADES_DB_PATH, fast: bool = False):
+        self.db_path: str = db_path
+        # Read the trades as FastTrade records instead of Trade models.
+        self.fast: bool = fast
+        self._lock: threading.Lock = threading.Lock()
+        self.connection: sqlite3.Connection = sqlite3.connect(
+            db_path, check_same_thread=False
+        )
+        with self._lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database.
+        :return: None.
+        """
+        with self._lock:
+            self.connection.close()
+
+    def last_id(self, symbol: str) -> Optional[int]:
+        """
+        Get the highest stored trade id of a symbol.
+        :param symbol: String with the symbol.
+        :return: Int with the trade id, None if nothing is stored.
+        """
+        with self._lock:
+            row: tuple = self.connection.execute(
+                "SELECT MAX(id_) FROM trades WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return row[0]
+
+    def symbols(self) -> List[str]:
+        """
+        Get the symbols with stored trades.
+        :return: List of symbols.
+        """
+        with self._lock:
+            rows: List[tuple] = self.connection.execute(
+                "SELECT DISTINCT symbol FROM trades ORDER BY symbol"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def numeric_rows(self, symbol: str) -> List[tuple]:
+        """
+        Get the numeric columns of the stored trades of a symbol,
+        converted by SQLite, for columnar loading.
+        :param symbol: String with the symbol.
+        :return: List of (price, qty, quote_qty, time, is_buyer) tuples.
+        """
+        with self._lock:
+            return self.connection.execute(
+                "SELECT CAST(price AS REAL), CAST(qty AS REAL), "
+                "CAST(quote_qty AS REAL), time, is_buyer "
+                "FROM trades WHERE symbol = ? ORDER BY id_",
+                (symbol,),
+            ).fetchall()
+
+    def insert(self, trades: List[Trade]) -> None:
+        """
+        Bulk insert trades in a single transaction.
+        :param trades: List of Trade object.
+        :return: None.
+        """
+        rows: List[tuple] = [
+            tuple(getattr(trade, column) for column in COLUMNS) for trade in trades
+        ]
+        with self._lock, self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO trades ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+
+    def iter_trades(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        from_id: int = 0,
+        batch_size: int = STORE_BATCH_SIZE,
+    ) -> Iterator[List[Trade]]:
+        """
+        Read the stored trades of a symbol, oldest first.
+        Each batch is a separate keyset query, so no cursor is held
+        open between batches.
+        :param symbol: String with the symbol.
+        :param start_time: Optional timestamp in ms of the first trade.
+        :param end_time: Optional timestamp in ms of the last trade.
+        :param from_id: Int with the first trade id.
+        :param batch_size: Int with the number of trades per batch.
+        :return: Iterator of lists of Trade object.
+        """
+        query: str = (
+            f"SELECT {', '.join(COLUMNS)} FROM trades "
+            "WHERE symbol = ? AND id_ > ? AND time >= ? AND time <= ? "
+            "ORDER BY id_ LIMIT ?"
+        )
+        last_id: int = from_id - 1
+        while True:
+            with self._lock:
+                rows: List[tuple] = self.connection.execute(
+                    query,
+                    (
+                        symbol,
+                        last_id,
+                        start_time if start_time is not None else 0,
+                        end_time if end_time is not None else 2**63 - 1,
+                        batch_size,
+                    ),
+                ).fetchall()
+            if not rows:
+                return
+            yield list(map(_to_fast_trade if self.fast else _to_trade, rows))
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][1]
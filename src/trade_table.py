@@ -0,0 +1,164 @@
+""" Columnar trade analytics """
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from models import Profit, Trade
+from trade_store import TradeStore
+
+
+class SymbolTotals(NamedTuple):
+    """Per-symbol aggregates, aligned with TradeTable.symbols"""
+
+    buy_qty: np.ndarray
+    sell_qty: np.ndarray
+    buy_value: np.ndarray
+    sell_value: np.ndarray
+    count: np.ndarray
+
+
+class TradeTable:
+    """
+    Trade history stored as NumPy columns.
+    Symbols are dictionary encoded: `symbol_code[i]` indexes `symbols`.
+    Aggregates are vectorized group-by operations over the codes.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        symbol_code: np.ndarray,
+        price: np.ndarray,
+        qty: np.ndarray,
+        quote_qty: np.ndarray,
+        time: np.ndarray,
+        is_buyer: np.ndarray,
+    ):
+        self.symbols: List[str] = symbols
+        self.symbol_code: np.ndarray = symbol_code.astype(np.int32, copy=False)
+        self.price: np.ndarray = price.astype(np.float64, copy=False)
+        self.qty: np.ndarray = qty.astype(np.float64, copy=False)
+        self.quote_qty: np.ndarray = quote_qty.astype(np.float64, copy=False)
+        self.time: np.ndarray = time.astype(np.int64, copy=False)
+        self.is_buyer: np.ndarray = is_buyer.astype(bool, copy=False)
+
+    def __len__(self) -> int:
+        return len(self.symbol_code)
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> "TradeTable":
+        """
+        Build a table from Trade objects.
+        :param trades: Iterable of Trade object.
+        :return: TradeTable object.
+        """
+        trades = list(trades)
+        symbols, codes = np.unique(
+            [trade.symbol for trade in trades], return_inverse=True
+        )
+        return cls(
+            symbols=symbols.tolist(),
+            symbol_code=codes,
+            price=np.array([float(trade.price) for trade in trades]),
+            qty=np.array([float(trade.qty) for trade in trades]),
+            quote_qty=np.array([float(trade.quote_qty) for trade in trades]),
+            time=np.array([trade.time for trade in trades], dtype=np.int64),
+            is_buyer=np.array([trade.is_buyer for trade in trades], dtype=bool),
+        )
+
+    @classmethod
+    def from_store(
+        cls, store: TradeStore, symbols: Optional[List[str]] = None
+    ) -> "TradeTable":
+        """
+        Load the stored trades. Strings are converted to numbers by SQLite.
+        :param store: TradeStore object.
+        :param symbols: Optional list of symbols, all of them by default.
+        :return: TradeTable object.
+        """
+        names: List[str] = store.symbols() if symbols is None else list(symbols)
+        columns: List[np.ndarray] = [np.empty(0) for _ in range(6)]
+        parts: List[List[np.ndarray]] = [[] for _ in range(6)]
+        for code, symbol in enumerate(names):
+            rows: List[tuple] = store.numeric_rows(symbol)
+            if not rows:
+                continue
+            data: np.ndarray = np.array(rows, dtype=np.float64)
+            parts[0].append(np.full(len(rows), code, dtype=np.int32))
+            for index in range(5):
+                parts[index + 1].append(data[:, index])
+        for index, part in enumerate(parts):
+            if part:
+                columns[index] = np.concatenate(part)
+        return cls(
+            symbols=names,
+            symbol_code=columns[0],
+            price=columns[1],
+            qty=columns[2],
+            quote_qty=columns[3],
+            time=columns[4],
+            is_buyer=columns[5],
+        )
+
+    def totals(self) -> SymbolTotals:
+        """
+        Buy and sell totals per symbol.
+        :return: SymbolTotals object.
+        """
+        size: int = len(self.symbols)
+        buy_qty: np.ndarray = np.where(self.is_buyer, self.qty, 0.0)
+        buy_value: np.ndarray = np.where(self.is_buyer, self.quote_qty, 0.0)
+        group: Callable[[np.ndarray], np.ndarray] = lambda weights: np.bincount(
+            self.symbol_code, weights=weights, minlength=size
+        )
+        return SymbolTotals(
+            buy_qty=group(buy_qty),
+            sell_qty=group(self.qty - buy_qty),
+            buy_value=group(buy_value),
+            sell_value=group(self.quote_qty - buy_value),
+            count=np.bincount(self.symbol_code, minlength=size),
+        )
+
+    def entry_price(self, totals: Optional[SymbolTotals] = None) -> np.ndarray:
+        """
+        Volume-weighted average buy price per symbol.
+        :param totals: Optional precomputed SymbolTotals.
+        :return: Array of prices, NaN for symbols never bought.
+        """
+        totals = totals or self.totals()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                totals.buy_qty > 0, totals.buy_value / totals.buy_qty, np.nan
+            )
+
+    def profits(self, prices: Dict[str, float]) -> List[Profit]:
+        """
+        P&L per symbol, at whole-history average cost.
+        Realized P&L treats every sell as closing at the average
+        entry price; total P&L (realized + unrealized) is exact.
+        :param prices: Dict of symbol -> current price.
+        :return: List of Profit object, for symbols with a price.
+        """
+        totals: SymbolTotals = self.totals()
+        entry: np.ndarray = np.nan_to_num(self.entry_price(totals))
+        price: np.ndarray = np.array(
+            [prices.get(symbol, np.nan) for symbol in self.symbols]
+        )
+        qty: np.ndarray = totals.buy_qty - totals.sell_qty
+        current_value: np.ndarray = qty * price
+        total: np.ndarray = totals.sell_value - totals.buy_value + current_value
+        unrealized: np.ndarray = qty * (price - entry)
+        realized: np.ndarray = total - unrealized
+        return [
+            Profit(
+                symbol=symbol,
+                qty=float(qty[code]),
+                buy_value=float(qty[code] * entry[code]),
+                current_value=float(current_value[code]),
+                realized=float(realized[code]),
+                unrealized=float(unrealized[code]),
+            )
+            for code, symbol in enumerate(self.symbols)
+            if totals.count[code] and not np.isnan(price[code])
+        ]
@@ -0,0 +1,64 @@
+""" Snapshot cache with a time to live """
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Generic, Optional, TypeVar
+
+D = TypeVar("D")
+
+
+class TtlCache(ABC, Generic[D]):
+    """
+    Snapshot fetched with a single call and reused for `ttl` seconds.
+    When it expires, one thread fetches the next snapshot and the
+    others wait for it instead of fetching their own.
+    """
+
+    def __init__(self, fetch: Callable[[], D], ttl: float):
+        self._fetch: Callable[[], D] = fetch
+        self.ttl: float = ttl
+        self.updated_at: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._fetch_lock: threading.Lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        """
+        Check if the snapshot is older than the TTL.
+        :return: True if it must be refreshed.
+        """
+        return (
+            self.updated_at is None
+            or time.monotonic() - self.updated_at > self.ttl
+        )
+
+    @abstractmethod
+    def _store(self, data: D) -> None:
+        """Replace the snapshot, called with the lock held"""
+
+    def refresh(self) -> D:
+        """
+        Fetch a new snapshot.
+        :return: The fetched data.
+        """
+        data: D = self._fetch()
+        with self._lock:
+            self._store(data)
+            self.updated_at = time.monotonic()
+        return data
+
+    def _ensure(self) -> None:
+        """Refresh the snapshot if it's stale"""
+        if self.is_stale():
+            with self._fetch_lock:
+                # Only one thread fetches, the others reuse its result.
+                if self.is_stale():
+                    self.refresh()
+
+    def invalidate(self) -> None:
+        """
+        Force a refresh on the next lookup.
+        :return: None.
+        """
+        with self._lock:
+            self.updated_at = None
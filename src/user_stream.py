@@ -0,0 +1,308 @@
+""" User data stream """
+
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import websocket
+
+from account_cache import BalanceTable
+from binance import Binance
+from constants import (
+    CONNECT_TIMEOUT,
+    LISTEN_KEY_KEEPALIVE,
+    STREAM_RECONNECT_DELAY,
+    STREAM_RETRY_DELAY,
+    STREAM_RETRY_MAX_DELAY,
+    STREAM_URL,
+)
+from market_stream import close_app
+from models import Account, Balance, Order
+
+CLOSED_STATUSES: Tuple[str, ...] = (
+    "FILLED",
+    "CANCELED",
+    "REJECTED",
+    "EXPIRED",
+    "EXPIRED_IN_MATCH",
+)
+
+
+def order_from_event(event: dict) -> Order:
+    """
+    Build an Order from an executionReport event.
+    :param event: Dict with the event data.
+    :return: Order object.
+    """
+    return Order(
+        symbol=event["s"],
+        orderId=event["i"],
+        orderListId=event["g"],
+        clientOrderId=event["c"],
+        price=event["p"],
+        executedQty=event["z"],
+        cummulativeQuoteQty=event["Z"],
+        status=event["X"],
+        timeInForce=event["f"],
+        type=event["o"],
+        side=event["S"],
+        stopPrice=event.get("P"),
+        icebergQty=event.get("F"),
+        time=event.get("O"),
+        updateTime=event["T"],
+        isWorking=event.get("w"),
+        origQuoteOrderQty=event.get("Q"),
+        origQty=event["q"],
+    )
+
+
+class UserDataStream:
+    """
+    Listen key based user data stream.
+    The account balances and open orders are loaded over REST, then
+    kept up to date from executionReport, outboundAccountPosition and
+    balanceUpdate events, so they can be read without requests.
+    Once the connection drops, reads are made over REST until it's
+    back and the state is loaded again, since the events sent meanwhile
+    are lost.
+    """
+
+    def __init__(
+        self,
+        binance: Binance,
+        url: str = STREAM_URL,
+        reconnect: float = STREAM_RECONNECT_DELAY,
+        connect_timeout: float = CONNECT_TIMEOUT,
+    ):
+        self.binance: Binance = binance
+        self.url: str = url
+        self.reconnect: float = reconnect
+        self.connect_timeout: float = connect_timeout
+        self.listen_key: Optional[str] = None
+        self.account: Optional[Account] = None
+        self.balances: BalanceTable = BalanceTable()
+        self.orders: Dict[Tuple[str, int], Order] = {}
+        # Events received while the state loads, None once it's loaded.
+        self._pending: Optional[List[dict]] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._opened: threading.Event = threading.Event()
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._threads: List[threading.Thread] = []
+
+    def _is_connected(self) -> bool:
+        sock: Optional[websocket.WebSocket] = self._ws and self._ws.sock
+        return bool(sock and sock.connected)
+
+    @property
+    def is_running(self) -> bool:
+        """True if the stream is connected and the state is loaded"""
+        return (
+            bool(self._threads)
+            and self.account is not None
+            and self._pending is None
+            and self._is_connected()
+        )
+
+    def _is_loaded(self) -> bool:
+        """
+        Check if the local state can be read, with the lock held.
+        After a disconnection it can't until the reload made once
+        reconnected, even if the new connection is already open.
+        :return: True if the state is loaded and followed by the stream.
+        """
+        if self._pending is None and not self._is_connected():
+            self._pending = []
+        return self.is_running
+
+    def start(self) -> None:
+        """
+        Open the stream and load the initial state.
+        Events received while the state loads are applied after it.
+        :return: None.
+        """
+        if self._threads:
+            return
+        self._stop.clear()
+        self._opened.clear()
+        self._pending = []
+        self.listen_key = self.binance.create_listen_key()
+        self._ws = websocket.WebSocketApp(
+            f"{self.url}/ws/{self.listen_key}",
+            on_open=lambda _: self._opened.set(),
+            on_message=lambda _, message: self.handle(message),
+            on_reconnect=lambda _: self._resync(),
+        )
+        self._threads = [
+            threading.Thread(
+                target=self._ws.run_forever,
+                kwargs={"ping_interval": 60, "reconnect": self.reconnect},
+                daemon=True,
+            ),
+            threading.Thread(target=self._keepalive, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        # Loaded once connected, so no event is missed in between. If the
+        # connection fails, it's loaded again once one is opened.
+        self._opened.wait(self.connect_timeout)
+        self._load()
+
+    def stop(self) -> None:
+        """
+        Close the stream and its listen key.
+        :return: None.
+        """
+        self._stop.set()
+        if self._ws is not None:
+            close_app(self._ws)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.listen_key is not None:
+            self.binance.close_listen_key(self.listen_key)
+            self.listen_key = None
+        self.account = None
+
+    def _keepalive(self) -> None:
+        while not self._stop.wait(LISTEN_KEY_KEEPALIVE):
+            try:
+                self.binance.keepalive_listen_key(self.listen_key)
+            except Exception:  # pylint: disable=broad-except
+                # Retry on the next tick, the key lasts 60 minutes.
+                continue
+
+    def _load(self) -> None:
+        # Refreshes the account cache too, for the reads over REST.
+        account: Account = self.binance.account_cache.refresh()
+        orders: List[Order] = self.binance.get_open_orders()
+        with self._lock:
+            self.account = account
+            self.balances = BalanceTable(account.balances)
+            self.orders = {(order.symbol, order.order_id): order for order in orders}
+            pending: List[dict] = self._pending or []
+            self._pending = None
+            for event in pending:
+                self._apply(event)
+
+    def _resync(self) -> None:
+        """
+        Load the state again after a reconnection, from a background
+        thread so the new events are buffered meanwhile.
+        """
+        with self._lock:
+            self._pending = []
+        threading.Thread(target=self._reload, daemon=True).start()
+
+    def _reload(self) -> None:
+        delay: float = STREAM_RETRY_DELAY
+        while not self._stop.is_set():
+            try:
+                self._load()
+                return
+            except (Exception, SystemExit):  # pylint: disable=broad-except
+                # The client exits on bad responses: retry with a backoff.
+                self._stop.wait(delay)
+                delay = min(delay * 2, STREAM_RETRY_MAX_DELAY)
+
+    def handle(self, message: str) -> None:
+        """
+        Process a stream message.
+        :param message: String with the JSON message.
+        :return: None.
+        """
+        event: dict = json.loads(message)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(event)
+            else:
+                self._apply(event)
+        if event.get("e") == "listenKeyExpired":
+            threading.Thread(target=self._restart, daemon=True).start()
+
+    def _restart(self) -> None:
+        self.stop()
+        self.start()
+
+    def _apply(self, event: dict) -> None:
+        kind: Optional[str] = event.get("e")
+        if kind == "outboundAccountPosition":
+            if event["u"] < self.account.update_time:
+                return
+            for item in event["B"]:
+                self.balances.set(
+                    Balance(asset=item["a"], free=item["f"], locked=item["l"])
+                )
+        elif kind == "balanceUpdate":
+            if event["T"] < self.account.update_time:
+                return
+            balance: Optional[Balance] = self.balances.get(event["a"])
+            free: float = float(balance.free) if balance else 0.0
+            locked: str = balance.locked if balance else "0"
+            self.balances.set(
+                Balance(
+                    asset=event["a"],
+                    free=f"{free + float(event['d']):.8f}",
+                    locked=locked,
+                )
+            )
+        elif kind == "executionReport":
+            key: Tuple[str, int] = (event["s"], event["i"])
+            current: Optional[Order] = self.orders.get(key)
+            if current is not None and (current.update_time or 0) > event["T"]:
+                return
+            if event["X"] in CLOSED_STATUSES:
+                self.orders.pop(key, None)
+            else:
+                self.orders[key] = order_from_event(event)
+
+    def get_account(self) -> Account:
+        """
+        Get the account with the streamed balances, from the account
+        cache while the state isn't loaded (e.g. restarting after the
+        listen key expired).
+        :return: Account object.
+        """
+        with self._lock:
+            if self._is_loaded():
+                balances: List[Balance] = list(self.balances.assets.values())
+                return self.account.copy(update={"balances": balances})
+        return self.binance.account_cache.get()
+
+    def get_balances(self) -> List[Balance]:
+        """
+        Get the balances with free or locked funds.
+        :return: List of Balance object.
+        """
+        with self._lock:
+            if self._is_loaded():
+                return list(self.balances.non_zero.values())
+        return self.binance.account_cache.balances()
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        """
+        Get the open orders, over REST while the state isn't loaded.
+        :param symbol: Optional symbol to filter by.
+        :return: List of Order object.
+        """
+        with self._lock:
+            loaded: bool = self._is_loaded()
+            orders: List[Order] = list(self.orders.values())
+        if not loaded:
+            orders = self.binance.get_open_orders()
+        if symbol is not None:
+            orders = [order for order in orders if order.symbol == symbol]
+        return orders
+
+    def get_open_order(self, symbol: str, order_id: int) -> Optional[Order]:
+        """
+        Get an open order by symbol and id.
+        :param symbol: String with the symbol.
+        :param order_id: Int with the Order id.
+        :return: Order object, None if it isn't open.
+        """
+        with self._lock:
+            if self._is_loaded():
+                return self.orders.get((symbol, order_id))
+        orders: List[Order] = self.get_open_orders(symbol)
+        return next((order for order in orders if order.order_id == order_id), None)
@@ -1,13 +1,21 @@
 """ Views """
 
+import functools
+import itertools
 import logging as log
-from typing import List, Tuple
+import sys
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from rich.console import Console
 from rich.markdown import Markdown
+from rich.table import Table
 
-from binance import Binance
-from models import Account, AvgPrice, Order, Profit, Ticker
+from constants import PAGE_SIZE
+from metrics import EndpointSummary
+
+if TYPE_CHECKING:
+    from models import Account, Balance, Order, Profit, Response, Ticker24h
+    from portfolio import Holding
 
 # Log Settings
 log.basicConfig(
@@ -17,145 +25,337 @@ log.basicConfig(
     level=log.INFO,
 )
 
-binance: Binance = Binance()
 CONSOLE: Console = Console()
 
+# Column name and justification.
+Column = Tuple[str, str]
+Row = Sequence[str]
+
+ORDER_COLUMNS: Tuple[Column, ...] = (
+    ("Order ID", "right"),
+    ("Symbol", "left"),
+    ("Side", "left"),
+    ("Price", "right"),
+    ("Orig Qty", "right"),
+    ("Exec Qty", "right"),
+    ("Status", "left"),
+)
+PROFIT_COLUMNS: Tuple[Column, ...] = (("Symbol", "left"),) + tuple(
+    (name, "right")
+    for name in ("Qty", "Cost", "Current value", "Realized", "Unrealized", "Profit %")
+)
+PORTFOLIO_COLUMNS: Tuple[Column, ...] = (("Asset", "left"),) + tuple(
+    (name, "right") for name in ("Amount", "Price", "Value", "Share %")
+)
+STATS_COLUMNS: Tuple[Column, ...] = (("Endpoint", "left"),) + tuple(
+    (name, "right")
+    for name in (
+        "Requests",
+        "Mean ms",
+        "p95 ms",
+        "Mean KB",
+        "Weight",
+        "Errors",
+        "Retries",
+        "Invalid",
+    )
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _markdown(text: str) -> Markdown:
+    """Parsed Markdown, reused by repeated headers"""
+    return Markdown(text)
+
 
 def print_markdown(text: str) -> None:
     """
-    Print a string in Markdown format.
+    Print a string in Markdown format, as is when not on a terminal.
+    :return: None
+    """
+    if CONSOLE.is_terminal:
+        CONSOLE.print(_markdown(text))
+    else:
+        sys.stdout.write(f"{text}\n")
+
+
+def _pages(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    """Split rows in lists of `size` rows, lazily"""
+    rows = iter(rows)
+    while True:
+        page: List[Row] = list(itertools.islice(rows, size))
+        if not page:
+            return
+        yield page
+
+
+def _table(
+    title: str, columns: Sequence[Column], rows: List[Row], show_header: bool
+) -> Table:
+    """Build a rich Table in one pass"""
+    table = Table(title=title, title_justify="left", show_header=show_header)
+    for name, justify in columns:
+        table.add_column(name, justify=justify)
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+
+def show_table(
+    title: str,
+    columns: Sequence[Column],
+    rows: Iterable[Row],
+    empty: str = "Nothing to show!",
+    show_header: bool = True,
+    page_size: int = PAGE_SIZE,
+) -> None:
+    """
+    Print rows as a table. Rows are consumed lazily, a page at a time.
+    On a terminal, each page is one rich Table printed with one write,
+    and the next page is shown after Enter. Otherwise rows are written
+    as tab separated plain text, without any styling.
+    :param title: String with the title.
+    :param columns: Sequence of (name, justify) tuples.
+    :param rows: Iterable of rows of strings.
+    :param empty: String printed when there are no rows.
+    :param show_header: False to hide the column names.
+    :param page_size: Int with the rows per page.
     :return: None
     """
-    md_text: Markdown = Markdown(text)
-    CONSOLE.print(md_text)
+    pages: Iterator[List[Row]] = _pages(rows, page_size)
+    first: Optional[List[Row]] = next(pages, None)
+    if first is None:
+        print(empty)
+        return
+    if not CONSOLE.is_terminal:
+        write = sys.stdout.write
+        write(f"{title}\n")
+        if show_header:
+            write("\t".join(name for name, _ in columns) + "\n")
+        for page in itertools.chain([first], pages):
+            write("".join("\t".join(row) + "\n" for row in page))
+        return
+    CONSOLE.print(_table(title, columns, first, show_header))
+    for page in pages:
+        if CONSOLE.input("[dim]Enter for more, q to stop:[/dim] ").lower() == "q":
+            return
+        CONSOLE.print(_table(title, columns, page, show_header))
+
 
+def _show_fields(title: str, fields: Iterable[Row]) -> None:
+    """Print name and value pairs as a two column table"""
+    show_table(title, (("Field", "left"), ("Value", "left")), fields, show_header=False)
 
-def show_account(account: Account) -> None:
+
+def show_account(account: "Account") -> None:
     """
     Show account information.
     :param account: Account object.
     :return: None
     """
-    print_markdown("**Account info:**")
-    lines: Tuple[str] = (
-        "PERMISIONS",
-        f"Can trade: {account.can_trade}",
-        f"Can deposit: {account.can_deposit}",
-        f"Can wthdraw: {account.can_withdraw}",
-        "FEES",
-        f"Maker commission: {account.maker_commission}",
-        f"Taker commission: {account.taker_commission}",
-        f"Buyer commission: {account.buyer_commission}",
-        f"Seller commission: {account.seller_commission}",
-        "---",
+    _show_fields(
+        "Account info",
+        (
+            ("Can trade", str(account.can_trade)),
+            ("Can deposit", str(account.can_deposit)),
+            ("Can withdraw", str(account.can_withdraw)),
+            ("Maker commission", str(account.maker_commission)),
+            ("Taker commission", str(account.taker_commission)),
+            ("Buyer commission", str(account.buyer_commission)),
+            ("Seller commission", str(account.seller_commission)),
+        ),
     )
-    for line in lines:
-        print_markdown(line)
 
 
-def show_balance(account: Account) -> None:
+def show_balance(balances: List["Balance"]) -> None:
     """
     Show balances.
-    :param account: Account object.
+    :param balances: List of Balance object, with funds.
     :return: None
     """
-    print_markdown("**Current balance:**")
-    for balance in account.balances:
-        if float(balance.free) > 0:
-            print(f"{balance.asset}: {balance.free}")
-    print_markdown("---")
+    show_table(
+        "Current balance",
+        (("Asset", "left"), ("Free", "right"), ("Locked", "right")),
+        ((balance.asset, balance.free, balance.locked) for balance in balances),
+        empty="No balance found!",
+    )
+
+
+def _order_row(order: "Order") -> Row:
+    return (
+        str(order.order_id),
+        order.symbol,
+        order.side,
+        order.price,
+        str(order.orig_qty),
+        order.executed_qty,
+        order.status,
+    )
 
 
-def place_order(order: Order) -> None:
+def place_order(order: "Order") -> None:
     """
     Place an order and show the details.
     :param order: Order object.
     :return: None
     """
-    log.info("ORDER DETAILS: %s", order.dict)
-    print(f'{"--"*15}\nOrder ID: {order.order_id}')
-    print(f"Status: {order.status}")
-    print(f"Executed Qty: {order.executed_qty}")
+    log.info("ORDER DETAILS: %s", order.dict())
+    show_table("New order", ORDER_COLUMNS, [_order_row(order)])
     if order.fills:
-        for fill in order.fills:
-            print(f" * Price: {fill.price}")
-            print(f" * Quantity: {fill.qty}")
-            print(f" * Fee ({fill.commission_asset}): {fill.commission}")
-            print_markdown("---")
+        show_table(
+            "Fills",
+            (("Price", "right"), ("Quantity", "right"), ("Fee", "right")),
+            (
+                (fill.price, fill.qty, f"{fill.commission} {fill.commission_asset}")
+                for fill in order.fills
+            ),
+        )
+
+
+def order_rejected(error: "Response") -> None:
+    """
+    Show why an order was rejected before being sent.
+    :param error: Response object.
+    :return: None
+    """
+    log.info("ORDER REJECTED: %s", error.dict())
+    print_markdown(f"**Order rejected:** {error.msg} ({error.code})")
 
 
-def symbol_price(symbol: str) -> None:
+def symbol_price(ticker: "Ticker24h", live_price: Optional[float] = None) -> None:
     """
-    Show the average and 5min price of a symbol.
-    :param symbol: String with the symbol.
+    Show the latest and 24h average price of a symbol.
+    :param ticker: Ticker24h object.
+    :param live_price: Optional streamed price, fresher than the ticker.
     :return: None
     """
-    average: AvgPrice = binance.get_avg_price(symbol)
-    latest: Ticker = binance.get_latest_price(symbol)
-    print(f" * Latest Price: {latest.price}")
-    print(f" * Average 5min: {average.price}")
-    print_markdown("---")
+    latest: str = ticker.last_price if live_price is None else str(live_price)
+    _show_fields(
+        ticker.symbol,
+        (
+            ("Latest Price", latest),
+            ("Average 24h", ticker.weighted_avg_price),
+            ("Change 24h", f"{ticker.price_change_percent}%"),
+        ),
+    )
+
+
+def _profit_row(item: "Profit") -> Row:
+    change: float = item.unrealized / item.buy_value if item.buy_value else 0
+    return (
+        item.symbol,
+        str(round(item.qty, 8)),
+        str(round(item.buy_value, 2)),
+        str(round(item.current_value, 2)),
+        str(round(item.realized, 2)),
+        str(round(item.unrealized, 2)),
+        str(round(change * 100, 2)),
+    )
 
 
-def profit_stats(profits: List[Profit]) -> None:
+def profit_stats(profits: List["Profit"]) -> None:
     """
     List profit stats.
     :param pairs: List of Profit object.
     :return: None
     """
-    if profits:
-        print("Symbol | Buy Qty | Buy value | Current Price | Profit")
-        for item in profits:
-            item: Profit
-            change: float = item.buy_value / item.current_value
-            line: str = "\t".join(
-                [
-                    item.symbol,
-                    str(round(item.qty, 8)),
-                    str(round(item.buy_value, 2)),
-                    str(round(item.current_value, 2)),
-                    str(round(float(1 - change) * 100, 2)),
-                ]
-            )
-            print(line)
-    else:
-        print("No trades found!")
+    show_table(
+        "Profit stats",
+        PROFIT_COLUMNS,
+        map(_profit_row, profits),
+        empty="No trades found!",
+    )
 
 
-def cancel_order(order: Order) -> None:
+def cancel_order(order: "Order") -> None:
     """
     Cancel an order.
     :param order: Order object.
     :return: None
     """
-    print_markdown("---")
-    print(f"Order ID: {order.order_id}")
-    print(f"Symbol  : {order.symbol}")
-    print(f"Side    : {order.side}")
-    print(f"Price   : {order.price}")
-    print(f"Orig Qty: {order.orig_qty}")
-    print(f"Exec Qty: {order.executed_qty}")
-    print(f"Status  : {order.status}")
+    show_table("Cancelled order", ORDER_COLUMNS, [_order_row(order)])
 
 
-def open_orders(orders: List[Order]) -> None:
+def open_orders(orders: List["Order"]) -> None:
     """
     List open orders.
     :param: List of Order object.
     :return: None
     """
-    if orders:
-        for order in orders:
-            print_markdown("---")
-            print(f"Order ID: {order.order_id}")
-            print(f"Symbol  : {order.symbol}")
-            print(f"Side    : {order.side}")
-            print(f"Price   : {order.price}")
-            print(f"Orig Qty: {order.orig_qty}")
-            print(f"Exec Qty: {order.executed_qty}")
-            print(f"Status  : {order.status}")
-    else:
-        print("There are no open orders!")
+    show_table(
+        "Open orders",
+        ORDER_COLUMNS,
+        map(_order_row, orders),
+        empty="There are no open orders!",
+    )
+
+
+def _portfolio_row(item: "Holding", total: float) -> Row:
+    if item.value is None:
+        return (item.asset, str(round(item.amount, 8)), "-", "-", "-")
+    share: float = item.value / total if total else 0
+    return (
+        item.asset,
+        str(round(item.amount, 8)),
+        str(round(item.price, 8)),
+        str(round(item.value, 2)),
+        str(round(share * 100, 2)),
+    )
+
+
+def show_portfolio(holdings: List["Holding"], total: float, quote: str) -> None:
+    """
+    List the value of every holding in a quote asset.
+    :param holdings: List of Holding object.
+    :param total: Float with the total value.
+    :param quote: String with the quote asset.
+    :return: None
+    """
+    show_table(
+        f"Portfolio value: {round(total, 2)} {quote}",
+        PORTFOLIO_COLUMNS,
+        (_portfolio_row(item, total) for item in holdings),
+        empty="No balance found!",
+    )
+
+
+def _ms(seconds: Optional[float]) -> str:
+    """Seconds as milliseconds, for display"""
+    return "-" if seconds is None else str(round(seconds * 1000, 1))
+
+
+def _stats_row(item: EndpointSummary) -> Row:
+    size: str = "-"
+    if item.mean_size is not None:
+        size = str(round(item.mean_size / 1024, 1))
+    return (
+        f"{item.method} {item.endpoint}",
+        str(item.requests),
+        _ms(item.mean_latency),
+        _ms(item.p95_latency),
+        size,
+        str(item.weight),
+        str(item.errors),
+        str(item.retries),
+        str(item.validation_failures),
+    )
+
+
+def show_stats(summaries: List[EndpointSummary], dump_path: str) -> None:
+    """
+    List request metrics per endpoint.
+    :param summaries: List of EndpointSummary object.
+    :param dump_path: String with the path of the Prometheus dump.
+    :return: None
+    """
+    show_table(
+        "Requests",
+        STATS_COLUMNS,
+        map(_stats_row, summaries),
+        empty="No requests yet!",
+    )
+    if summaries:
+        print(f"Prometheus metrics written to {dump_path}")
 
 
 if __name__ == "__main__":
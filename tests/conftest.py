@@ -0,0 +1,12 @@
+""" Test setup: the modules of src and the local stub servers """
+
+import sys
+from os import path
+
+ROOT_DIR: str = path.dirname(path.dirname(path.abspath(__file__)))
+for folder in ("src", "benchmarks"):
+    if path.join(ROOT_DIR, folder) not in sys.path:
+        sys.path.insert(0, path.join(ROOT_DIR, folder))
+
+# Sets dummy keys, so clients can be built without an .env file.
+import stub_server  # noqa: E402,F401 pylint: disable=wrong-import-position
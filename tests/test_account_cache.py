@@ -0,0 +1,113 @@
+""" Account cache patching with the orders placed and cancelled """
+
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from account_cache import AccountCache
+from models import Account, Balance, Order
+
+PAIRS: Dict[str, Tuple[str, str]] = {
+    "BTCUSDT": ("BTC", "USDT"),
+    "BTCEUR": ("BTC", "EUR"),
+}
+
+
+def _account(balances: Dict[str, str]) -> Account:
+    return Account(
+        makerCommission=10,
+        takerCommission=10,
+        buyerCommission=0,
+        sellerCommission=0,
+        canTrade=True,
+        canWithdraw=True,
+        canDeposit=True,
+        updateTime=1,
+        accountType="SPOT",
+        balances=[
+            Balance(asset=asset, free=free, locked="0.00000000")
+            for asset, free in balances.items()
+        ],
+        permissions=["SPOT"],
+    )
+
+
+def _order(symbol: str, status: str, fills: List[dict]) -> Order:
+    executed: float = sum(float(fill["qty"]) for fill in fills)
+    return Order(
+        symbol=symbol,
+        orderId=1,
+        orderListId=-1,
+        clientOrderId="client1",
+        price="30000.00",
+        origQty="0.02",
+        executedQty=str(executed),
+        cummulativeQuoteQty="0",
+        status=status,
+        timeInForce="GTC",
+        type="LIMIT",
+        side="BUY",
+        fills=fills,
+    )
+
+
+@pytest.fixture(name="fetches")
+def fixture_fetches() -> List[Account]:
+    return []
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(fetches: List[Account]) -> AccountCache:
+    def fetch() -> Account:
+        fetches.append(_account({"BTC": "0.00000000", "USDT": "1000.00000000"}))
+        return fetches[-1]
+
+    cache = AccountCache(fetch, PAIRS.get, ttl=60)
+    cache.get()
+    return cache
+
+
+def _free(cache: AccountCache) -> Dict[str, Tuple[str, str]]:
+    return {item.asset: (item.free, item.locked) for item in cache.get().balances}
+
+
+def test_orders_patch_the_balances(cache: AccountCache, fetches: List[Account]):
+    fill: dict = {
+        "price": "30000.00",
+        "qty": "0.01",
+        "commission": "0.00001",
+        "commissionAsset": "BTC",
+    }
+    order: Order = _order("BTCUSDT", "PARTIALLY_FILLED", [fill])
+    cache.apply_order(order)
+    assert _free(cache) == {
+        "BTC": ("0.00999000", "0.00000000"),
+        "USDT": ("400.00000000", "300.00000000"),
+    }
+    cache.apply_cancel(order)
+    assert _free(cache) == {
+        "BTC": ("0.00999000", "0.00000000"),
+        "USDT": ("700.00000000", "0.00000000"),
+    }
+    assert sorted(balance.asset for balance in cache.balances()) == ["BTC", "USDT"]
+    assert len(fetches) == 1
+
+
+@pytest.mark.parametrize("symbol", ["ETHUSDT", "BTCEUR"])
+def test_unknown_changes_refresh_the_snapshot(
+    cache: AccountCache, fetches: List[Account], symbol: str
+):
+    # An unknown symbol, or an asset the account doesn't have.
+    cache.apply_order(_order(symbol, "NEW", []))
+    assert cache.is_stale()
+    cache.get()
+    assert len(fetches) == 2
+
+
+def test_failed_lookups_refresh_the_snapshot(cache: AccountCache):
+    def assets(_: str) -> Optional[Tuple[str, str]]:
+        raise SystemExit()
+
+    cache._assets = assets  # pylint: disable=protected-access
+    cache.apply_cancel(_order("BTCUSDT", "CANCELED", []))
+    assert cache.is_stale()
@@ -0,0 +1,84 @@
+""" Asyncio client tests, against the local stub servers """
+
+import threading
+import time
+from typing import Dict, List
+
+import pytest
+from mock_binance import MockBinance
+from stub_server import StubServer, default_routes
+
+from async_binance import AsyncBinance
+from binance import Binance
+from models import AvgPrice
+from trade_store import TradeStore
+
+SYMBOLS: List[str] = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"]
+
+
+class InFlight:
+    """Average price route counting the requests served at once"""
+
+    def __init__(self):
+        self.current: int = 0
+        self.peak: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __call__(self, _: dict) -> dict:
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(0.05)
+        with self._lock:
+            self.current -= 1
+        return {"mins": 5, "price": "30000.00"}
+
+
+def test_map_symbols_keeps_at_most_concurrency_requests_in_flight():
+    in_flight = InFlight()
+    routes: dict = {**default_routes(), "/api/v3/avgPrice": in_flight}
+    with StubServer(routes) as server:
+        client = AsyncBinance(Binance(base_url=server.url), concurrency=2)
+        try:
+            prices: Dict[str, AvgPrice] = client.run(
+                client.map_symbols(client.get_avg_price, SYMBOLS)
+            )
+        finally:
+            client.close()
+    assert list(prices) == SYMBOLS
+    assert in_flight.peak == 2
+
+
+def test_gather_raises_the_first_error():
+    with StubServer() as server:
+        client = AsyncBinance(Binance(base_url=server.url), concurrency=2)
+
+        async def price(symbol: str) -> AvgPrice:
+            if symbol == "XRPUSDT":
+                raise ValueError(f"Unknown symbol: {symbol}")
+            return await client.get_avg_price(symbol)
+
+        try:
+            with pytest.raises(ValueError, match="XRPUSDT"):
+                client.run(client.map_symbols(price, SYMBOLS))
+            with pytest.raises(ValueError, match="XRPUSDT"):
+                client.run(client.gather(price("BTCUSDT"), price("XRPUSDT")))
+        finally:
+            client.close()
+
+
+def test_iter_trades_starts_from_the_given_id():
+    with MockBinance(trades=50) as mock:
+        binance = Binance(base_url=mock.url, trade_store=TradeStore(":memory:"))
+        client = AsyncBinance(binance)
+
+        async def trade_ids() -> List[int]:
+            ids: List[int] = []
+            async for batch in client.iter_trades("BTCUSDT", from_id=40):
+                ids.extend(trade.id_ for trade in batch)
+            return ids
+
+        try:
+            assert client.run(trade_ids()) == list(range(40, 50))
+        finally:
+            client.close()
@@ -0,0 +1,55 @@
+""" Command line interface tests """
+
+import io
+import json
+from typing import List, Optional
+
+from cli import _merge_values, _parser, serve
+
+
+def _holding(asset: str, amount: float, value: Optional[float]) -> dict:
+    return {"asset": asset, "amount": amount, "value": value}
+
+
+def _result(total: float, holdings: List[dict]) -> dict:
+    return {"quote": "USDT", "total": total, "holdings": holdings}
+
+
+def test_merge_values_adds_up_holdings():
+    merged: dict = _merge_values(
+        {
+            "one": _result(
+                30.0, [_holding("BTC", 1.0, 20.0), _holding("ETH", 2.0, 10.0)]
+            ),
+            "two": _result(5.0, [_holding("BTC", 0.5, 5.0)]),
+        }
+    )
+    assert merged["quote"] == "USDT"
+    assert merged["total"] == 35.0
+    assert merged["holdings"] == [
+        _holding("BTC", 1.5, 25.0),
+        _holding("ETH", 2.0, 10.0),
+    ]
+
+
+def test_merge_values_keeps_unknown_values():
+    for first, second in ((None, 5.0), (5.0, None), (None, None)):
+        merged: dict = _merge_values(
+            {
+                "one": _result(0.0, [_holding("XYZ", 1.0, first)]),
+                "two": _result(0.0, [_holding("XYZ", 2.0, second)]),
+            }
+        )
+        assert merged["holdings"] == [_holding("XYZ", 3.0, None)]
+
+
+def test_serve_answers_bad_lines_and_keeps_going(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('orders "BTC\n\nnope\n'))
+    serve(_parser(), None)
+    answers: List[dict] = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert answers == [
+        {"error": "ValueError: No closing quotation"},
+        {"error": "exit 2"},
+    ]
@@ -0,0 +1,67 @@
+""" Server clock and timestamp error tests """
+
+import time
+from typing import List
+
+from mock_binance import MockBinance
+from stub_server import Reply
+
+from binance import Binance, Private, Public
+from clock import ServerClock
+from trade_store import TradeStore
+
+OFFSET: int = 5_000
+
+
+def test_sync_measures_the_offset_once():
+    fetched: List[int] = []
+
+    def fetch() -> int:
+        fetched.append(1)
+        return int(time.time() * 1000) + OFFSET
+
+    clock = ServerClock(fetch, refresh_interval=60)
+    assert clock.is_stale()
+    server_time: int = clock.now()
+    assert abs(server_time - time.time() * 1000 - OFFSET) < 100
+    assert abs(clock.offset - OFFSET) < 100
+    assert not clock.is_stale()
+    clock.now()
+    assert len(fetched) == 1
+
+
+def test_timestamp_errors_resync_the_clock_and_retry():
+    offset: List[int] = [0]
+    fetched: List[int] = []
+    rejected: List[int] = []
+
+    def server_now() -> int:
+        return int(time.time() * 1000) + offset[0]
+
+    def server_time(_: dict) -> dict:
+        fetched.append(1)
+        return {"serverTime": server_now()}
+
+    with MockBinance() as mock:
+        account = mock.routes[Private.account]
+
+        def checked_account(params: dict) -> object:
+            if abs(int(params["timestamp"]) - server_now()) > 1000:
+                rejected.append(1)
+                return Reply(400, {"code": -1021, "msg": "Timestamp outside."})
+            return account(params)
+
+        mock.routes[Public.time] = server_time
+        mock.routes[Private.account] = checked_account
+        binance = Binance(base_url=mock.url, trade_store=TradeStore(":memory:"))
+        try:
+            binance.clock.sync()
+            # The server clock jumps ahead of the measured offset.
+            offset[0] = OFFSET
+            assert binance.get_account().balances
+        finally:
+            binance.close()
+    assert len(rejected) == 1
+    # The first sync, then the one after the rejection.
+    assert len(fetched) == 2
+    assert abs(binance.clock.offset - OFFSET) < 100
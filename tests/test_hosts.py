@@ -0,0 +1,115 @@
+""" Host failover and hedging tests, against several stub servers """
+
+import time
+from contextlib import ExitStack
+from typing import Dict, Iterator, List
+
+import pytest
+import requests
+from stub_server import Reply, StubServer, default_routes
+
+from binance import Binance
+from trade_store import TradeStore
+
+SLOW: float = 0.5
+
+
+class Host:
+    """Stub host counting its requests, optionally slow or failing"""
+
+    def __init__(self, price: str, delay: float = 0.0, status: int = 200):
+        self.price: str = price
+        self.delay: float = delay
+        self.status: int = status
+        self.requests: List[str] = []
+        routes = default_routes()
+        routes["/api/v3/ticker/price"] = self._price
+        routes["POST /api/v3/userDataStream"] = self._listen_key
+        self.server: StubServer = StubServer(routes)
+
+    def _reply(self, path: str, payload: dict) -> Reply:
+        self.requests.append(path)
+        time.sleep(self.delay)
+        if self.status >= 500:
+            return Reply(self.status, {"code": -1, "msg": "Unavailable"})
+        return Reply(self.status, payload)
+
+    def _price(self, params: dict) -> Reply:
+        return self._reply("price", {"symbol": params["symbol"], "price": self.price})
+
+    def _listen_key(self, _: dict) -> Reply:
+        return self._reply("listenKey", {"listenKey": self.price})
+
+
+@pytest.fixture(name="hosts")
+def fixture_hosts() -> Iterator[Dict[str, Host]]:
+    hosts: Dict[str, Host] = {"first": Host("1.0"), "second": Host("2.0")}
+    with ExitStack() as stack:
+        for host in hosts.values():
+            stack.enter_context(host.server)
+        yield hosts
+
+
+def _binance(hosts: Dict[str, Host], hedge: bool = False) -> Binance:
+    return Binance(
+        hosts=[host.server.url for host in hosts.values()],
+        hedge=hedge,
+        read_timeout=SLOW / 5,
+        trade_store=TradeStore(":memory:"),
+    )
+
+
+def _is_healthy(binance: Binance, host: Host) -> bool:
+    return binance.hosts.stats[host.server.url].is_healthy
+
+
+def test_reads_fail_over_on_server_errors(hosts: Dict[str, Host]):
+    hosts["first"].status = 503
+    with _binance(hosts) as binance:
+        assert binance.get_latest_price("BTCUSDT").price == "2.0"
+        assert not _is_healthy(binance, hosts["first"])
+        # The failed host is skipped while backing off.
+        assert binance.get_latest_price("BTCUSDT").price == "2.0"
+    assert hosts["first"].requests == ["price"]
+
+
+def test_reads_fail_over_on_timeouts(hosts: Dict[str, Host]):
+    hosts["first"].delay = SLOW
+    with _binance(hosts) as binance:
+        assert binance.get_latest_price("BTCUSDT").price == "2.0"
+        assert not _is_healthy(binance, hosts["first"])
+
+
+def test_writes_are_not_sent_twice_on_server_errors(hosts: Dict[str, Host]):
+    hosts["first"].status = 503
+    with _binance(hosts) as binance, pytest.raises(SystemExit):
+        binance.create_listen_key()
+    assert hosts["first"].requests == ["listenKey"]
+    assert not hosts["second"].requests
+
+
+def test_writes_are_not_sent_twice_on_timeouts(hosts: Dict[str, Host]):
+    hosts["first"].delay = SLOW
+    with _binance(hosts) as binance, pytest.raises(requests.ReadTimeout):
+        binance.create_listen_key()
+    assert not hosts["second"].requests
+
+
+def test_hedged_reads_take_the_first_answer(hosts: Dict[str, Host]):
+    hosts["first"].delay = SLOW
+    with _binance(hosts, hedge=True) as binance:
+        binance.timeout = (binance.timeout[0], SLOW * 2)
+        start: float = time.perf_counter()
+        ticker = binance.get_latest_price("BTCUSDT")
+        elapsed: float = time.perf_counter() - start
+    assert ticker.price == "2.0"
+    # Hedged after the default delay, without waiting for the slow host.
+    assert elapsed < SLOW
+    assert hosts["first"].requests == hosts["second"].requests == ["price"]
+
+
+def test_hedged_reads_fail_over_on_server_errors(hosts: Dict[str, Host]):
+    hosts["first"].status = 503
+    with _binance(hosts, hedge=True) as binance:
+        assert binance.get_latest_price("BTCUSDT").price == "2.0"
+    assert hosts["first"].requests == ["price"]
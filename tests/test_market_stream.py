@@ -0,0 +1,174 @@
+""" Market data stream tests, against a local WebSocket stand-in """
+
+import json
+import time
+from typing import Callable, List
+
+import pytest
+import requests
+from ws_replay import ReplayServer
+
+import market_stream
+from market_stream import MarketStream
+
+
+def _wait(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _depth(update_id: int) -> str:
+    data: dict = {
+        "e": "depthUpdate",
+        "s": "BTCUSDT",
+        "U": update_id,
+        "u": update_id,
+        "b": [[str(100 + update_id), "1"]],
+        "a": [],
+    }
+    return json.dumps({"stream": "btcusdt@depth@100ms", "data": data})
+
+
+def _trade(symbol: str, price: float) -> str:
+    data: dict = {"e": "trade", "s": symbol, "p": str(price), "q": "1"}
+    return json.dumps({"stream": f"{symbol.lower()}@trade", "data": data})
+
+
+def _snapshot(update_id: int) -> dict:
+    return {"lastUpdateId": update_id, "bids": [["100", "1"]], "asks": []}
+
+
+def _synced_to(stream: MarketStream, update_id: int) -> bool:
+    book = stream.order_book("BTCUSDT")
+    return book is not None and book.last_update_id == update_id
+
+
+def _subscriptions(replay: ReplayServer, stream: str) -> int:
+    frames: List[dict] = [json.loads(frame) for frame in replay.received]
+    return sum(
+        1
+        for frame in frames
+        if frame["method"] == "SUBSCRIBE" and stream in frame["params"]
+    )
+
+
+def test_order_book_resyncs_after_a_gap():
+    snapshots: List[dict] = [_snapshot(2), _snapshot(9)]
+    fetched: List[str] = []
+
+    def fetch(symbol: str) -> dict:
+        fetched.append(symbol)
+        return snapshots.pop(0)
+
+    with ReplayServer([]) as replay:
+        stream = MarketStream(fetch, url=replay.url, reconnect=0.1)
+        stream.subscribe(["BTCUSDT"], depth=True)
+        stream.start()
+        try:
+            _wait(lambda: replay.paths)
+            replay.send([_depth(i) for i in range(1, 6)])
+            _wait(lambda: _synced_to(stream, 5))
+            # Updates 6 and 7 are missed.
+            replay.send([_depth(i) for i in range(8, 13)])
+            _wait(lambda: _synced_to(stream, 12))
+        finally:
+            stream.stop()
+    assert fetched == ["BTCUSDT", "BTCUSDT"]
+    # The second snapshot plus the updates after it.
+    assert sorted(stream.order_books["BTCUSDT"].bids) == [100, 110, 111, 112]
+
+
+def test_order_book_snapshot_is_retried(monkeypatch):
+    monkeypatch.setattr(market_stream, "STREAM_RETRY_DELAY", 0.01)
+    results: list = [SystemExit(), requests.ConnectionError(), _snapshot(0)]
+
+    def fetch(_: str) -> dict:
+        result = results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    with ReplayServer([_depth(1)]) as replay:
+        stream = MarketStream(fetch, url=replay.url, reconnect=0.1)
+        stream.subscribe(["BTCUSDT"], depth=True)
+        stream.start()
+        try:
+            _wait(lambda: _synced_to(stream, 1))
+        finally:
+            stream.stop()
+    assert not results
+
+
+def test_outdated_snapshots_are_fetched_again_with_a_backoff(monkeypatch):
+    monkeypatch.setattr(market_stream, "STREAM_RETRY_DELAY", 0.2)
+    snapshots: List[dict] = [_snapshot(0), _snapshot(0)]
+    fetched_at: List[float] = []
+
+    def fetch(_: str) -> dict:
+        fetched_at.append(time.monotonic())
+        return snapshots.pop(0)
+
+    with ReplayServer([_depth(5)]) as replay:
+        stream = MarketStream(fetch, url=replay.url, reconnect=0.1)
+        stream.subscribe(["BTCUSDT"], depth=True)
+        stream.start()
+        try:
+            # Older than the buffered event, then synced with nothing left
+            # to apply.
+            _wait(lambda: _synced_to(stream, 0))
+        finally:
+            stream.stop()
+    assert fetched_at[1] - fetched_at[0] >= 0.2
+
+
+def test_symbols_are_subscribed_again_after_a_reconnection():
+    with ReplayServer([]) as replay:
+        stream = MarketStream(url=replay.url, reconnect=0.1)
+        stream.subscribe(["BTCUSDT"])
+        stream.start()
+        try:
+            _wait(lambda: replay.paths)
+            stream.subscribe(["ETHUSDT"])
+            _wait(lambda: _subscriptions(replay, "ethusdt@trade") == 1)
+            replay.drop()
+            _wait(lambda: len(replay.paths) == 2)
+            _wait(lambda: _subscriptions(replay, "ethusdt@trade") == 2)
+            replay.send([_trade("ETHUSDT", 2000)])
+            _wait(lambda: stream.last_price("ETHUSDT") == 2000)
+        finally:
+            stream.stop()
+    # Reconnections reuse the first URL, without the symbols added later.
+    assert replay.paths[0] == replay.paths[1]
+    assert "btcusdt@trade" in replay.paths[0]
+    assert "ethusdt" not in replay.paths[0]
+    assert _subscriptions(replay, "btcusdt@trade") == 0
+
+
+def test_stale_symbols_read_as_unknown():
+    stream = MarketStream(max_age=0.05)
+    stream.handle(_trade("BTCUSDT", 100))
+    assert stream.last_price("btcusdt") == pytest.approx(100)
+    time.sleep(0.1)
+    assert stream.last_price("BTCUSDT") is None
+    stream.handle(_trade("BTCUSDT", 101))
+    assert stream.last_price("BTCUSDT") == pytest.approx(101)
+
+
+def test_depth_streams_are_only_subscribed_on_request():
+    stream = MarketStream(lambda _: _snapshot(1))
+    stream.subscribe(["btcusdt", "ETHUSDT"])
+    assert stream.streams == {
+        "btcusdt@trade",
+        "btcusdt@bookTicker",
+        "ethusdt@trade",
+        "ethusdt@bookTicker",
+    }
+    stream.subscribe(["BTCUSDT"], depth=True)
+    assert "btcusdt@depth@100ms" in stream.streams
+    assert "ethusdt@depth@100ms" not in stream.streams
+    # Without a snapshot source there are no order books to keep.
+    stream = MarketStream()
+    stream.subscribe(["BTCUSDT"], depth=True)
+    assert stream.streams == {"btcusdt@trade", "btcusdt@bookTicker"}
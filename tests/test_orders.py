@@ -0,0 +1,122 @@
+""" Order batches and trading rules, against the mock exchange """
+
+import os
+import threading
+from typing import Callable, Iterator, List
+
+import pytest
+from mock_binance import MockBinance
+from stub_server import Reply
+
+from binance import Binance
+from exchange_info import ExchangeInfoCache
+from models import NewOrder, OrderResult, Response
+from trade_store import TradeStore
+
+
+@pytest.fixture(name="mock")
+def fixture_mock() -> Iterator[MockBinance]:
+    with MockBinance() as mock:
+        yield mock
+
+
+@pytest.fixture(name="binance")
+def fixture_binance(mock: MockBinance, tmp_path) -> Iterator[Binance]:
+    with Binance(
+        base_url=mock.url,
+        trade_store=TradeStore(":memory:"),
+        exchange_info_path=str(tmp_path / "exchange_info.json"),
+    ) as binance:
+        yield binance
+
+
+def _orders(count: int) -> List[NewOrder]:
+    return [
+        NewOrder(symbol="BTCUSDT", side="BUY", type_="L", qty=0.01, price=price)
+        for price in range(20000, 20000 + count)
+    ]
+
+
+def test_failed_rules_download_fails_each_order(mock: MockBinance, binance: Binance):
+    mock.routes["/api/v3/exchangeInfo"] = lambda _: Reply(
+        503, {"code": -1, "msg": "Unavailable"}
+    )
+    results: List[OrderResult] = binance.create_orders(_orders(3))
+    assert [result.result for result in results] == [None] * 3
+    assert all(result.error.code == "-1" for result in results)
+    assert not mock.orders
+
+
+def test_remote_filter_failure_downloads_the_rules_again(
+    mock: MockBinance, binance: Binance
+):
+    mock.routes["POST /api/v3/order"] = lambda _: Reply(
+        400, {"code": -1013, "msg": "Filter failure: LOT_SIZE"}
+    )
+    results: List[OrderResult] = binance.create_orders(_orders(1))
+    assert results[0].error.code == "-1013"
+    assert binance.exchange_info.is_stale()
+    assert not os.path.exists(binance.exchange_info.path)
+    assert binance.prepare_order(_orders(1)[0]).qty == 0.01
+    assert os.path.exists(binance.exchange_info.path)
+
+
+def test_concurrent_refreshes_share_the_file(binance: Binance):
+    caches: List[ExchangeInfoCache] = [
+        ExchangeInfoCache(binance.get_exchange_info, binance.exchange_info.path)
+        for _ in range(4)
+    ]
+    threads: List[threading.Thread] = [
+        threading.Thread(target=cache.refresh) for cache in caches
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    directory: str = os.path.dirname(binance.exchange_info.path)
+    assert os.listdir(directory) == ["exchange_info.json"]
+    assert ExchangeInfoCache(None, binance.exchange_info.path).get("BTCUSDT")
+
+
+BAD_GATEWAY: Reply = Reply(502, b"<html><body>502 Bad Gateway</body></html>")
+
+
+def test_gateway_errors_are_looked_up_and_retried(mock: MockBinance, binance: Binance):
+    new_order: Callable[[dict], object] = mock.routes["POST /api/v3/order"]
+    calls: List[float] = []
+
+    def route(params: dict) -> object:
+        price: float = float(params["price"])
+        calls.append(price)
+        if price == 20000 and calls.count(price) == 1:
+            # Lost on the way to the exchange.
+            return BAD_GATEWAY
+        if price == 20001 and calls.count(price) == 1:
+            # Placed, but the reply was lost.
+            new_order(params)
+            return BAD_GATEWAY
+        if price == 20002:
+            return BAD_GATEWAY
+        return new_order(params)
+
+    mock.routes["POST /api/v3/order"] = route
+    results: List[OrderResult] = binance.create_orders(_orders(3))
+    assert [result.result is not None for result in results] == [True, True, False]
+    assert results[2].error.code == "-1"
+    assert "HTTPError" in results[2].error.msg
+    # Sent again after the lookup, but not the one that was placed.
+    assert sorted(calls) == [20000, 20000, 20001] + [20002] * 3
+    assert len(mock.orders) == 2
+
+
+def test_malformed_cancel_reports_are_reported(mock: MockBinance, binance: Binance):
+    binance.create_orders(_orders(2))
+    cancel_all: Callable[[dict], object] = mock.routes["DELETE /api/v3/openOrders"]
+    mock.routes["DELETE /api/v3/openOrders"] = lambda params: [
+        *cancel_all(params),
+        {"symbol": "BTCUSDT", "status": "CANCELED"},
+    ]
+    result = binance.cancel_all_orders("BTCUSDT")
+    assert isinstance(result, Response)
+    assert not mock.orders
+    assert binance.account_cache.is_stale()
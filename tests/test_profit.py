@@ -0,0 +1,130 @@
+""" Profit engine tests """
+
+import pytest
+
+from models import Trade
+from profit import Basis, Position, ProfitEngine
+
+
+def _trade(
+    id_: int,
+    is_buyer: bool,
+    qty: float,
+    price: float,
+    commission: float = 0.0,
+    commission_asset: str = "USDT",
+) -> Trade:
+    return Trade(
+        **{
+            "symbol": "BTCUSDT",
+            "id": id_,
+            "orderId": id_,
+            "orderListId": -1,
+            "price": str(price),
+            "qty": str(qty),
+            "quoteQty": str(qty * price),
+            "commission": str(commission),
+            "commissionAsset": commission_asset,
+            "time": id_,
+            "isBuyer": is_buyer,
+            "isMaker": False,
+            "isBestMatch": True,
+        }
+    )
+
+
+TRADES = [_trade(1, True, 1, 100), _trade(2, True, 1, 200), _trade(3, False, 1, 300)]
+
+
+def test_fifo_sells_the_oldest_lots_first():
+    position = Position("BTCUSDT", Basis.FIFO)
+    position.update_many(TRADES)
+    assert position.realized == pytest.approx(200)
+    assert position.qty == pytest.approx(1)
+    assert position.cost == pytest.approx(200)
+
+
+def test_average_sells_at_the_mean_cost():
+    position = Position("BTCUSDT", Basis.AVERAGE)
+    position.update_many(TRADES)
+    assert position.realized == pytest.approx(150)
+    assert position.qty == pytest.approx(1)
+    assert position.cost == pytest.approx(150)
+
+
+def test_partial_sells_split_a_lot():
+    position = Position("BTCUSDT")
+    position.update_many(
+        [
+            _trade(1, True, 2, 100),
+            _trade(2, False, 0.5, 150),
+            _trade(3, False, 1, 200),
+        ]
+    )
+    assert position.realized == pytest.approx(25 + 100)
+    assert position.qty == pytest.approx(0.5)
+    assert position.cost == pytest.approx(50)
+    assert len(position.lots) == 1
+    profit = position.to_profit(300)
+    assert profit.current_value == pytest.approx(150)
+    assert profit.unrealized == pytest.approx(100)
+
+
+def test_selling_more_than_held_costs_nothing():
+    position = Position("BTCUSDT")
+    position.update_many([_trade(1, True, 1, 100), _trade(2, False, 2, 150)])
+    assert position.realized == pytest.approx(300 - 100)
+    assert position.qty == 0
+    assert position.cost == 0
+
+
+def test_commission_in_base_asset_reduces_the_quantity():
+    position = Position("BTCUSDT")
+    position.update(_trade(1, True, 1, 100, 0.001, "BTC"))
+    assert position.qty == pytest.approx(0.999)
+    assert position.cost == pytest.approx(100)
+    position.update(_trade(2, False, 0.5, 200, 0.001, "BTC"))
+    assert position.qty == pytest.approx(0.498)
+    assert position.realized == pytest.approx(100 - 100 * 0.501 / 0.999)
+
+
+def test_commission_in_quote_asset_adds_to_the_cost():
+    position = Position("BTCUSDT")
+    position.update(_trade(1, True, 1, 100, 0.1, "USDT"))
+    assert position.cost == pytest.approx(100.1)
+    position.update(_trade(2, False, 1, 200, 0.2, "USDT"))
+    assert position.realized == pytest.approx(200 - 0.2 - 100.1)
+
+
+def test_commission_in_other_asset_is_kept_apart():
+    position = Position("BTCUSDT")
+    position.update_many(
+        [
+            _trade(1, True, 1, 100, 0.01, "BNB"),
+            _trade(2, False, 1, 200, 0.02, "BNB"),
+        ]
+    )
+    assert position.realized == pytest.approx(100)
+    assert position.fees == {"BNB": pytest.approx(0.03)}
+
+
+def test_trades_already_seen_are_ignored():
+    position = Position("BTCUSDT")
+    position.update_many(TRADES)
+    position.update_many(TRADES)
+    assert position.last_id == 3
+    assert position.buy_qty == pytest.approx(2)
+    assert position.realized == pytest.approx(200)
+
+
+def test_engine_keeps_one_position_per_symbol():
+    engine = ProfitEngine(Basis.AVERAGE)
+    for trade in TRADES:
+        engine.update(trade)
+    assert engine.position("BTCUSDT") is engine.positions["BTCUSDT"]
+    assert engine.profit("BTCUSDT", 300).realized == pytest.approx(150)
+
+
+def test_unknown_basis():
+    with pytest.raises(ValueError):
+        Position("BTCUSDT", "LIFO")
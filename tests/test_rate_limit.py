@@ -0,0 +1,63 @@
+""" Rate limiter weight and order count tests """
+
+import threading
+import time
+from typing import List
+
+from rate_limit import Priority, RateLimiter, is_order, request_weight
+
+
+def test_open_orders_weight():
+    assert request_weight("GET", "/api/v3/openOrders", None) == 80
+    assert request_weight("GET", "/api/v3/openOrders", {"symbol": "BTCUSDT"}) == 6
+    assert request_weight("DELETE", "/api/v3/openOrders", {"symbol": "BTCUSDT"}) == 1
+
+
+def test_depth_weight():
+    assert request_weight("GET", "/api/v3/depth", {"limit": 100}) == 5
+    assert request_weight("GET", "/api/v3/depth", {"limit": 1000}) == 50
+    assert request_weight("GET", "/api/v3/depth", {"limit": 5000}) == 250
+
+
+def test_order_count():
+    assert is_order("POST", "/api/v3/order")
+    assert is_order("POST", "/api/v3/order/cancelReplace")
+    assert not is_order("POST", "/api/v3/order/test")
+    assert not is_order("DELETE", "/api/v3/order")
+    assert not is_order("GET", "/api/v3/order")
+
+
+def _acquire_in_thread(
+    limiter: RateLimiter, weight: int, orders: int, priority: int, done: List[int]
+) -> threading.Thread:
+    def acquire() -> None:
+        limiter.acquire(weight, orders, priority)
+        done.append(priority)
+
+    thread = threading.Thread(target=acquire, daemon=True)
+    thread.start()
+    # Let it start waiting.
+    time.sleep(0.05)
+    return thread
+
+
+def test_waiting_orders_go_first_on_the_weight():
+    limiter = RateLimiter(weight_limit=10, weight_interval=1)
+    limiter.acquire(10, priority=Priority.ORDER)
+    done: List[int] = []
+    order = _acquire_in_thread(limiter, 5, 1, Priority.ORDER, done)
+    limiter.acquire(1)
+    done.append(Priority.DEFAULT)
+    order.join(1)
+    assert done == [Priority.ORDER, Priority.DEFAULT]
+
+
+def test_orders_short_of_order_count_let_other_requests_through():
+    limiter = RateLimiter(order_limit=1, order_interval=5)
+    limiter.acquire(1, orders=1, priority=Priority.ORDER)
+    done: List[int] = []
+    _acquire_in_thread(limiter, 1, 1, Priority.ORDER, done)
+    started: float = time.monotonic()
+    limiter.acquire(1, priority=Priority.ANALYTICS)
+    assert time.monotonic() - started < 0.5
+    assert not done
@@ -0,0 +1,95 @@
+""" Request signing tests """
+
+import base64
+from typing import Callable, Dict, List
+from urllib import parse
+
+import pytest
+from stub_server import StubServer, default_routes
+
+from binance import Binance, Private
+from signer import HmacSigner, Signer, load_private_key, signer_from_env
+from trade_store import TradeStore
+
+# Example of the Binance API docs, "SIGNED endpoint examples".
+SECRET_KEY: str = "NhqPtmdSJYdKjVHjA7PZj4Mge3R5YNiP1e3UZjInClVN65XAbvqqM6A7H5fATj0j"
+QUERY: str = (
+    "symbol=LTCBTC&side=BUY&type=LIMIT&timeInForce=GTC&quantity=1&price=0.1"
+    "&recvWindow=5000&timestamp=1499827319559"
+)
+SIGNATURE: str = "c8db56825ae71d6d79447849e617115f4a920fa2acdcab2b053c4b2838bd6b71"
+
+
+def _write_key(key, folder) -> str:
+    from cryptography.hazmat.primitives import serialization
+
+    pem: bytes = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    path = folder / "key.pem"
+    path.write_bytes(pem)
+    return str(path)
+
+
+def _decode(signature: str) -> bytes:
+    return base64.b64decode(parse.unquote(signature))
+
+
+def test_hmac_signature_matches_the_docs_example():
+    signer = HmacSigner(SECRET_KEY)
+    assert signer.sign(QUERY.encode()) == SIGNATURE
+    # The keyed state is reused, not consumed.
+    assert signer.sign(QUERY.encode()) == SIGNATURE
+
+
+def test_ed25519_keys_sign_the_query(tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+
+    key = ed25519.Ed25519PrivateKey.generate()
+    monkeypatch.setenv("PRIVATE_KEY_PATH", _write_key(key, tmp_path))
+    signer: Signer = signer_from_env()
+    signature: str = signer.sign(QUERY.encode())
+    # Percent-encoded, base64 may contain + / and =.
+    assert parse.quote(parse.unquote(signature), safe="") == signature
+    key.public_key().verify(_decode(signature), QUERY.encode())
+
+
+def test_rsa_keys_sign_the_query(tmp_path):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    signer: Signer = load_private_key(_write_key(key, tmp_path))
+    signature: str = signer.sign(QUERY.encode())
+    key.public_key().verify(
+        _decode(signature), QUERY.encode(), padding.PKCS1v15(), hashes.SHA256()
+    )
+
+
+def test_the_sent_query_is_the_signed_one():
+    signer = HmacSigner(SECRET_KEY)
+    checked: List[bool] = []
+
+    def account(params: Dict[str, str]) -> object:
+        signature: str = params.pop("signature")
+        # The params arrive in the order they were sent.
+        checked.append(signer.sign(parse.urlencode(params).encode()) == signature)
+        return {}
+
+    routes: Dict[str, Callable[[dict], object]] = default_routes()
+    routes[Private.account] = account
+    with StubServer(routes) as server:
+        binance = Binance(
+            base_url=server.url, signer=signer, trade_store=TradeStore(":memory:")
+        )
+        try:
+            binance._request(
+                "GET", Private.account, {"recvWindow": 5000}, signed=True
+            )
+        finally:
+            binance.close()
+    assert checked == [True]
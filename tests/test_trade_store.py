@@ -0,0 +1,94 @@
+""" Trade store sync and read tests """
+
+from typing import List
+
+from mock_binance import START_TIME, MockBinance
+
+from binance import Binance, Private
+from fast_models import FastTrade
+from models import Trade
+from trade_store import TradeStore
+
+
+def _trade(trade_id: int) -> Trade:
+    return Trade(
+        symbol="BTCUSDT",
+        id=trade_id,
+        orderId=trade_id,
+        orderListId=-1,
+        price="30000.0",
+        qty="0.01",
+        quoteQty="300.0",
+        commission="0.00001",
+        commissionAsset="BTC",
+        time=START_TIME + trade_id * 1000,
+        isBuyer=True,
+        isMaker=False,
+        isBestMatch=True,
+    )
+
+
+def _ids(batches: List[list]) -> List[int]:
+    return [trade.id_ for batch in batches for trade in batch]
+
+
+def test_sync_only_downloads_new_trades():
+    with MockBinance(trades=1500) as mock:
+        from_ids: List[str] = []
+        my_trades = mock.routes[Private.my_trades]
+
+        def logged(params: dict) -> object:
+            from_ids.append(params["fromId"])
+            return my_trades(params)
+
+        mock.routes[Private.my_trades] = logged
+        binance = Binance(base_url=mock.url, trade_store=TradeStore(":memory:"))
+        try:
+            assert binance.sync_trades("BTCUSDT") == 1500
+            mock.trades = 1700
+            from_ids.clear()
+            assert binance.sync_trades("BTCUSDT") == 200
+            assert binance.sync_trades("BTCUSDT") == 0
+            assert binance.trade_store.last_id("BTCUSDT") == 1699
+        finally:
+            binance.close()
+    assert from_ids == ["1500", "1700"]
+
+
+def test_reads_are_batched_by_id():
+    store = TradeStore(":memory:")
+    store.insert([_trade(trade_id) for trade_id in range(10)])
+    batches: List[list] = list(store.iter_trades("BTCUSDT", batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert _ids(batches) == list(range(10))
+    assert _ids(store.iter_trades("BTCUSDT", from_id=7)) == [7, 8, 9]
+    window: List[list] = list(
+        store.iter_trades(
+            "BTCUSDT", START_TIME + 2000, START_TIME + 5000, batch_size=2
+        )
+    )
+    assert _ids(window) == [2, 3, 4, 5]
+    assert not list(store.iter_trades("ETHUSDT"))
+    store.close()
+
+
+def test_batches_see_trades_inserted_between_them():
+    store = TradeStore(":memory:")
+    store.insert([_trade(trade_id) for trade_id in range(4)])
+    batches = store.iter_trades("BTCUSDT", batch_size=2)
+    first: List[Trade] = next(batches)
+    # No cursor is held open, the next query starts after the last id.
+    store.insert([_trade(trade_id) for trade_id in range(4, 6)])
+    assert [trade.id_ for trade in first] == [0, 1]
+    assert _ids(list(batches)) == [2, 3, 4, 5]
+    store.close()
+
+
+def test_fast_reads_return_records():
+    store = TradeStore(":memory:", fast=True)
+    store.insert([_trade(0)])
+    trade = next(store.iter_trades("BTCUSDT"))[0]
+    assert isinstance(trade, FastTrade)
+    assert trade.is_buyer is True
+    assert trade == tuple(_trade(0).dict().values())
+    store.close()
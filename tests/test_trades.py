@@ -0,0 +1,69 @@
+""" Trade history lookup and paging tests, against the mock exchange """
+
+from typing import Iterator, List, Tuple
+
+import pytest
+from mock_binance import START_TIME, MockBinance
+
+from binance import Binance, Private
+from trade_store import TradeStore
+
+TRADES: int = 2_500
+
+
+@pytest.fixture(name="exchange")
+def fixture_exchange() -> Iterator[Tuple[MockBinance, List[dict]]]:
+    """Mock exchange and the params of its myTrades requests"""
+    with MockBinance(trades=TRADES) as mock:
+        calls: List[dict] = []
+        my_trades = mock.routes[Private.my_trades]
+
+        def logged(params: dict) -> object:
+            calls.append(params)
+            return my_trades(params)
+
+        mock.routes[Private.my_trades] = logged
+        yield mock, calls
+
+
+@pytest.fixture(name="binance")
+def fixture_binance(exchange: Tuple[MockBinance, List[dict]]) -> Iterator[Binance]:
+    binance = Binance(base_url=exchange[0].url, trade_store=TradeStore(":memory:"))
+    yield binance
+    binance.close()
+
+
+def _at(trade_id: int) -> int:
+    """Time of a trade of the mock exchange"""
+    return START_TIME + trade_id * 1000
+
+
+def test_first_trade_id_is_binary_searched(
+    binance: Binance, exchange: Tuple[MockBinance, List[dict]]
+):
+    calls: List[dict] = exchange[1]
+    assert binance._first_trade_id("BTCUSDT", _at(1234)) == 1234
+    # The latest trade, then about log2(TRADES) probes.
+    assert len(calls) <= 14
+    assert binance._first_trade_id("BTCUSDT", _at(1234) + 1) == 1235
+    assert binance._first_trade_id("BTCUSDT", 0) == 0
+    assert binance._first_trade_id("BTCUSDT", _at(TRADES)) is None
+    assert binance._first_trade_id("DOGEUSDT", 0) is None
+
+
+def test_fetch_trades_walks_the_pages(
+    binance: Binance, exchange: Tuple[MockBinance, List[dict]]
+):
+    batches: List[list] = list(binance.fetch_trades("BTCUSDT", from_id=200))
+    assert [len(batch) for batch in batches] == [1000, 1000, 300]
+    ids: List[int] = [trade.id_ for batch in batches for trade in batch]
+    assert ids == list(range(200, TRADES))
+    assert [params["fromId"] for params in exchange[1]] == ["200", "1200", "2200"]
+
+
+def test_fetch_trades_stops_at_the_end_time(binance: Binance):
+    batches: List[list] = list(
+        binance.fetch_trades("BTCUSDT", start_time=_at(100), end_time=_at(1500))
+    )
+    ids: List[int] = [trade.id_ for batch in batches for trade in batch]
+    assert ids == list(range(100, 1501))
@@ -0,0 +1,254 @@
+""" User data stream tests, against the stub REST and stream servers """
+
+import json
+import socket
+import time
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+from stub_server import StubServer, default_routes
+from ws_replay import ReplayServer
+
+from binance import Binance
+from trade_store import TradeStore
+from user_stream import UserDataStream
+
+UPDATE_TIME: int = 1000
+
+
+def _wait(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _order(order_id: int) -> dict:
+    return {
+        "symbol": "BTCUSDT",
+        "orderId": order_id,
+        "orderListId": -1,
+        "clientOrderId": f"client{order_id}",
+        "price": "30000.00",
+        "origQty": "0.01",
+        "executedQty": "0",
+        "cummulativeQuoteQty": "0",
+        "status": "NEW",
+        "timeInForce": "GTC",
+        "type": "LIMIT",
+        "side": "BUY",
+        "time": UPDATE_TIME,
+        "updateTime": UPDATE_TIME,
+        "isWorking": True,
+    }
+
+
+def _execution_report(order_id: int, status: str, update_time: int) -> str:
+    return json.dumps(
+        {
+            "e": "executionReport",
+            "E": update_time,
+            "s": "BTCUSDT",
+            "c": f"client{order_id}",
+            "S": "BUY",
+            "o": "LIMIT",
+            "f": "GTC",
+            "q": "0.01",
+            "p": "30000.00",
+            "X": status,
+            "i": order_id,
+            "z": "0.01" if status == "FILLED" else "0",
+            "Z": "300" if status == "FILLED" else "0",
+            "T": update_time,
+            "g": -1,
+        }
+    )
+
+
+def _account_position(update_time: int, balances: Dict[str, str]) -> str:
+    return json.dumps(
+        {
+            "e": "outboundAccountPosition",
+            "E": update_time,
+            "u": update_time,
+            "B": [{"a": a, "f": free, "l": "0.0"} for a, free in balances.items()],
+        }
+    )
+
+
+class Exchange:
+    """Account state served over REST, changed by the tests"""
+
+    def __init__(self):
+        self.balances: Dict[str, str] = {"USDT": "1000.0", "BTC": "0.5"}
+        self.orders: List[dict] = [_order(1)]
+        self.listen_keys: int = 0
+        self.account_requests: int = 0
+
+    def _listen_key(self, _: dict) -> dict:
+        self.listen_keys += 1
+        return {"listenKey": f"key{self.listen_keys}"}
+
+    def _account(self, _: dict) -> dict:
+        self.account_requests += 1
+        return {
+            "makerCommission": 10,
+            "takerCommission": 10,
+            "buyerCommission": 0,
+            "sellerCommission": 0,
+            "canTrade": True,
+            "canWithdraw": True,
+            "canDeposit": True,
+            "updateTime": UPDATE_TIME,
+            "accountType": "SPOT",
+            "balances": [
+                {"asset": asset, "free": free, "locked": "0.0"}
+                for asset, free in self.balances.items()
+            ],
+            "permissions": ["SPOT"],
+        }
+
+    def routes(self) -> dict:
+        routes = default_routes()
+        routes["POST /api/v3/userDataStream"] = self._listen_key
+        routes["/api/v3/userDataStream"] = lambda _: {}
+        routes["/api/v3/account"] = self._account
+        routes["/api/v3/openOrders"] = lambda _: list(self.orders)
+        return routes
+
+
+@pytest.fixture(name="exchange")
+def fixture_exchange() -> Exchange:
+    return Exchange()
+
+
+@pytest.fixture(name="binance")
+def fixture_binance(exchange: Exchange) -> Iterator[Binance]:
+    with StubServer(exchange.routes()) as rest:
+        binance = Binance(base_url=rest.url, trade_store=TradeStore(":memory:"))
+        yield binance
+        binance.close()
+
+
+def _free(stream: UserDataStream) -> Dict[str, str]:
+    return {balance.asset: balance.free for balance in stream.get_balances()}
+
+
+def test_execution_reports_update_the_open_orders(binance: Binance):
+    messages: List[str] = [
+        _execution_report(2, "NEW", UPDATE_TIME + 1),
+        _execution_report(1, "FILLED", UPDATE_TIME + 2),
+    ]
+    with ReplayServer(messages) as replay:
+        stream = UserDataStream(binance, url=replay.url)
+        stream.start()
+        try:
+            _wait(lambda: stream.get_open_order("BTCUSDT", 1) is None)
+            _wait(lambda: stream.get_open_order("BTCUSDT", 2) is not None)
+            orders = stream.get_open_orders("BTCUSDT")
+        finally:
+            stream.stop()
+    assert [order.order_id for order in orders] == [2]
+    assert replay.paths == ["/ws/key1"]
+
+
+def test_account_positions_update_the_balances(binance: Binance):
+    messages: List[str] = [
+        # Older than the REST snapshot, ignored.
+        _account_position(UPDATE_TIME - 1, {"USDT": "1.0"}),
+        _account_position(UPDATE_TIME + 1, {"USDT": "700.0", "BTC": "0.0"}),
+    ]
+    with ReplayServer(messages) as replay:
+        stream = UserDataStream(binance, url=replay.url)
+        stream.start()
+        try:
+            _wait(lambda: _free(stream) == {"USDT": "700.0"})
+            account = stream.get_account()
+        finally:
+            stream.stop()
+    assert {balance.asset: balance.free for balance in account.balances} == {
+        "USDT": "700.0",
+        "BTC": "0.0",
+    }
+
+
+def test_listen_key_expiry_restarts_the_stream(binance: Binance, exchange: Exchange):
+    with ReplayServer([]) as replay:
+        stream = UserDataStream(binance, url=replay.url)
+        stream.start()
+        try:
+            _wait(lambda: replay.paths == ["/ws/key1"])
+            replay.send([json.dumps({"e": "listenKeyExpired", "E": 1})])
+            _wait(lambda: replay.paths == ["/ws/key1", "/ws/key2"])
+            _wait(lambda: stream.is_running)
+            replay.send([_account_position(UPDATE_TIME + 1, {"USDT": "900.0"})])
+            _wait(lambda: _free(stream)["USDT"] == "900.0")
+        finally:
+            stream.stop()
+    assert exchange.listen_keys == 2
+
+
+def test_reads_fall_back_to_rest_until_loaded(binance: Binance):
+    stream = UserDataStream(binance, url="ws://127.0.0.1:1")
+    assert stream.account is None
+    assert _free(stream) == {"USDT": "1000.0", "BTC": "0.5"}
+    assert len(stream.get_account().balances) == 2
+    assert [order.order_id for order in stream.get_open_orders()] == [1]
+    assert stream.get_open_order("BTCUSDT", 1) is not None
+
+
+def test_reconnection_loads_the_state_again(binance: Binance, exchange: Exchange):
+    with ReplayServer([]) as replay:
+        stream = UserDataStream(binance, url=replay.url, reconnect=0.1)
+        stream.start()
+        try:
+            _wait(lambda: replay.paths)
+            assert exchange.account_requests == 1
+            # Changes made while disconnected, without events.
+            exchange.balances["USDT"] = "500.0"
+            exchange.orders = []
+            replay.drop()
+            _wait(lambda: len(replay.paths) == 2)
+            _wait(lambda: stream.is_running and _free(stream)["USDT"] == "500.0")
+            orders = stream.get_open_orders()
+        finally:
+            stream.stop()
+    assert orders == []
+    assert replay.paths == ["/ws/key1", "/ws/key1"]
+
+
+def test_reads_fall_back_to_rest_without_a_connection(
+    binance: Binance, exchange: Exchange
+):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url: str = "ws://127.0.0.1:%d" % sock.getsockname()[1]
+    stream = UserDataStream(binance, url=url, reconnect=0.1, connect_timeout=0.1)
+    stream.start()
+    try:
+        exchange.orders = []
+        assert not stream.is_running
+        assert stream.get_open_orders() == []
+        assert stream.get_open_order("BTCUSDT", 1) is None
+    finally:
+        stream.stop()
+
+
+def test_reads_fall_back_to_rest_once_disconnected(
+    binance: Binance, exchange: Exchange
+):
+    with ReplayServer([]) as replay:
+        stream = UserDataStream(binance, url=replay.url, reconnect=0.5)
+        stream.start()
+        try:
+            assert stream.is_running
+            exchange.balances["USDT"] = "500.0"
+            replay.drop()
+            _wait(lambda: not stream.is_running)
+            # Read from the account cache, up to date once it's refreshed.
+            assert _free(stream)["USDT"] == "1000.0"
+            binance.account_cache.invalidate()
+            assert _free(stream)["USDT"] == "500.0"
+            _wait(lambda: stream.is_running)
+        finally:
+            stream.stop()